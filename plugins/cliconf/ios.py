@@ -69,6 +69,140 @@ options:
     default: []
     vars:
     - name: ansible_ios_config_commands
+  config_pipeline_window:
+    description:
+    - Number of configuration lines written to the device in a single window
+      by C(edit_config).
+    - When set to a value greater than 1 the candidate lines are pipelined, the
+      combined echo of each window is scanned for errors and every error is
+      reported against the line that caused it.
+    - The device applies every line of a window, the lines following a failing
+      one in the same window are applied as well and listed in the error, the
+      later windows are not sent.
+    - The errors are searched with C(terminal_stderr_re) in the whole echo of
+      the window, however long it is.
+    - Lines that expect a prompt are always sent one at a time.
+    - The default value of 0 sends one line at a time and waits for the prompt
+      after each of them.
+    type: int
+    default: 0
+    version_added: 5.1.0
+    env:
+    - name: ANSIBLE_IOS_CONFIG_PIPELINE_WINDOW
+    vars:
+    - name: ansible_ios_config_pipeline_window
+  config_snapshot:
+    description:
+    - Keep the output of the C(show running-config) commands sent on the connection,
+      including the sections the resource facts read, and reuse it as long as the
+      C(Last configuration change) header of the running configuration, read with
+      C(get_config_fingerprint), is unchanged.
+    - The header has a resolution of one second, a change made by another session
+      within the same second as the previous change may go unnoticed. Changes made
+      through this connection always discard the snapshots.
+    type: bool
+    default: false
+    version_added: 5.1.0
+    env:
+    - name: ANSIBLE_IOS_CONFIG_SNAPSHOT
+    vars:
+    - name: ansible_ios_config_snapshot
+  device_info_cache:
+    description:
+    - Path of a file on the controller to persist the device information of every
+      host in, the version, model, image and L2/L3 type of the device, as well as
+      the flag that shows the running configuration with defaults.
+    - A cached entry is used as long as the image file and the boot time of the device,
+      read with the short C(show version | include uptime|image file) command, are
+      unchanged. New connections and plays then skip the full C(show version) and
+      the C(show vlan) probes.
+    - The terminal plugin also keeps the terminal length and width commands the
+      device accepts, classic or SD-WAN, and the prompt a user was at privilege
+      level 15 at, in this file. New connections then set up the terminal without
+      probing it and skip the C(show privilege) command. The privilege level is dropped
+      when the device info is refreshed, and checked again with C(show privilege) when
+      a command fails with an authorization or invalid input error.
+    - By default the device information is only cached for the lifetime of the
+      persistent connection.
+    type: path
+    version_added: 5.1.0
+    env:
+    - name: ANSIBLE_IOS_DEVICE_INFO_CACHE
+    vars:
+    - name: ansible_ios_device_info_cache
+  diff_engine:
+    description:
+    - The engine C(get_diff) compares the candidate and the running configuration with.
+    - C(tree) builds the netcommon configuration trees of both configurations.
+    - C(indexed) indexes the running configuration by line and by parent path and only
+      parses the blocks of the running configuration the candidate can match. It gives
+      the same results as C(tree) for every I(diff_match) and I(diff_replace) value,
+      and is much faster on very large configurations.
+    type: str
+    default: tree
+    choices:
+    - tree
+    - indexed
+    version_added: 5.1.0
+    env:
+    - name: ANSIBLE_IOS_DIFF_ENGINE
+    vars:
+    - name: ansible_ios_diff_engine
+  resource_after:
+    description:
+    - How the network resource modules compute the C(after) state once their
+      commands were pushed.
+    - C(gather) fetches and parses the resource configuration again.
+    - C(predict) applies the pushed commands to the running configuration the
+      C(before) state was parsed from and parses the result locally, without any
+      round trip to the device.
+    - C(verify) works like C(predict), but fetches the top level sections
+      touched by the commands with a single C(show running-config | section) command.
+    - Resources that are not gathered from a single C(show running-config) command
+      always use C(gather).
+    type: str
+    default: gather
+    choices:
+    - gather
+    - predict
+    - verify
+    version_added: 5.1.0
+    env:
+    - name: ANSIBLE_IOS_RESOURCE_AFTER
+    vars:
+    - name: ansible_ios_resource_after
+  response_cache_size:
+    description:
+    - Maximum number of responses kept by the response cache, the least
+      recently used ones are evicted first.
+    type: int
+    default: 64
+    version_added: 5.1.0
+    env:
+    - name: ANSIBLE_IOS_RESPONSE_CACHE_SIZE
+    vars:
+    - name: ansible_ios_response_cache_size
+  response_cache_ttl:
+    description:
+    - Number of seconds the responses of C(show) commands sent with C(get) and
+      C(run_commands) are reused for, by the facts and modules running against
+      the same persistent connection.
+    - Editing the configuration, or sending any other command, like the
+      I(config_commands), clears the cache.
+    - Commands answering a prompt and show commands redirecting their output to
+      a file are never cached.
+    - The commands sent with C(cache=False), like the ones polled by the
+      I(wait_for) conditions of M(cisco.ios.ios_command), are always sent to the
+      device and refresh the cached responses.
+    - The hits and misses of the cache are reported by C(get_capabilities).
+    - By default responses are not cached.
+    type: int
+    default: 0
+    version_added: 5.1.0
+    env:
+    - name: ANSIBLE_IOS_RESPONSE_CACHE_TTL
+    vars:
+    - name: ansible_ios_response_cache_ttl
 """
 
 EXAMPLES = """
@@ -134,14 +268,30 @@ EXAMPLES = """
 # - hostname R1 (from hostname resource module)
 # - configure confirm (cliconf specific)
 
+# Push large ACLs or prefix-lists 50 lines per write
+
+- name: Example pipelined configuration push
+  vars:
+    ansible_ios_config_pipeline_window: 50
+  tasks:
+    - name: "Merge a large ACL"
+      cisco.ios.ios_acls:
+        state: merged
+        config: "{{ acls }}"
+
 """
 
+import hashlib
 import json
+import os
 import re
+import tempfile
 import time
 
+from contextlib import contextmanager
+
 from ansible.errors import AnsibleConnectionFailure
-from ansible.module_utils._text import to_text
+from ansible.module_utils._text import to_bytes, to_text
 from ansible.module_utils.common._collections_compat import Mapping
 from ansible.module_utils.six import iteritems
 from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.config import (
@@ -154,10 +304,67 @@ from ansible_collections.ansible.netcommon.plugins.plugin_utils.cliconf_base imp
     enable_mode,
 )
 
+from ansible_collections.cisco.ios.plugins.plugin_utils.config_diff import (
+    IndexedNetworkConfig,
+    diff_scope,
+)
+from ansible_collections.cisco.ios.plugins.plugin_utils.device_cache import (
+    DeviceCache,
+    uptime_seconds,
+)
+from ansible_collections.cisco.ios.plugins.plugin_utils.response_cache import (
+    READ_ONLY_COMMAND_RE,
+    ResponseCache,
+)
+from ansible_collections.cisco.ios.plugins.terminal.ios import TerminalModule
+
+
+# the device information that does not change until the device reloads
+CACHED_DEVICE_INFO = (
+    "network_os_version",
+    "network_os_model",
+    "network_os_image",
+    "network_os_type",
+)
+
+# the device asking for the text of a banner or the lines of a macro,
+# like "Enter TEXT message.  End with the character '@'."
+MULTILINE_PROMPT_RE = r"[Ee]nd with the character"
+
+# the terminal_stderr_re of the connection while it must not look for errors
+NO_STDERR_RE = [{"pattern": r"(?!)"}]
+
+# a banner command and the delimiter of its text
+BANNER_RE = re.compile(r"^banner (\w+) (\^C|\S)", re.M)
+
+# commands that may start, confirm or revert a commit confirm rollback
+ROLLBACK_COMMAND_RE = re.compile(r"\s*conf\w*\s+\S")
+
+# the running config command showing its change marker
+FINGERPRINT_COMMAND = "show running-config | include ^! Last configuration change"
+FINGERPRINT_RE = re.compile(r"^! Last configuration change at .+$", re.M)
+
+# show running-config and its abbreviations, with any flags and filters
+RUNNING_CONFIG_COMMAND_RE = re.compile(r"^sh(?:ow?)?\s+run\S*(?:\s|$)")
+
+# the errors of a command the privilege level of the connection does not allow
+PRIVILEGE_ERROR_RE = re.compile(r"Command authorization failed|invalid input", re.I)
+
+# allowed difference of the boot times computed from two uptimes,
+# the uptime shown by the device is rounded down to minutes
+BOOT_TIME_TOLERANCE = 300
+
 
 class Cliconf(CliconfBase):
     def __init__(self, *args, **kwargs):
         self._device_info = {}
+        self._defaults_flag = None
+        # commit confirm preflight state, None when unknown
+        self._archive_enabled = None
+        self._rollback_pending = None
+        self._response_cache = None
+        # running config outputs by command, with the fingerprint they were shown at
+        self._config_snapshots = {}
         super(Cliconf, self).__init__(*args, **kwargs)
 
     @enable_mode
@@ -178,8 +385,37 @@ class Cliconf(CliconfBase):
         cmd += " ".join(to_list(flags))
         cmd = cmd.strip()
 
+        if source == "running" and self.get_option("config_snapshot"):
+            return self._get_config_snapshot(cmd)
         return self.send_command(cmd)
 
+    def get_config_fingerprint(self):
+        """
+        A marker of the running configuration that changes whenever the
+        configuration does, the `Last configuration change` header of the
+        running configuration. It is much cheaper to read than the configuration.
+        :return: The marker, None when the device does not show it
+        """
+        out = self.send_command(FINGERPRINT_COMMAND)
+        match = FINGERPRINT_RE.search(to_text(out, errors="surrogate_then_replace"))
+        return match.group(0).strip() if match else None
+
+    def _get_config_snapshot(self, command, **kwargs):
+        """The output of a running config command, from the snapshot of
+        the command when the running config did not change since.
+        """
+        fingerprint = self.get_config_fingerprint()
+        snapshot = self._config_snapshots.get(command)
+        if fingerprint and snapshot and snapshot[0] == fingerprint:
+            return snapshot[1]
+
+        out = self._send_checked(command, **kwargs)
+        if fingerprint:
+            self._config_snapshots[command] = (fingerprint, out)
+        else:
+            self._config_snapshots.pop(command, None)
+        return out
+
     def get_diff(
         self,
         candidate=None,
@@ -222,13 +458,51 @@ class Cliconf(CliconfBase):
                    'banner_diff': {}
                }
         """
-        diff = {}
         device_operations = self.get_device_operations()
-        option_values = self.get_option_values()
 
         if candidate is None and device_operations["supports_generate_diff"]:
             raise ValueError("candidate configuration is required to generate diff")
 
+        self._validate_diff_options(diff_match, diff_replace)
+
+        return self._get_diffs(
+            [(candidate, path)],
+            running,
+            diff_match,
+            diff_ignore_lines,
+            diff_replace,
+        )[0]
+
+    def get_diff_blocks(
+        self,
+        blocks=None,
+        running=None,
+        diff_match="line",
+        diff_ignore_lines=None,
+        diff_replace="line",
+    ):
+        """
+        Generate the diff of several blocks of candidate configuration against
+        the running configuration, which is parsed only once.
+        :param blocks: The candidate blocks, a list of dicts with the `candidate`
+                       configuration and the `path` it is checked against,
+                       see get_diff.
+        :param running: The base configuration which is used to generate diff.
+        :param diff_match: see get_diff.
+        :param diff_ignore_lines: see get_diff.
+        :param diff_replace: see get_diff.
+        :return: The diff of every block, in the format of get_diff.
+        """
+        if not blocks:
+            raise ValueError("candidate blocks are required to generate diff")
+
+        self._validate_diff_options(diff_match, diff_replace)
+
+        candidates = [(block.get("candidate") or "", block.get("path")) for block in blocks]
+        return self._get_diffs(candidates, running, diff_match, diff_ignore_lines, diff_replace)
+
+    def _validate_diff_options(self, diff_match, diff_replace):
+        option_values = self.get_option_values()
         if diff_match not in option_values["diff_match"]:
             raise ValueError(
                 "'match' value %s in invalid, valid values are %s"
@@ -241,30 +515,61 @@ class Cliconf(CliconfBase):
                 % (diff_replace, ", ".join(option_values["diff_replace"])),
             )
 
-        # prepare candidate configuration
-        candidate_obj = NetworkConfig(indent=1)
-        want_src, want_banners = self._extract_banners(candidate)
-        candidate_obj.load(want_src)
-
+    def _get_diffs(self, candidates, running, diff_match, diff_ignore_lines, diff_replace):
+        """The diff of every (candidate, path) in `candidates`
+        against a single parse of `running`.
+        """
+        indexed = self.get_option("diff_engine") == "indexed"
+
+        # prepare candidate configurations
+        candidate_objs = []
+        for candidate, path in candidates:
+            candidate_obj = IndexedNetworkConfig(indent=1) if indexed else NetworkConfig(indent=1)
+            want_src, want_banners = self._extract_banners(candidate)
+            candidate_obj.load(want_src)
+            candidate_objs.append((candidate_obj, path, want_banners))
+
+        running_obj = None
+        have_banners = {}
         if running and diff_match != "none":
             # running configuration
             have_src, have_banners = self._extract_banners(running)
-            running_obj = NetworkConfig(indent=1, contents=have_src, ignore_lines=diff_ignore_lines)
-            configdiffobjs = candidate_obj.difference(
-                running_obj,
-                path=path,
-                match=diff_match,
-                replace=diff_replace,
-            )
+            if indexed:
+                scopes = [
+                    diff_scope(candidate_obj, match=diff_match, path=path)
+                    for candidate_obj, path, dummy in candidate_objs
+                ]
+                running_obj = IndexedNetworkConfig(
+                    indent=1,
+                    contents=have_src,
+                    ignore_lines=diff_ignore_lines,
+                    scope=None if None in scopes else lambda text: any(s(text) for s in scopes),
+                )
+            else:
+                running_obj = NetworkConfig(
+                    indent=1,
+                    contents=have_src,
+                    ignore_lines=diff_ignore_lines,
+                )
 
-        else:
-            configdiffobjs = candidate_obj.items
-            have_banners = {}
+        diffs = []
+        for candidate_obj, path, want_banners in candidate_objs:
+            if running_obj is not None:
+                configdiffobjs = candidate_obj.difference(
+                    running_obj,
+                    path=path,
+                    match=diff_match,
+                    replace=diff_replace,
+                )
+            else:
+                configdiffobjs = candidate_obj.items
 
-        diff["config_diff"] = dumps(configdiffobjs, "commands") if configdiffobjs else ""
-        banners = self._diff_banners(want_banners, have_banners)
-        diff["banner_diff"] = banners if banners else {}
-        return diff
+            diff = {}
+            diff["config_diff"] = dumps(configdiffobjs, "commands") if configdiffobjs else ""
+            banners = self._diff_banners(want_banners, have_banners)
+            diff["banner_diff"] = banners if banners else {}
+            diffs.append(diff)
+        return diffs
 
     @enable_mode
     def configure(self):
@@ -281,9 +586,17 @@ class Cliconf(CliconfBase):
             )  # add default timeout not default: 1 to support above or operation
 
             persistent_command_timeout = self._connection.get_option("persistent_command_timeout")
-            # check archive state
-            archive_state = self.send_command("show archive")
-            rollback_state = self.send_command("show archive config rollback timer")
+            # check archive state, the device is only queried when the state
+            # is not known from an earlier check or the commands sent since
+            if not self._archive_enabled:
+                archive_state = self.send_command("show archive")
+                self._archive_enabled = not re.search(r"Archive.*not.enabled", archive_state)
+            if self._rollback_pending is not False:
+                rollback_state = self.send_command("show archive config rollback timer")
+                self._rollback_pending = not re.search(
+                    r"%No Rollback Confirmed Change pending",
+                    rollback_state,
+                )
 
             if persistent_command_timeout > commit_timeout * 60:
                 raise ValueError(
@@ -291,21 +604,23 @@ class Cliconf(CliconfBase):
                     "Please adjust and try again",
                 )
 
-            if re.search(r"Archive.*not.enabled", archive_state):
+            if not self._archive_enabled:
                 raise ValueError(
                     "commit_confirm_immediate option set, but archiving "
                     "not enabled on device. "
                     "Please set up archiving and try again",
                 )
 
-            if not re.search(r"%No Rollback Confirmed Change pending", rollback_state):
+            if self._rollback_pending:
                 raise ValueError(
                     "Existing rollback change already pending. "
                     "Please resolve by issuing 'configure confirm' "
                     "or 'configure revert now'",
                 )
 
+            self._rollback_pending = None
             self.send_command(f"configure terminal revert timer {commit_timeout}")
+            self._rollback_pending = True
         else:
             self.send_command("configure terminal")
 
@@ -319,20 +634,26 @@ class Cliconf(CliconfBase):
         requests = []
         # commit confirm specific attributes
         commit_confirm = self.get_option("commit_confirm_immediate")
+        pipeline_window = self.get_option("config_pipeline_window")
         if commit:
+            self._invalidate_caches()
             self.configure()
-            for line in to_list(candidate):
-                if not isinstance(line, Mapping):
-                    line = {"command": line}
-
-                cmd = line["command"]
-                if cmd != "end" and cmd[0] != "!":
-                    results.append(self.send_command(**line))
-                    requests.append(cmd)
+            if pipeline_window and pipeline_window > 1:
+                requests, results = self._edit_config_pipelined(candidate, pipeline_window)
+            else:
+                for line in to_list(candidate):
+                    if not isinstance(line, Mapping):
+                        line = {"command": line}
+
+                    cmd = line["command"]
+                    if cmd != "end" and cmd[0] != "!":
+                        results.append(self.send_command(**line))
+                        requests.append(cmd)
 
             self.send_command("end")
             if commit_confirm:
                 self.send_command("configure confirm")
+                self._rollback_pending = False
 
         else:
             raise ValueError("check mode is not supported")
@@ -341,6 +662,143 @@ class Cliconf(CliconfBase):
         resp["response"] = results
         return resp
 
+    def _edit_config_pipelined(self, candidate, window_size):
+        """
+        Send configuration lines in windows of `window_size` lines per write
+        instead of waiting for the prompt after every line.
+        :param candidate: The configuration lines to be pushed
+        :param window_size: Maximum number of lines sent in a single write
+        :return: Tuple of the list of requests and the list of responses,
+                 one entry per configuration line
+        """
+        requests = []
+        results = []
+        errors = []
+        applied = []
+        window = []
+
+        def flush():
+            if window:
+                responses, window_errors, window_applied = self._send_config_window(window)
+                requests.extend(window)
+                results.extend(responses)
+                errors.extend(window_errors)
+                applied.extend(window_applied)
+                del window[:]
+
+        for line in to_list(candidate):
+            if not isinstance(line, Mapping):
+                line = {"command": line}
+
+            cmd = line["command"]
+            if cmd == "end" or cmd[0] == "!":
+                continue
+
+            if len(line) > 1:
+                # lines with prompts or other send options are not pipelined
+                flush()
+                if errors:
+                    break
+                results.append(self.send_command(**line))
+                requests.append(cmd)
+                continue
+
+            window.append(cmd)
+            if len(window) >= window_size:
+                flush()
+                if errors:
+                    break
+        else:
+            flush()
+
+        if errors:
+            msg = "configuration failed:\n%s" % "\n".join(
+                "%s: %s" % (cmd, err) for cmd, err in errors
+            )
+            if applied:
+                msg += "\nlines applied after the failure, in the same window:\n%s" % "\n".join(
+                    applied,
+                )
+            raise AnsibleConnectionFailure(msg)
+        return requests, results
+
+    def _send_config_window(self, lines):
+        """
+        Write a window of configuration lines and split the combined echo
+        into per-line responses.
+
+        The device applies every line of the window, the ones after a
+        failing line too. So the connection does not stop at the first
+        error, the echo is read up to the prompt following the last line
+        and the errors are looked for in it with the terminal_stderr_re
+        of the connection.
+        :param lines: The configuration lines of the window
+        :return: Tuple of the per-line responses, a list of (line, error)
+                 tuples for each error found in the echo and the lines
+                 applied after the first failing one
+        """
+        stdout_re = self._terminal_std_re("terminal_stdout_re")
+        stderr_re = self._terminal_std_re("terminal_stderr_re")
+        with self._stderr_matching_off():
+            out = to_text(
+                self.send_command("\n".join(lines), strip_prompt=False),
+                errors="surrogate_then_replace",
+            )
+            echo = self._split_config_echo(out, lines, stdout_re, stderr_re)
+            while not echo[3]:
+                # the connection returned at the prompt of a line the
+                # device paused after, read the rest of the echo
+                try:
+                    more = self._connection.receive(strip_prompt=False)
+                except (OSError, AttributeError):
+                    raise AnsibleConnectionFailure(
+                        "timeout waiting for the echo of the window starting at '%s'" % lines[0],
+                    )
+                out += "\n" + to_text(more, errors="surrogate_then_replace")
+                echo = self._split_config_echo(out, lines, stdout_re, stderr_re)
+
+        responses, errors, failed = echo[:3]
+        applied = lines[failed + 1 :] if failed is not None else []
+        return responses, errors, applied
+
+    def _split_config_echo(self, out, lines, stdout_re, stderr_re):
+        """
+        Split the echo of a window of configuration lines.
+        :return: Tuple of the per-line responses, the (line, error) tuples,
+                 the index of the first failing line and whether the echo
+                 is complete, up to the prompt following the last line
+        """
+        responses = [[] for line in lines]
+        errors = []
+        failed = None
+        complete = False
+        index = -1
+        for row in out.splitlines():
+            if index + 1 < len(lines) and row.rstrip().endswith(lines[index + 1].strip()):
+                index += 1
+                continue
+            if self._is_prompt(row, stdout_re):
+                complete = index == len(lines) - 1
+                continue
+            complete = False
+            if index >= 0:
+                responses[index].append(row)
+            if self._is_config_error(row, stderr_re):
+                cmd = lines[index] if index >= 0 else "window starting at '%s'" % lines[0]
+                errors.append((cmd, row.strip()))
+                if failed is None:
+                    failed = max(index, 0)
+
+        return ["\n".join(resp).strip() for resp in responses], errors, failed, complete
+
+    def _is_prompt(self, row, stdout_re):
+        row = to_bytes(row.strip(), errors="surrogate_or_strict")
+        return any(regex.search(row) for regex in stdout_re)
+
+    def _is_config_error(self, row, stderr_re):
+        row = to_bytes(row, errors="surrogate_or_strict")
+        return any(regex.search(row) for regex in stderr_re)
+
     def edit_macro(self, candidate=None, commit=True, replace=None, comment=None):
         """
         ios_config:
@@ -357,29 +815,83 @@ class Cliconf(CliconfBase):
         results = []
         requests = []
         if commit:
-            commands = ""
+            self._invalidate_caches()
             self.send_command("config terminal")
-            time.sleep(0.1)
             # first item: macro command
-            commands += candidate.pop(0) + "\n"
+            macro_cmd = candidate.pop(0)
             multiline_delimiter = candidate.pop(-1)
+            commands = ""
             for line in candidate:
                 commands += " " + line + "\n"
-            commands += multiline_delimiter + "\n"
-            obj = {"command": commands, "sendonly": True}
-            results.append(self.send_command(**obj))
-            requests.append(commands)
+            commands += multiline_delimiter
+            # the macro lines answer the device asking for them, the
+            # command completes once the delimiter brings the prompt back
+            results.append(self._send_text(macro_cmd, commands))
+            requests.append(macro_cmd + "\n" + commands + "\n")
 
-            time.sleep(0.1)
-            self.send_command("end", sendonly=True)
-            time.sleep(0.1)
-            results.append(self.send_command("\n"))
-            requests.append("\n")
+            results.append(self.send_command("end"))
+            requests.append("end")
 
         resp["request"] = requests
         resp["response"] = results
         return resp
 
+    def _send_text(self, command, text):
+        """Send a banner or macro command and answer the device asking for
+        its text with `text`, ending with the delimiter.
+
+        The device echoes the text back, and it may hold anything the
+        terminal_stderr_re match, like "% Error". So the connection does
+        not look for errors in the response, only the rows of the response
+        that are not an echo of the text are checked for them.
+        """
+        with self._stderr_matching_off():
+            out = self.send_command(command=command, prompt=MULTILINE_PROMPT_RE, answer=text)
+
+        echo = set(line.strip() for line in re.split(r"[\r\n]", text))
+        stderr_re = self._terminal_std_re("terminal_stderr_re")
+        for row in to_text(out, errors="surrogate_then_replace").splitlines():
+            if row.strip() in echo:
+                continue
+            if any(
+                regex.search(to_bytes(row, errors="surrogate_or_strict")) for regex in stderr_re
+            ):
+                raise AnsibleConnectionFailure(to_text(out, errors="surrogate_then_replace"))
+        return out
+
+    def _terminal_std_re(self, option):
+        """The terminal_stdout_re or terminal_stderr_re regexes the connection
+        uses, the ones set for it or else the ones of the terminal plugin.
+        """
+        try:
+            configured = self._connection.get_option(option)
+        except KeyError:
+            configured = None
+        if not configured or not isinstance(configured, list):
+            return getattr(TerminalModule, option)
+
+        regexes = []
+        for item in configured:
+            flags = item.get("flags")
+            flags = getattr(re, flags.split(".")[1]) if flags else 0
+            regexes.append(re.compile(to_bytes(item["pattern"]), flags))
+        return regexes
+
+    @contextmanager
+    def _stderr_matching_off(self):
+        """Keep the connection from failing on the terminal_stderr_re matches
+        in the responses, the caller checks them instead.
+        """
+        try:
+            configured = self._connection.get_option("terminal_stderr_re")
+        except KeyError:
+            configured = None
+        self._connection.set_option("terminal_stderr_re", NO_STDERR_RE)
+        try:
+            yield
+        finally:
+            self._connection.set_option("terminal_stderr_re", configured)
+
     def get(
         self,
         command=None,
@@ -389,21 +901,148 @@ class Cliconf(CliconfBase):
         newline=True,
         output=None,
         check_all=False,
+        cache=True,
     ):
         if not command:
             raise ValueError("must provide value of command to execute")
         if output:
             raise ValueError("'output' value %s is not supported for get" % output)
 
-        return self.send_command(
+        return self._send_cached(
             command=command,
             prompt=prompt,
             answer=answer,
             sendonly=sendonly,
             newline=newline,
             check_all=check_all,
+            cache=cache,
+        )
+
+    def _get_response_cache(self):
+        """The response cache of the connection, None when it is disabled"""
+        if self._response_cache is None and self.get_option("response_cache_ttl") > 0:
+            self._response_cache = ResponseCache(
+                self.get_option("response_cache_ttl"),
+                self.get_option("response_cache_size"),
+            )
+        return self._response_cache
+
+    def _invalidate_caches(self):
+        self._config_snapshots = {}
+        if self._response_cache is not None:
+            self._response_cache.invalidate()
+
+    def _send_cached(self, command, cache=True, **kwargs):
+        """send_command, reusing the cached response of a show command,
+        or the snapshot of a running config command.
+        Any other command clears the response cache and the snapshots.
+        With `cache` False the command is always sent, and its response
+        replaces the cached one.
+        """
+        key = to_text(command, errors="surrogate_or_strict").strip()
+        read_only = READ_ONLY_COMMAND_RE.match(key)
+        if not read_only:
+            return self._send_tracked(command, **kwargs)
+
+        answered = kwargs.get("prompt") or kwargs.get("answer") or kwargs.get("sendonly")
+        if (
+            cache
+            and not answered
+            and RUNNING_CONFIG_COMMAND_RE.match(key)
+            and self.get_option("config_snapshot")
+        ):
+            return self._get_config_snapshot(key, **kwargs)
+
+        response_cache = self._get_response_cache()
+        if response_cache is None or answered:
+            return self._send_checked(command, **kwargs)
+
+        out = response_cache.lookup(key) if cache else None
+        if out is None:
+            out = self._send_checked(command, **kwargs)
+            response_cache.populate(key, out)
+        return out
+
+    def _send_tracked(self, command, **kwargs):
+        """send_command, for a command whose response is never cached.
+        The caches are cleared unless the command is read only, and the
+        commit confirm rollback state is reset by the commands that may
+        start, confirm or revert a rollback.
+        """
+        key = to_text(command, errors="surrogate_or_strict").strip()
+        if ROLLBACK_COMMAND_RE.match(key):
+            # the rollback state is unknown until the device is queried again
+            self._rollback_pending = None
+        if not READ_ONLY_COMMAND_RE.match(key):
+            self._invalidate_caches()
+        return self._send_checked(command, **kwargs)
+
+    def _send_checked(self, command, **kwargs):
+        """send_command, telling when a command failed because the privilege
+        level cached by the terminal is outdated
+        """
+        try:
+            return self.send_command(command=command, **kwargs)
+        except AnsibleConnectionFailure as exc:
+            terminal = getattr(self._connection, "_terminal", None)
+            if getattr(terminal, "privilege_cached", False) is not True:
+                raise
+            if not PRIVILEGE_ERROR_RE.search(to_text(exc)):
+                raise
+            try:
+                level = terminal.check_privilege()
+            except AnsibleConnectionFailure:
+                raise exc
+            if level == 15:
+                raise
+            raise AnsibleConnectionFailure(
+                "%s\nThe connection is at privilege level %d, the cached privilege level 15 "
+                "is outdated and was dropped, a new connection will enable it"
+                % (to_text(exc), level),
+            )
+
+    def get_to_file(
+        self,
+        command=None,
+        path=None,
+        prompt=None,
+        answer=None,
+        newline=True,
+        check_all=False,
+    ):
+        """
+        Execute a command and write its output to a file on the controller,
+        instead of returning it over the connection socket.
+        :param command: The command to execute
+        :param path: The file to write the output to, it is replaced atomically
+        :return: The path of the file, the number of bytes written and their SHA1 checksum
+        """
+        if not command:
+            raise ValueError("must provide value of command to execute")
+        if not path:
+            raise ValueError("must provide the path of the file to write the output to")
+
+        # the output is never cached, it is as large as the file it is written to
+        out = self._send_tracked(
+            command=command,
+            prompt=prompt,
+            answer=answer,
+            newline=newline,
+            check_all=check_all,
         )
 
+        path = os.path.abspath(os.path.expanduser(path))
+        data = to_bytes(out, errors="surrogate_then_replace")
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".ios_output")
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                tmp_file.write(data)
+            os.rename(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+        return {"path": path, "bytes": len(data), "checksum": hashlib.sha1(data).hexdigest()}
+
     def check_device_type(self):
         device_type = "L2"
         try:
@@ -414,40 +1053,115 @@ class Cliconf(CliconfBase):
 
     def get_device_info(self):
         if not self._device_info:
-            device_info = {}
-
-            device_info["network_os"] = "ios"
             # Ensure we are not in config mode
             self._update_cli_prompt_context(config_context=")#", exit_command="end")
-            reply = self.get(command="show version")
-            data = to_text(reply, errors="surrogate_or_strict").strip()
-            match = re.search(r"Version (\S+)", data)
-            if match:
-                device_info["network_os_version"] = match.group(1).strip(",")
-
-            model_search_strs = [
-                r"^[Cc]isco (.+) \(revision",
-                r"^[Cc]isco (\S+).+bytes of .*memory",
-            ]
-            for item in model_search_strs:
-                match = re.search(item, data, re.M)
-                if match:
-                    version = match.group(1).split(" ")
-                    device_info["network_os_model"] = version[0]
-                    break
 
-            match = re.search(r"^(.+) uptime", data, re.M)
-            if match:
-                device_info["network_os_hostname"] = match.group(1)
+            cache = None
+            if self.get_option("device_info_cache"):
+                cache = DeviceCache(self.get_option("device_info_cache"))
+                self._device_info = self._get_cached_device_info(cache)
 
-            match = re.search(r'image file is "(.+)"', data)
-            if match:
-                device_info["network_os_image"] = match.group(1)
-            device_info["network_os_type"] = self.check_device_type()
-            self._device_info = device_info
+            if not self._device_info:
+                reply = self.get(command="show version")
+                data = to_text(reply, errors="surrogate_or_strict").strip()
+                device_info = self._parse_device_info(data)
+                device_info["network_os_type"] = self.check_device_type()
+                self._device_info = device_info
+                if cache:
+                    self._cache_device_info(cache, data)
 
         return self._device_info
 
+    def _parse_device_info(self, data):
+        device_info = {}
+
+        device_info["network_os"] = "ios"
+        match = re.search(r"Version (\S+)", data)
+        if match:
+            device_info["network_os_version"] = match.group(1).strip(",")
+
+        model_search_strs = [
+            r"^[Cc]isco (.+) \(revision",
+            r"^[Cc]isco (\S+).+bytes of .*memory",
+        ]
+        for item in model_search_strs:
+            match = re.search(item, data, re.M)
+            if match:
+                version = match.group(1).split(" ")
+                device_info["network_os_model"] = version[0]
+                break
+
+        match = re.search(r"^(.+) uptime", data, re.M)
+        if match:
+            device_info["network_os_hostname"] = match.group(1)
+
+        match = re.search(r'image file is "(.+)"', data)
+        if match:
+            device_info["network_os_image"] = match.group(1)
+        return device_info
+
+    def _boot_time(self, data):
+        """The boot time of the device from the uptime in `data`"""
+        match = re.search(r"^.+ uptime is (.+)$", data, re.M)
+        if match:
+            return int(time.time() - uptime_seconds(match.group(1)))
+        return None
+
+    def _get_cached_device_info(self, cache):
+        """The cached device information of the host, when the device
+        still runs the image and was not reloaded since it was cached.
+        """
+        record = cache.get(self._connection.get_option("host"))
+        if not record.get("device_info"):
+            return {}
+
+        reply = self.get(command="show version | include uptime|image file")
+        data = to_text(reply, errors="surrogate_or_strict").strip()
+        current = self._parse_device_info(data)
+        boot_time = self._boot_time(data)
+        if (
+            boot_time is None
+            or current.get("network_os_image") != record.get("image")
+            or abs(boot_time - record.get("boot_time", 0)) > BOOT_TIME_TOLERANCE
+        ):
+            self._connection.queue_message("vvvv", "cached device info is outdated")
+            return {}
+
+        device_info = dict(record["device_info"])
+        device_info["network_os"] = "ios"
+        if current.get("network_os_hostname"):
+            device_info["network_os_hostname"] = current["network_os_hostname"]
+        return device_info
+
+    def _cache_device_info(self, cache, data):
+        boot_time = self._boot_time(data)
+        if boot_time is None:
+            return
+        record = {
+            "image": self._device_info.get("network_os_image"),
+            "boot_time": boot_time,
+            "device_info": dict(
+                (key, self._device_info[key])
+                for key in CACHED_DEVICE_INFO
+                if key in self._device_info
+            ),
+        }
+        host = self._connection.get_option("host")
+        try:
+            # the terminal settings outlive a reload, unlike the device info
+            # and the privilege level, which is checked again
+            terminal = cache.get(host).get("terminal")
+            if terminal:
+                record["terminal"] = dict(
+                    (key, value) for key, value in terminal.items() if key != "privilege"
+                )
+            cache.set(host, record)
+        except (IOError, OSError) as exc:
+            self._connection.queue_message(
+                "warning",
+                "unable to cache the device info: %s" % to_text(exc),
+            )
+
     def get_device_operations(self):
         return {
             "supports_diff_replace": True,
@@ -473,9 +1187,20 @@ class Cliconf(CliconfBase):
 
     def get_capabilities(self):
         result = super(Cliconf, self).get_capabilities()
-        result["rpc"] += ["edit_banner", "get_diff", "run_commands", "get_defaults_flag"]
+        result["rpc"] += [
+            "edit_banner",
+            "get_diff",
+            "run_commands",
+            "get_defaults_flag",
+            "get_config_fingerprint",
+            "get_to_file",
+            "get_diff_blocks",
+        ]
         result["device_operations"] = self.get_device_operations()
         result.update(self.get_option_values())
+        result["resource_after"] = self.get_option("resource_after")
+        cache = self._get_response_cache()
+        result["response_cache"] = cache.stats() if cache else {}
         return json.dumps(result)
 
     def edit_banner(self, candidate=None, multiline_delimiter="@", commit=True):
@@ -495,25 +1220,24 @@ class Cliconf(CliconfBase):
         results = []
         requests = []
         if commit:
+            self._invalidate_caches()
             for key, value in iteritems(banners_obj):
                 key += " %s" % multiline_delimiter
-                self.send_command("config terminal", sendonly=True)
-                for cmd in [key, value, multiline_delimiter]:
-                    obj = {"command": cmd, "sendonly": True}
-                    results.append(self.send_command(**obj))
-                    requests.append(cmd)
+                self.send_command("config terminal")
+                # the banner text answers the device asking for it, the
+                # command completes once the delimiter brings the prompt back
+                results.append(self._send_text(key, "%s\r%s" % (value, multiline_delimiter)))
+                requests.extend([key, value, multiline_delimiter])
 
-                self.send_command("end", sendonly=True)
-                time.sleep(0.1)
-                results.append(self.send_command("\n"))
-                requests.append("\n")
+                results.append(self.send_command("end"))
+                requests.append("end")
 
         resp["request"] = requests
         resp["response"] = results
 
         return resp
 
-    def run_commands(self, commands=None, check_rc=True):
+    def run_commands(self, commands=None, check_rc=True, cache=True):
         if commands is None:
             raise ValueError("'commands' value is required")
 
@@ -527,7 +1251,7 @@ class Cliconf(CliconfBase):
                 raise ValueError("'output' value %s is not supported for run_commands" % output)
 
             try:
-                out = self.send_command(**cmd)
+                out = self._send_cached(cache=cache, **cmd)
             except AnsibleConnectionFailure as e:
                 if check_rc:
                     raise
@@ -541,8 +1265,22 @@ class Cliconf(CliconfBase):
         """
         The method identifies the filter that should be used to fetch running-configuration
         with defaults.
+        The filter only changes with the image of the device, it is cached along with
+        the device info.
         :return: valid default filter
         """
+        if self._defaults_flag:
+            return self._defaults_flag
+
+        cache = None
+        if self.get_option("device_info_cache"):
+            cache = DeviceCache(self.get_option("device_info_cache"))
+            image = self.get_device_info().get("network_os_image")
+            record = cache.get(self._connection.get_option("host"))
+            if record.get("defaults_flag") and record.get("image") == image:
+                self._defaults_flag = record["defaults_flag"]
+                return self._defaults_flag
+
         out = self.get("show running-config ?")
         out = to_text(out, errors="surrogate_then_replace")
 
@@ -552,9 +1290,22 @@ class Cliconf(CliconfBase):
                 commands.add(line.strip().split()[0])
 
         if "all" in commands:
-            return "all"
+            self._defaults_flag = "all"
         else:
-            return "full"
+            self._defaults_flag = "full"
+
+        if cache and record.get("image") == image:
+            try:
+                cache.update(
+                    self._connection.get_option("host"),
+                    {"defaults_flag": self._defaults_flag},
+                )
+            except (IOError, OSError) as exc:
+                self._connection.queue_message(
+                    "warning",
+                    "unable to cache the defaults flag: %s" % to_text(exc),
+                )
+        return self._defaults_flag
 
     def set_cli_prompt_context(self):
         """
@@ -575,23 +1326,31 @@ class Cliconf(CliconfBase):
                 self._connection.send_command("end")
 
     def _extract_banners(self, config):
-        banners = {}
-        banner_cmds = re.findall(r"^banner (\w+)", config, re.M)
-        for cmd in banner_cmds:
-            regex = r"banner %s \^C(.+?)(?=\^C)" % cmd
-            match = re.search(regex, config, re.S)
-            if match:
-                key = "banner %s" % cmd
-                banners[key] = match.group(1).strip()
-
-        for cmd in banner_cmds:
-            regex = r"banner %s \^C(.+?)(?=\^C)" % cmd
-            match = re.search(regex, config, re.S)
-            if match:
-                config = config.replace(str(match.group(1)), "")
+        """Split the banners out of `config` in a single pass. A banner
+        is delimited by ^C, as in the running config, or by the single
+        character that follows the banner command.
 
-        config = re.sub(r"banner \w+ \^C\^C", "!! banner removed", config)
-        return config, banners
+        :returns: the config with every banner replaced by a comment line,
+                  and a dict of the banner texts keyed by banner command
+        """
+        banners = {}
+        chunks = []
+        pos = 0
+        while True:
+            match = BANNER_RE.search(config, pos)
+            if not match:
+                break
+            delimiter = match.group(2)
+            end = config.find(delimiter, match.end())
+            if end == -1:
+                break
+            banners["banner %s" % match.group(1)] = config[match.end() : end].strip()
+            chunks.append(config[pos : match.start()])
+            chunks.append("!! banner removed")
+            pos = end + len(delimiter)
+
+        chunks.append(config[pos:])
+        return "".join(chunks), banners
 
     def _diff_banners(self, want, have):
         candidate = {}
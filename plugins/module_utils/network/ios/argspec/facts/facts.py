@@ -23,4 +23,9 @@ class FactsArgs(object):
         "gather_subset": dict(default=["min"], type="list", elements="str"),
         "gather_network_resources": dict(type="list", elements="str"),
         "available_network_resources": {"type": "bool", "default": False},
+        "parse_workers": {"type": "int", "default": 0},
+        "parse_workers_threshold": {"type": "int", "default": 5000},
+        "parse_cache": {"type": "path"},
+        "config_fingerprint": {"type": "str"},
+        "previous_facts": {"type": "dict"},
     }
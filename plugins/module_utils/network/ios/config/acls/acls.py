@@ -15,18 +15,25 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
+from collections import deque
+
 from ansible.module_utils.six import iteritems
-from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.rm_base.resource_module import (
-    ResourceModule,
-)
 from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.utils import (
     dict_merge,
+    to_list,
 )
 
 from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.facts import Facts
 from ansible_collections.cisco.ios.plugins.module_utils.network.ios.rm_templates.acls import (
     AclsTemplate,
 )
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.resource_module import (
+    ResourceModule,
+)
+
+
+# the default increment of ace sequence numbers
+ACE_SEQUENCE_STEP = 10
 
 
 class Acls(ResourceModule):
@@ -99,39 +106,33 @@ class Acls(ResourceModule):
         populates the list of commands to be run by comparing
         the `want` and `have` data with the `parsers` defined
         for the acls network resource.
-        """
-
-        def rearrange_cmds(aces):
-            non_negates = []
-            negates = []
-            for ace in aces:
-                if ace.startswith("no"):
-                    negates.append(ace)
-                else:
-                    non_negates.append(ace)
-            if non_negates or negates:
-                negates.extend(non_negates)
-            return negates
 
+        The commands of every acl are collected on their own and appended
+        to `self.commands` once, so generating the commands for all the
+        acls of an afi is linear in the number of aces (see `_compare_aces`).
+        """
         wplists = want.get("acls", {})
         hplists = have.get("acls", {})
         for wname, wentry in iteritems(wplists):
             hentry = hplists.pop(wname, {})
             acl_type = wentry["acl_type"] if wentry.get("acl_type") else hentry.get("acl_type")
-            begin = len(self.commands)  # to determine the index for acl command
-            self._compare_aces(
+            negates, adds, resequence = self._compare_aces(
                 wentry.pop("aces", {}),
                 hentry.pop("aces", {}),
                 afi,
                 wname,
             )  # handle aces
 
-            end = len(self.commands)
-            self.commands[begin:end] = rearrange_cmds(self.commands[begin:])
-
-            if len(self.commands) != begin or (not have and want):
+            if negates or adds or (not have and want):
                 _cmd = self.acl_name_cmd(wname, afi, acl_type)
-                self.commands.insert(begin, _cmd)
+                if negates or not resequence:
+                    self.commands.append(_cmd)
+                    self.commands.extend(negates)
+                if resequence:
+                    # resequence is a global command, enter the acl again after it
+                    self.commands.append(self.acl_resequence_cmd(wname, afi, *resequence))
+                    self.commands.append(_cmd)
+                self.commands.extend(adds)
 
         if self.state in ["overridden", "deleted"]:
             # remove remaining acls lists
@@ -140,16 +141,68 @@ class Acls(ResourceModule):
                 self.commands.append("no " + _cmd)
 
     def _compare_aces(self, want, have, afi, name):
-        """compares all aces"""
+        """compares all aces of an acl
+
+        The aces are keyed by sequence in `want` and `have` (unsequenced
+        aces and remarks by the keys `list_to_dict` gives them), aces without
+        a sequence in `want` are matched against `have` by their fingerprint.
+        Each ace is rendered at most twice and every lookup is a dict lookup,
+        so this is O(n) for n aces in `want` and `have`.
 
-        def add_afi(entry, afi):
-            """adds afi needed for
-            setval processing"""
-            if entry:
-                entry["afi"] = afi
-            return entry
+        :returns: a tuple of the negate commands, the other commands and
+                  the (start, step) to resequence the acl with in between,
+                  or None when it does not need to be resequenced
+        """
+        negates, adds = [], []
+
+        def render(entry, parser, negate=False):
+            if parser == "aces":
+                entry["afi"] = afi  # needed for setval processing
+            command = self._tmplt.render(entry, parser, negate)
+            if command:
+                (negates if negate else adds).extend(to_list(command))
+
+        unsequenced = [
+            wentry
+            for wentry in want.values()
+            if not wentry.get("remarks") and not wentry.get("sequence")
+        ]
+        configured = set()  # ids of the unsequenced aces found in have
+        resequence = None
+        if unsequenced and self.state == "merged":
+            # new aces are appended at the end of the acl anyway
+            existing = set(
+                self.ace_fingerprint(hentry)
+                for hentry in have.values()
+                if not hentry.get("remarks")
+            )
+            configured.update(
+                id(wentry) for wentry in unsequenced if self.ace_fingerprint(wentry) in existing
+            )
+        elif unsequenced and len(unsequenced) == len(
+            [wentry for wentry in want.values() if not wentry.get("remarks")],
+        ):
+            matched = self._match_unsequenced_aces(unsequenced, have)
+            remarks = any(
+                entry.get("remarks") for entry in list(want.values()) + list(have.values())
+            )
+            if remarks:
+                # remarks hold sequence numbers as well, which are not known,
+                # only keep the aces that do not need new aces before them
+                matched = [
+                    (wentry, hseq)
+                    for idx, (wentry, hseq) in enumerate(matched)
+                    if wentry is unsequenced[idx]
+                ]
+            else:
+                resequence = self.sequence_new_aces(unsequenced, matched, have)
+            for wentry, hseq in matched:
+                configured.add(id(wentry))
+                have.pop(hseq)
 
         for wseq, wentry in iteritems(want):
+            if id(wentry) in configured:
+                continue
             hentry = have.pop(wseq, {})
             if hentry:
                 hentry = self.sanitize_protocol_options(wentry, hentry)
@@ -165,25 +218,113 @@ class Acls(ResourceModule):
                         )
                     else:  # other action states
                         if hentry.get("remarks"):  # remove remark if not in want
+                            wremarks = set(wentry.get("remarks", []))
                             for rems in hentry.get("remarks"):
-                                if rems not in wentry.get("remarks", {}):
-                                    self.addcmd({"remarks": rems}, "remarks", negate=True)
+                                if rems not in wremarks:
+                                    render({"remarks": rems}, "remarks", negate=True)
                         else:  # remove ace if not in want
-                            self.addcmd(add_afi(hentry, afi), "aces", negate=True)
+                            render(hentry, "aces", negate=True)
                 if wentry.get("remarks"):  # add remark if not in have
+                    hremarks = set(hentry.get("remarks", []))
                     for rems in wentry.get("remarks"):
-                        if rems not in hentry.get("remarks", {}):
-                            self.addcmd({"remarks": rems}, "remarks")
+                        if rems not in hremarks:
+                            render({"remarks": rems}, "remarks")
                 else:  # add ace if not in have
-                    self.addcmd(add_afi(wentry, afi), "aces")
+                    render(wentry, "aces")
 
         # remove remaining entries from have aces list
         for hseq in have.values():
             if hseq.get("remarks"):  # remove remarks that are extra in have
                 for rems in hseq.get("remarks"):
-                    self.addcmd({"remarks": rems}, "remarks", negate=True)
+                    render({"remarks": rems}, "remarks", negate=True)
             else:  # remove extra aces
-                self.addcmd(add_afi(hseq, afi), "aces", negate=True)
+                render(hseq, "aces", negate=True)
+
+        return negates, adds, resequence
+
+    def _match_unsequenced_aces(self, unsequenced, have):
+        """Find the aces of `have` that aces without a sequence in
+        `want` are already configured as. The matched aces keep the order
+        of `unsequenced`, an ace of `unsequenced` is matched to the first
+        ace of `have` with the same fingerprint after the previous match.
+
+        :returns: a list of (want ace, have key) tuples
+        """
+        order, positions = {}, {}
+        for idx, (hseq, hentry) in enumerate(iteritems(have)):
+            order[hseq] = idx
+            if not hentry.get("remarks"):
+                positions.setdefault(self.ace_fingerprint(hentry), deque()).append(hseq)
+
+        matched = []
+        last = -1
+        for wentry in unsequenced:
+            candidates = positions.get(self.ace_fingerprint(wentry))
+            # every have entry is dropped at most once over the whole loop
+            while candidates and order[candidates[0]] <= last:
+                candidates.popleft()
+            if not candidates:
+                continue
+            hseq = candidates.popleft()
+            last = order[hseq]
+            matched.append((wentry, hseq))
+        return matched
+
+    def sequence_new_aces(self, unsequenced, matched, have):
+        """Give a sequence to the new aces of `unsequenced` that go before
+        matched aces, new aces after the last matched one are appended by
+        the device. The free sequences between the matched aces are used
+        when there are enough of them, else the acl is resequenced first,
+        so that only the new aces are pushed and the matched ones stay.
+
+        :param matched: the (want ace, have key) tuples of the matched aces
+        :returns: the (start, step) to resequence the acl with, or None
+        """
+        kept = dict((id(wentry), have[hseq]["sequence"]) for wentry, hseq in matched)
+        gaps, group = [], []  # the new aces before each matched ace
+        for wentry in unsequenced:
+            if id(wentry) in kept:
+                gaps.append((group, kept[id(wentry)]))
+                group = []
+            else:
+                group.append(wentry)
+        if not any(before for before, seq in gaps):
+            return None
+
+        previous = 0
+        resequence = None
+        for group, seq in gaps:
+            if seq - previous <= len(group):
+                widest = max(len(before) for before, dummy in gaps)
+                step = ACE_SEQUENCE_STEP * (widest + 1)
+                resequence = (step, step)
+                break
+            previous = seq
+
+        previous = 0
+        for idx, (group, seq) in enumerate(gaps):
+            if resequence:
+                seq = resequence[0] + idx * resequence[1]
+                previous = seq - ACE_SEQUENCE_STEP * (len(group) + 1)
+            for pos, wentry in enumerate(group, 1):
+                wentry["sequence"] = previous + (seq - previous) * pos // (len(group) + 1)
+            previous = seq
+        return resequence
+
+    def ace_fingerprint(self, ace):
+        """A hashable form of the ace content, without the sequence"""
+
+        def freeze(value):
+            if isinstance(value, dict):
+                return tuple(sorted((k, freeze(v)) for k, v in iteritems(value) if v is not None))
+            if isinstance(value, list):
+                return tuple(freeze(v) for v in value)
+            return value
+
+        ace = dict((k, v) for k, v in iteritems(ace) if k not in ("sequence", "afi"))
+        if ace.get("protocol_options") and not ace.get("protocol"):
+            ace["protocol"] = list(ace["protocol_options"])[0]
+        return freeze(ace)
 
     def sanitize_protocol_options(self, wace, hace):
         """handles protocol and protocol options as optional attribute"""
@@ -214,6 +355,14 @@ class Acls(ResourceModule):
             command = "ipv6 access-list {0}".format(name)
         return command
 
+    def acl_resequence_cmd(self, name, afi, start, step):
+        """generate acl resequence command"""
+
+        command = "ip access-list resequence {0} {1} {2}"
+        if afi == "ipv6":
+            command = "ipv6 access-list resequence {0} {1} {2}"
+        return command.format(name, start, step)
+
     def list_to_dict(self, param):
         """converts list attributes to dict"""
 
@@ -20,9 +20,6 @@ created.
 
 from copy import deepcopy
 
-from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.rm_base.resource_module import (
-    ResourceModule,
-)
 from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.utils import (
     dict_merge,
 )
@@ -31,6 +28,9 @@ from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.facts
 from ansible_collections.cisco.ios.plugins.module_utils.network.ios.rm_templates.bgp_address_family import (
     Bgp_address_familyTemplate,
 )
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.resource_module import (
+    ResourceModule,
+)
 
 
 class Bgp_address_family(ResourceModule):
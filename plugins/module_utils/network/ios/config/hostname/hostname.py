@@ -18,14 +18,13 @@ necessary to bring the current configuration to its desired end-state is
 created.
 """
 
-from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.rm_base.resource_module import (
-    ResourceModule,
-)
-
 from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.facts import Facts
 from ansible_collections.cisco.ios.plugins.module_utils.network.ios.rm_templates.hostname import (
     HostnameTemplate,
 )
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.resource_module import (
+    ResourceModule,
+)
 
 
 class Hostname(ResourceModule):
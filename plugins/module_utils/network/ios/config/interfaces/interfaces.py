@@ -19,9 +19,6 @@ created.
 """
 
 from ansible.module_utils.six import iteritems
-from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.rm_base.resource_module import (
-    ResourceModule,
-)
 from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.utils import (
     dict_merge,
 )
@@ -30,6 +27,9 @@ from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.facts
 from ansible_collections.cisco.ios.plugins.module_utils.network.ios.rm_templates.interfaces import (
     InterfacesTemplate,
 )
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.resource_module import (
+    ResourceModule,
+)
 from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.utils import (
     normalize_interface,
 )
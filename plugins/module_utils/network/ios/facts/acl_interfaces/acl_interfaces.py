@@ -15,6 +15,8 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
+import re
+
 from ansible_collections.ansible.netcommon.plugins.module_utils.network.common import utils
 
 from ansible_collections.cisco.ios.plugins.module_utils.network.ios.argspec.acl_interfaces.acl_interfaces import (
@@ -23,6 +25,13 @@ from ansible_collections.cisco.ios.plugins.module_utils.network.ios.argspec.acl_
 from ansible_collections.cisco.ios.plugins.module_utils.network.ios.rm_templates.acl_interfaces import (
     Acl_interfacesTemplate,
 )
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.running_config import (
+    get_interfaces_config,
+)
+
+
+# the interface lines holding an access group
+ACL_INTERFACE_LINE_RE = re.compile(r"ip access-group|ipv6 traffic-filter")
 
 
 class Acl_interfacesFacts(object):
@@ -33,8 +42,10 @@ class Acl_interfacesFacts(object):
         self.argument_spec = Acl_interfacesArgs.argument_spec
 
     def get_acl_interfaces_data(self, connection):
-        return connection.get(
+        return get_interfaces_config(
+            connection,
             "show running-config | include ^interface|ip access-group|ipv6 traffic-filter",
+            ACL_INTERFACE_LINE_RE,
         )
 
     def populate_facts(self, connection, ansible_facts, data=None):
@@ -48,7 +59,7 @@ class Acl_interfacesFacts(object):
         if not data:
             data = self.get_acl_interfaces_data(connection)
 
-        config_parser = Acl_interfacesTemplate(lines=data.splitlines())
+        config_parser = Acl_interfacesTemplate(lines=data.splitlines(), module=self._module)
         entry = sorted(list(config_parser.parse().values()), key=lambda k, sk="name": k[sk])
         if entry:
             for item in entry:
@@ -19,9 +19,6 @@ import re
 
 from ansible.module_utils.six import iteritems
 from ansible_collections.ansible.netcommon.plugins.module_utils.network.common import utils
-from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.rm_base.network_template import (
-    NetworkTemplate,
-)
 
 from ansible_collections.cisco.ios.plugins.module_utils.network.ios.argspec.acls.acls import (
     AclsArgs,
@@ -29,6 +26,12 @@ from ansible_collections.cisco.ios.plugins.module_utils.network.ios.argspec.acls
 from ansible_collections.cisco.ios.plugins.module_utils.network.ios.rm_templates.acls import (
     AclsTemplate,
 )
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.network_template import (
+    NetworkTemplate,
+)
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.validation import (
+    coerce_config,
+)
 
 
 class AclsFacts(object):
@@ -75,7 +78,7 @@ class AclsFacts(object):
         if data:
             data = self.sanitize_data(data)
 
-        rmmod = NetworkTemplate(lines=data.splitlines(), tmplt=AclsTemplate())
+        rmmod = NetworkTemplate(lines=data.splitlines(), tmplt=AclsTemplate(), module=self._module)
         current = rmmod.parse()
 
         temp_v4 = []
@@ -160,7 +163,7 @@ class AclsFacts(object):
         facts = {}
         if objs:
             facts["acls"] = []
-            params = utils.validate_config(self.argument_spec, {"config": objs})
+            params = coerce_config(self.argument_spec, {"config": objs})
             for cfg in params["config"]:
                 facts["acls"].append(utils.remove_empties(cfg))
         ansible_facts["ansible_network_resources"].update(facts)
@@ -14,115 +14,372 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
+import hashlib
+import json
 
+from ansible.module_utils._text import to_bytes, to_text
+from ansible.module_utils.common._collections_compat import Mapping
+from ansible.module_utils.connection import ConnectionError
 from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.facts.facts import (
     FactsBase,
 )
 
-from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.acl_interfaces.acl_interfaces import (
-    Acl_interfacesFacts,
-)
-from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.acls.acls import AclsFacts
-from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.bgp_address_family.bgp_address_family import (
-    Bgp_address_familyFacts,
-)
-from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.bgp_global.bgp_global import (
-    Bgp_globalFacts,
-)
-from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.hostname.hostname import (
-    HostnameFacts,
-)
-from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.interfaces.interfaces import (
-    InterfacesFacts,
-)
-from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.l2_interfaces.l2_interfaces import (
-    L2_interfacesFacts,
-)
-from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.l3_interfaces.l3_interfaces import (
-    L3_InterfacesFacts,
-)
-from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.lacp.lacp import LacpFacts
-from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.lacp_interfaces.lacp_interfaces import (
-    Lacp_InterfacesFacts,
-)
-from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.lag_interfaces.lag_interfaces import (
-    Lag_interfacesFacts,
-)
 from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.legacy.base import (
     Config,
     Default,
     Hardware,
     Interfaces,
 )
-from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.lldp_global.lldp_global import (
-    Lldp_globalFacts,
-)
-from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.lldp_interfaces.lldp_interfaces import (
-    Lldp_InterfacesFacts,
-)
-from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.logging_global.logging_global import (
-    Logging_globalFacts,
-)
-from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.ntp_global.ntp_global import (
-    Ntp_globalFacts,
-)
-from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.ospf_interfaces.ospf_interfaces import (
-    Ospf_interfacesFacts,
-)
-from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.ospfv2.ospfv2 import (
-    Ospfv2Facts,
-)
-from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.ospfv3.ospfv3 import (
-    Ospfv3Facts,
-)
-from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.prefix_lists.prefix_lists import (
-    Prefix_listsFacts,
-)
-from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.route_maps.route_maps import (
-    Route_mapsFacts,
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.ios import (
+    get_config_fingerprint,
 )
-from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.service.service import (
-    ServiceFacts,
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.parse_cache import (
+    ParseCache,
 )
-from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.snmp_server.snmp_server import (
-    Snmp_serverFacts,
-)
-from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.static_routes.static_routes import (
-    Static_routesFacts,
-)
-from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.vlans.vlans import (
-    VlansFacts,
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.running_config import (
+    RUNNING_CONFIG_CMD,
+    RunningConfigSnapshot,
 )
 
 
 FACT_LEGACY_SUBSETS = dict(default=Default, hardware=Hardware, interfaces=Interfaces, config=Config)
 
-FACT_RESOURCE_SUBSETS = dict(
-    interfaces=InterfacesFacts,
-    l2_interfaces=L2_interfacesFacts,
-    vlans=VlansFacts,
-    lag_interfaces=Lag_interfacesFacts,
-    lacp=LacpFacts,
-    lacp_interfaces=Lacp_InterfacesFacts,
-    lldp_global=Lldp_globalFacts,
-    lldp_interfaces=Lldp_InterfacesFacts,
-    l3_interfaces=L3_InterfacesFacts,
-    acl_interfaces=Acl_interfacesFacts,
-    static_routes=Static_routesFacts,
-    acls=AclsFacts,
-    ospfv2=Ospfv2Facts,
-    ospfv3=Ospfv3Facts,
-    ospf_interfaces=Ospf_interfacesFacts,
-    bgp_global=Bgp_globalFacts,
-    bgp_address_family=Bgp_address_familyFacts,
-    logging_global=Logging_globalFacts,
-    route_maps=Route_mapsFacts,
-    prefix_lists=Prefix_listsFacts,
-    ntp_global=Ntp_globalFacts,
-    service=ServiceFacts,
-    snmp_server=Snmp_serverFacts,
-    hostname=HostnameFacts,
-)
+
+class ResourceFactsRegistry(Mapping):
+    """Registry of the resource facts classes, keyed by resource name.
+    A facts class (and the rm_template it parses with) is only imported
+    the first time its resource is looked up.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._classes = {}
+
+    def register(self, name):
+        """Register the decorated function as the loader of `name`"""
+
+        def decorator(loader):
+            self._loaders[name] = loader
+            return loader
+
+        return decorator
+
+    def __getitem__(self, name):
+        if name not in self._classes:
+            self._classes[name] = self._loaders[name]()
+        return self._classes[name]
+
+    def __iter__(self):
+        return iter(self._loaders)
+
+    def __len__(self):
+        return len(self._loaders)
+
+
+FACT_RESOURCE_SUBSETS = ResourceFactsRegistry()
+
+
+@FACT_RESOURCE_SUBSETS.register("interfaces")
+def _interfaces_facts():
+    from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.interfaces.interfaces import (
+        InterfacesFacts,
+    )
+
+    return InterfacesFacts
+
+
+@FACT_RESOURCE_SUBSETS.register("l2_interfaces")
+def _l2_interfaces_facts():
+    from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.l2_interfaces.l2_interfaces import (
+        L2_interfacesFacts,
+    )
+
+    return L2_interfacesFacts
+
+
+@FACT_RESOURCE_SUBSETS.register("vlans")
+def _vlans_facts():
+    from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.vlans.vlans import (
+        VlansFacts,
+    )
+
+    return VlansFacts
+
+
+@FACT_RESOURCE_SUBSETS.register("lag_interfaces")
+def _lag_interfaces_facts():
+    from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.lag_interfaces.lag_interfaces import (
+        Lag_interfacesFacts,
+    )
+
+    return Lag_interfacesFacts
+
+
+@FACT_RESOURCE_SUBSETS.register("lacp")
+def _lacp_facts():
+    from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.lacp.lacp import (
+        LacpFacts,
+    )
+
+    return LacpFacts
+
+
+@FACT_RESOURCE_SUBSETS.register("lacp_interfaces")
+def _lacp_interfaces_facts():
+    from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.lacp_interfaces.lacp_interfaces import (
+        Lacp_InterfacesFacts,
+    )
+
+    return Lacp_InterfacesFacts
+
+
+@FACT_RESOURCE_SUBSETS.register("lldp_global")
+def _lldp_global_facts():
+    from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.lldp_global.lldp_global import (
+        Lldp_globalFacts,
+    )
+
+    return Lldp_globalFacts
+
+
+@FACT_RESOURCE_SUBSETS.register("lldp_interfaces")
+def _lldp_interfaces_facts():
+    from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.lldp_interfaces.lldp_interfaces import (
+        Lldp_InterfacesFacts,
+    )
+
+    return Lldp_InterfacesFacts
+
+
+@FACT_RESOURCE_SUBSETS.register("l3_interfaces")
+def _l3_interfaces_facts():
+    from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.l3_interfaces.l3_interfaces import (
+        L3_InterfacesFacts,
+    )
+
+    return L3_InterfacesFacts
+
+
+@FACT_RESOURCE_SUBSETS.register("acl_interfaces")
+def _acl_interfaces_facts():
+    from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.acl_interfaces.acl_interfaces import (
+        Acl_interfacesFacts,
+    )
+
+    return Acl_interfacesFacts
+
+
+@FACT_RESOURCE_SUBSETS.register("static_routes")
+def _static_routes_facts():
+    from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.static_routes.static_routes import (
+        Static_routesFacts,
+    )
+
+    return Static_routesFacts
+
+
+@FACT_RESOURCE_SUBSETS.register("acls")
+def _acls_facts():
+    from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.acls.acls import (
+        AclsFacts,
+    )
+
+    return AclsFacts
+
+
+@FACT_RESOURCE_SUBSETS.register("ospfv2")
+def _ospfv2_facts():
+    from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.ospfv2.ospfv2 import (
+        Ospfv2Facts,
+    )
+
+    return Ospfv2Facts
+
+
+@FACT_RESOURCE_SUBSETS.register("ospfv3")
+def _ospfv3_facts():
+    from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.ospfv3.ospfv3 import (
+        Ospfv3Facts,
+    )
+
+    return Ospfv3Facts
+
+
+@FACT_RESOURCE_SUBSETS.register("ospf_interfaces")
+def _ospf_interfaces_facts():
+    from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.ospf_interfaces.ospf_interfaces import (
+        Ospf_interfacesFacts,
+    )
+
+    return Ospf_interfacesFacts
+
+
+@FACT_RESOURCE_SUBSETS.register("bgp_global")
+def _bgp_global_facts():
+    from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.bgp_global.bgp_global import (
+        Bgp_globalFacts,
+    )
+
+    return Bgp_globalFacts
+
+
+@FACT_RESOURCE_SUBSETS.register("bgp_address_family")
+def _bgp_address_family_facts():
+    from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.bgp_address_family.bgp_address_family import (
+        Bgp_address_familyFacts,
+    )
+
+    return Bgp_address_familyFacts
+
+
+@FACT_RESOURCE_SUBSETS.register("logging_global")
+def _logging_global_facts():
+    from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.logging_global.logging_global import (
+        Logging_globalFacts,
+    )
+
+    return Logging_globalFacts
+
+
+@FACT_RESOURCE_SUBSETS.register("route_maps")
+def _route_maps_facts():
+    from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.route_maps.route_maps import (
+        Route_mapsFacts,
+    )
+
+    return Route_mapsFacts
+
+
+@FACT_RESOURCE_SUBSETS.register("prefix_lists")
+def _prefix_lists_facts():
+    from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.prefix_lists.prefix_lists import (
+        Prefix_listsFacts,
+    )
+
+    return Prefix_listsFacts
+
+
+@FACT_RESOURCE_SUBSETS.register("ntp_global")
+def _ntp_global_facts():
+    from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.ntp_global.ntp_global import (
+        Ntp_globalFacts,
+    )
+
+    return Ntp_globalFacts
+
+
+@FACT_RESOURCE_SUBSETS.register("service")
+def _service_facts():
+    from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.service.service import (
+        ServiceFacts,
+    )
+
+    return ServiceFacts
+
+
+@FACT_RESOURCE_SUBSETS.register("snmp_server")
+def _snmp_server_facts():
+    from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.snmp_server.snmp_server import (
+        Snmp_serverFacts,
+    )
+
+    return Snmp_serverFacts
+
+
+@FACT_RESOURCE_SUBSETS.register("hostname")
+def _hostname_facts():
+    from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.hostname.hostname import (
+        HostnameFacts,
+    )
+
+    return HostnameFacts
+
+
+class ParseWorkerModule(object):
+    """The module given to the resource facts classes in a parse worker,
+    where the resources are only parsed from a prefetched running config.
+    """
+
+    def __init__(self):
+        self.params = {"state": "parsed"}
+        self.no_log_values = set()
+
+
+class ParseWorkerConnection(object):
+    """Serves the prefetched running config to a parse worker and records
+    the other requests, which only the module process can send.
+    """
+
+    def __init__(self, lines):
+        self._lines = lines
+        self.missing = []
+
+    def get(self, command=None, *args, **kwargs):
+        if command == RUNNING_CONFIG_CMD and not args and not kwargs:
+            return "\n".join(self._lines)
+        return self._unavailable(command)
+
+    def _unavailable(self, request):
+        self.missing.append(request)
+        raise ConnectionError("%s is not available to the parse workers" % request)
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self._unavailable(name)
+
+
+_worker_connection = None
+_worker_snapshot = None
+
+
+def _init_parse_worker(lines):
+    global _worker_connection, _worker_snapshot
+    _worker_connection = ParseWorkerConnection(lines)
+    _worker_snapshot = RunningConfigSnapshot(_worker_connection)
+
+
+def _parse_resource(name):
+    """Parse the facts of resource `name` in a parse worker
+
+    :returns: a tuple of the resource name, its facts, the no_log values
+              found parsing them and the error parsing them. The facts
+              are None when the resource needs more than the running config.
+    """
+    connection = _worker_connection
+    connection.missing = []
+    module = ParseWorkerModule()
+    ansible_facts = {"ansible_network_resources": {}}
+    try:
+        FACT_RESOURCE_SUBSETS[name](module).populate_facts(_worker_snapshot, ansible_facts)
+    except Exception as exc:
+        if connection.missing:
+            return name, None, None, None
+        return name, None, None, to_text(exc)
+    return name, ansible_facts["ansible_network_resources"], module.no_log_values, None
+
+
+def parse_resources_in_workers(names, lines, workers):
+    """Parse the facts of the resources `names` from the running config
+    `lines` in a pool of `workers` processes.
+
+    :returns: the results of _parse_resource, None when the pool
+              cannot be started or a worker died
+    """
+    try:
+        from concurrent.futures import ProcessPoolExecutor
+
+        pool = ProcessPoolExecutor(
+            max_workers=min(workers, len(names)),
+            initializer=_init_parse_worker,
+            initargs=(lines,),
+        )
+    except (ImportError, NotImplementedError, OSError, TypeError):
+        return None
+    with pool:
+        try:
+            return list(pool.map(_parse_resource, names))
+        except RuntimeError:
+            # a worker died, BrokenProcessPool
+            return None
 
 
 class Facts(FactsBase):
@@ -143,9 +400,122 @@ class Facts(FactsBase):
         :return: the facts gathered
         """
         if self.VALID_RESOURCE_SUBSETS:
-            self.get_network_resources_facts(FACT_RESOURCE_SUBSETS, resource_facts_type, data)
+            connection = self._connection
+            if connection and not data and self._use_snapshot(resource_facts_type):
+                # serve every `show running-config | ...` view from one fetch
+                self._connection = RunningConfigSnapshot(connection)
+            cache = None
+            if self._module.params.get("parse_cache"):
+                # the templates parse the unchanged sections from the cache
+                cache = ParseCache(self._module.params["parse_cache"])
+                self._module._ios_parse_cache = cache
+                if self._module.params.get("parse_workers"):
+                    self._warnings.append(
+                        "The parse_cache is not used by the parse_workers, the network resources"
+                        " are parsed in full when the running config has more than"
+                        " parse_workers_threshold lines",
+                    )
+            try:
+                self.get_network_resources_facts(FACT_RESOURCE_SUBSETS, resource_facts_type, data)
+            finally:
+                self._connection = connection
+            if cache:
+                # the sections holding a secret are never written to the file
+                cache.save(self._module.no_log_values)
+                del self._module._ios_parse_cache
 
         if self.VALID_LEGACY_GATHER_SUBSETS:
             self.get_network_legacy_facts(FACT_LEGACY_SUBSETS, legacy_facts_type)
 
         return self.ansible_facts, self._warnings
+
+    def get_network_resources_facts(
+        self,
+        facts_resource_obj_map,
+        resource_facts_type=None,
+        data=None,
+    ):
+        """Parse the resources in worker processes when the running
+        config is large enough, in the module process otherwise.
+        """
+        resources = None
+        if not data and self._use_parse_workers():
+            resources = self.gen_runable(
+                resource_facts_type or self._gather_network_resources,
+                frozenset(facts_resource_obj_map.keys()),
+                resource_facts=True,
+            )
+        if not resources:
+            return super(Facts, self).get_network_resources_facts(
+                facts_resource_obj_map,
+                resource_facts_type,
+                data,
+            )
+
+        results = parse_resources_in_workers(
+            sorted(resources),
+            self._connection.lines,
+            self._module.params["parse_workers"],
+        )
+        remaining = []
+        if results is None:
+            self._warnings.append(
+                "The parse workers could not be started or one of them died,"
+                " the network resources were parsed by the module process",
+            )
+            remaining = list(resources)
+        for name, facts, no_log_values, error in results or []:
+            if error:
+                self._module.fail_json(msg=error)
+            if facts is None:
+                remaining.append(name)
+                continue
+            self._module.no_log_values.update(no_log_values)
+            self.ansible_facts["ansible_network_resources"].update(facts)
+
+        if remaining:
+            super(Facts, self).get_network_resources_facts(facts_resource_obj_map, remaining)
+        self.ansible_facts["ansible_net_gather_network_resources"] = list(resources)
+
+    def get_config_fingerprint(self):
+        """The fingerprint of the running config and of the facts requested,
+        from the config change marker of the device. The marker is read
+        from the device, never from the cliconf response cache.
+
+        :returns: the fingerprint, None when the device has no marker,
+                  like before its first config change since it booted
+        """
+        marker = get_config_fingerprint(self._module)
+        if not marker:
+            return None
+        params = self._module.params
+        requested = [
+            marker,
+            sorted(params.get("gather_subset") or []),
+            sorted(params.get("gather_network_resources") or []),
+            bool(params.get("available_network_resources")),
+        ]
+        return hashlib.sha1(to_bytes(json.dumps(requested))).hexdigest()
+
+    def _use_parse_workers(self):
+        """Worker processes only pay off for large running configs,
+        fetched once by the module process
+        """
+        workers = self._module.params.get("parse_workers")
+        if not workers or workers < 1:
+            return False
+        if not isinstance(self._connection, RunningConfigSnapshot):
+            return False
+        threshold = self._module.params.get("parse_workers_threshold") or 0
+        return len(self._connection.lines) >= threshold
+
+    def _use_snapshot(self, resource_facts_type=None):
+        """A single resource is cheaper to fetch with its own filtered
+        show command than with the full running config
+        """
+        resources = self.gen_runable(
+            resource_facts_type or self._gather_network_resources,
+            self.VALID_RESOURCE_SUBSETS,
+            resource_facts=True,
+        )
+        return len(resources) > 1
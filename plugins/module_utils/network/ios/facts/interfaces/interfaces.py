@@ -24,6 +24,9 @@ from ansible_collections.cisco.ios.plugins.module_utils.network.ios.argspec.inte
 from ansible_collections.cisco.ios.plugins.module_utils.network.ios.rm_templates.interfaces import (
     InterfacesTemplate,
 )
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.running_config import (
+    get_interfaces_config,
+)
 
 
 class InterfacesFacts(object):
@@ -34,7 +37,7 @@ class InterfacesFacts(object):
         self.argument_spec = InterfacesArgs.argument_spec
 
     def get_interfaces_data(self, connection):
-        return connection.get("show running-config | section ^interface")
+        return get_interfaces_config(connection)
 
     def populate_facts(self, connection, ansible_facts, data=None):
         """Populate the facts for Interfaces network resource
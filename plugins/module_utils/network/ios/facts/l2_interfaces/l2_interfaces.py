@@ -23,6 +23,9 @@ from ansible_collections.cisco.ios.plugins.module_utils.network.ios.argspec.l2_i
 from ansible_collections.cisco.ios.plugins.module_utils.network.ios.rm_templates.l2_interfaces import (
     L2_interfacesTemplate,
 )
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.running_config import (
+    get_interfaces_config,
+)
 
 
 class L2_interfacesFacts(object):
@@ -33,7 +36,7 @@ class L2_interfacesFacts(object):
         self.argument_spec = L2_interfacesArgs.argument_spec
 
     def get_l2_interfaces_data(self, connection):
-        return connection.get("show running-config | section ^interface")
+        return get_interfaces_config(connection)
 
     def populate_facts(self, connection, ansible_facts, data=None):
         """Populate the facts for L2_interfaces network resource
@@ -25,9 +25,15 @@ from ansible_collections.cisco.ios.plugins.module_utils.network.ios.argspec.l3_i
 from ansible_collections.cisco.ios.plugins.module_utils.network.ios.rm_templates.l3_interfaces import (
     L3_interfacesTemplate,
 )
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.running_config import (
+    get_interfaces_config,
+)
 from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.utils import (
     netmask_to_cidr,
 )
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.validation import (
+    coerce_config,
+)
 
 
 class L3_InterfacesFacts(object):
@@ -38,7 +44,7 @@ class L3_InterfacesFacts(object):
         self.argument_spec = L3_interfacesArgs.argument_spec
 
     def get_l3_interfaces_data(self, connection):
-        return connection.get("show running-config | section ^interface")
+        return get_interfaces_config(connection)
 
     def populate_facts(self, connection, ansible_facts, data=None):
         """Populate the facts for l3 interfaces
@@ -54,7 +60,7 @@ class L3_InterfacesFacts(object):
             data = self.get_l3_interfaces_data(connection)
 
         # parse native config using the l3_interfaces template
-        l3_interfaces_parser = L3_interfacesTemplate(lines=data.splitlines())
+        l3_interfaces_parser = L3_interfacesTemplate(lines=data.splitlines(), module=self._module)
         objs = l3_interfaces_parser.parse()
 
         objs = utils.remove_empties(objs)
@@ -74,7 +80,7 @@ class L3_InterfacesFacts(object):
         facts = {}
         if objs:
             facts["l3_interfaces"] = []
-            params = utils.validate_config(self.argument_spec, {"config": objs})
+            params = coerce_config(self.argument_spec, {"config": objs})
             for cfg in params["config"]:
                 facts["l3_interfaces"].append(utils.remove_empties(cfg))
             facts["l3_interfaces"] = sorted(facts["l3_interfaces"], key=lambda k, sk="name": k[sk])
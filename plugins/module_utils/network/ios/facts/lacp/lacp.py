@@ -23,6 +23,9 @@ from ansible_collections.ansible.netcommon.plugins.module_utils.network.common i
 from ansible_collections.cisco.ios.plugins.module_utils.network.ios.argspec.lacp.lacp import (
     LacpArgs,
 )
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.validation import (
+    coerce_config,
+)
 
 
 class LacpFacts(object):
@@ -66,7 +69,7 @@ class LacpFacts(object):
         ansible_facts["ansible_network_resources"].pop("lacp", None)
         facts = {}
 
-        params = utils.validate_config(self.argument_spec, {"config": obj})
+        params = coerce_config(self.argument_spec, {"config": obj})
         facts["lacp"] = utils.remove_empties(params["config"])
         ansible_facts["ansible_network_resources"].update(facts)
 
@@ -25,10 +25,16 @@ from ansible_collections.ansible.netcommon.plugins.module_utils.network.common i
 from ansible_collections.cisco.ios.plugins.module_utils.network.ios.argspec.lacp_interfaces.lacp_interfaces import (
     Lacp_InterfacesArgs,
 )
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.running_config import (
+    get_interfaces_config,
+)
 from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.utils import (
     get_interface_type,
     normalize_interface,
 )
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.validation import (
+    coerce_config,
+)
 
 
 class Lacp_InterfacesFacts(object):
@@ -49,7 +55,7 @@ class Lacp_InterfacesFacts(object):
         self.generated_spec = utils.generate_dict(facts_argument_spec)
 
     def get_lacp_interface_data(self, connection):
-        return connection.get("show running-config | section ^interface")
+        return get_interfaces_config(connection)
 
     def populate_facts(self, connection, ansible_facts, data=None):
         """Populate the facts for lacp_interfaces
@@ -76,7 +82,7 @@ class Lacp_InterfacesFacts(object):
 
         if objs:
             facts["lacp_interfaces"] = []
-            params = utils.validate_config(self.argument_spec, {"config": objs})
+            params = coerce_config(self.argument_spec, {"config": objs})
             for cfg in params["config"]:
                 facts["lacp_interfaces"].append(utils.remove_empties(cfg))
         ansible_facts["ansible_network_resources"].update(facts)
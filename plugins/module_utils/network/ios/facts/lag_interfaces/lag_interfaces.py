@@ -25,6 +25,9 @@ from ansible_collections.cisco.ios.plugins.module_utils.network.ios.argspec.lag_
 from ansible_collections.cisco.ios.plugins.module_utils.network.ios.rm_templates.lag_interfaces import (
     Lag_interfacesTemplate,
 )
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.running_config import (
+    get_interfaces_config,
+)
 
 
 class Lag_interfacesFacts(object):
@@ -35,7 +38,7 @@ class Lag_interfacesFacts(object):
         self.argument_spec = Lag_InterfacesArgs.argument_spec
 
     def get_lag_interfaces_data(self, connection):
-        return connection.get("show running-config | section ^interface")
+        return get_interfaces_config(connection)
 
     def populate_facts(self, connection, ansible_facts, data=None):
         """Populate the facts for Lag_interfaces network resource
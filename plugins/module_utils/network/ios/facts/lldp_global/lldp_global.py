@@ -23,6 +23,9 @@ from ansible_collections.ansible.netcommon.plugins.module_utils.network.common i
 from ansible_collections.cisco.ios.plugins.module_utils.network.ios.argspec.lldp_global.lldp_global import (
     Lldp_globalArgs,
 )
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.validation import (
+    coerce_config,
+)
 
 
 class Lldp_globalFacts(object):
@@ -66,7 +69,7 @@ class Lldp_globalFacts(object):
         facts = {}
 
         if objs:
-            params = utils.validate_config(
+            params = coerce_config(
                 self.argument_spec,
                 {"config": utils.remove_empties(objs)},
             )
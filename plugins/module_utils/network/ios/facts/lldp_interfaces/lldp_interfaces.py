@@ -29,6 +29,9 @@ from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.utils
     get_interface_type,
     normalize_interface,
 )
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.validation import (
+    coerce_config,
+)
 
 
 class Lldp_InterfacesFacts(object):
@@ -74,7 +77,7 @@ class Lldp_InterfacesFacts(object):
 
         if objs:
             facts["lldp_interfaces"] = []
-            params = utils.validate_config(self.argument_spec, {"config": objs})
+            params = coerce_config(self.argument_spec, {"config": objs})
             for cfg in params["config"]:
                 facts["lldp_interfaces"].append(utils.remove_empties(cfg))
         ansible_facts["ansible_network_resources"].update(facts)
@@ -23,6 +23,9 @@ from ansible_collections.cisco.ios.plugins.module_utils.network.ios.argspec.ospf
 from ansible_collections.cisco.ios.plugins.module_utils.network.ios.rm_templates.ospf_interfaces import (
     Ospf_interfacesTemplate,
 )
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.running_config import (
+    get_interfaces_config,
+)
 
 
 class Ospf_interfacesFacts(object):
@@ -33,7 +36,7 @@ class Ospf_interfacesFacts(object):
         self.argument_spec = Ospf_interfacesArgs.argument_spec
 
     def get_ospf_interfaces_data(self, connection):
-        return connection.get("show running-config | section ^interface")
+        return get_interfaces_config(connection)
 
     def populate_facts(self, connection, ansible_facts, data=None):
         """Populate the facts for Ospf_interfaces network resource
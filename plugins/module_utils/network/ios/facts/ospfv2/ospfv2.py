@@ -15,9 +15,6 @@ __metaclass__ = type
 
 
 from ansible_collections.ansible.netcommon.plugins.module_utils.network.common import utils
-from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.rm_base.network_template import (
-    NetworkTemplate,
-)
 
 from ansible_collections.cisco.ios.plugins.module_utils.network.ios.argspec.ospfv2.ospfv2 import (
     Ospfv2Args,
@@ -25,6 +22,12 @@ from ansible_collections.cisco.ios.plugins.module_utils.network.ios.argspec.ospf
 from ansible_collections.cisco.ios.plugins.module_utils.network.ios.rm_templates.ospfv2 import (
     Ospfv2Template,
 )
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.network_template import (
+    NetworkTemplate,
+)
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.validation import (
+    coerce_config,
+)
 
 
 class Ospfv2Facts(object):
@@ -72,7 +75,9 @@ class Ospfv2Facts(object):
         if not data:
             data = self.get_ospfv2_data(connection)
 
-        ospf_temp_obj = NetworkTemplate(lines=data.splitlines(), tmplt=Ospfv2Template())
+        ospf_temp_obj = NetworkTemplate(
+            lines=data.splitlines(), tmplt=Ospfv2Template(), module=self._module
+        )
         ospf_parsed = ospf_temp_obj.parse()
 
         # Convert dict to list
@@ -86,7 +91,7 @@ class Ospfv2Facts(object):
         ansible_facts["ansible_network_resources"].pop("ospfv2", None)
 
         if ospf_parsed["processes"]:
-            params = utils.validate_config(self.argument_spec, {"config": facts_output})
+            params = coerce_config(self.argument_spec, {"config": facts_output})
             params = utils.remove_empties(params)
             facts["ospfv2"] = params["config"]
             ansible_facts["ansible_network_resources"].update(facts)
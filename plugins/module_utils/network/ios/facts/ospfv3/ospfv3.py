@@ -19,9 +19,6 @@ from copy import deepcopy
 
 from ansible.module_utils.six import iteritems
 from ansible_collections.ansible.netcommon.plugins.module_utils.network.common import utils
-from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.rm_base.network_template import (
-    NetworkTemplate,
-)
 
 from ansible_collections.cisco.ios.plugins.module_utils.network.ios.argspec.ospfv3.ospfv3 import (
     Ospfv3Args,
@@ -29,6 +26,9 @@ from ansible_collections.cisco.ios.plugins.module_utils.network.ios.argspec.ospf
 from ansible_collections.cisco.ios.plugins.module_utils.network.ios.rm_templates.ospfv3 import (
     Ospfv3Template,
 )
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.network_template import (
+    NetworkTemplate,
+)
 
 
 class Ospfv3Facts(object):
@@ -23,6 +23,9 @@ from ansible_collections.cisco.ios.plugins.module_utils.network.ios.argspec.pref
 from ansible_collections.cisco.ios.plugins.module_utils.network.ios.rm_templates.prefix_lists import (
     Prefix_listsTemplate,
 )
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.validation import (
+    coerce_config,
+)
 
 
 class Prefix_listsFacts(object):
@@ -52,7 +55,7 @@ class Prefix_listsFacts(object):
             data = self.get_prefix_list_data(connection)
 
         # parse native config using the Prefix_lists template
-        prefix_lists_parser = Prefix_listsTemplate(lines=data.splitlines())
+        prefix_lists_parser = Prefix_listsTemplate(lines=data.splitlines(), module=self._module)
         objs = prefix_lists_parser.parse()
 
         final_objs = []
@@ -72,7 +75,7 @@ class Prefix_listsFacts(object):
             ansible_facts["ansible_network_resources"].pop("prefix_lists", None)
 
         params = utils.remove_empties(
-            utils.validate_config(self.argument_spec, {"config": final_objs}),
+            coerce_config(self.argument_spec, {"config": final_objs}),
         )
 
         facts["prefix_lists"] = params.get("config", [])
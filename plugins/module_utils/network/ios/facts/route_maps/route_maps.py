@@ -26,6 +26,9 @@ from ansible_collections.cisco.ios.plugins.module_utils.network.ios.argspec.rout
 from ansible_collections.cisco.ios.plugins.module_utils.network.ios.rm_templates.route_maps import (
     Route_mapsTemplate,
 )
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.validation import (
+    coerce_config,
+)
 
 
 class Route_mapsFacts(object):
@@ -64,7 +67,7 @@ class Route_mapsFacts(object):
         if not data:
             data = self.get_route_maps_data(connection)
         # parse native config using the Route_maps template
-        route_maps_parser = Route_mapsTemplate(lines=data.splitlines())
+        route_maps_parser = Route_mapsTemplate(lines=data.splitlines(), module=self._module)
         objs = route_maps_parser.parse()
 
         final_objs = []
@@ -96,7 +99,7 @@ class Route_mapsFacts(object):
             ansible_facts["ansible_network_resources"].pop("route_maps", None)
 
             params = utils.remove_empties(
-                utils.validate_config(self.argument_spec, {"config": final_objs}),
+                coerce_config(self.argument_spec, {"config": final_objs}),
             )
 
             facts["route_maps"] = params["config"]
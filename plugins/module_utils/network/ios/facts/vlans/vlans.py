@@ -23,6 +23,9 @@ from ansible_collections.ansible.netcommon.plugins.module_utils.network.common i
 from ansible_collections.cisco.ios.plugins.module_utils.network.ios.argspec.vlans.vlans import (
     VlansArgs,
 )
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.validation import (
+    coerce_config,
+)
 
 
 class VlansFacts(object):
@@ -154,7 +157,7 @@ class VlansFacts(object):
         facts = {}
         if final_objs:
             facts["vlans"] = []
-            params = utils.validate_config(self.argument_spec, {"config": objs})
+            params = coerce_config(self.argument_spec, {"config": objs})
 
             for cfg in params["config"]:
                 facts["vlans"].append(utils.remove_empties(cfg))
@@ -30,6 +30,8 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 import json
+import os
+import re
 
 from ansible.module_utils._text import to_text
 from ansible.module_utils.connection import Connection, ConnectionError
@@ -99,14 +101,53 @@ def get_config(module, flags=None):
         return cfg
 
 
-def run_commands(module, commands, check_rc=True):
+def get_config_fingerprint(module):
+    """The marker of the running config that changes whenever it does,
+    None when the device does not show it.
+    """
     connection = get_connection(module)
     try:
+        return connection.get_config_fingerprint()
+    except ConnectionError as exc:
+        module.fail_json(msg=to_text(exc, errors="surrogate_then_replace"))
+
+
+def run_commands(module, commands, check_rc=True, cache=True):
+    connection = get_connection(module)
+    try:
+        if not cache:
+            # the responses must not come from the cliconf response cache
+            return connection.run_commands(commands=commands, check_rc=check_rc, cache=False)
         return connection.run_commands(commands=commands, check_rc=check_rc)
     except ConnectionError as exc:
         module.fail_json(msg=to_text(exc))
 
 
+def run_commands_to_files(module, commands, output_dir):
+    """Run the commands, writing the output of each of them to a file
+    of `output_dir` on the controller.
+
+    :returns: the path, size in bytes and checksum of the file of every command
+    """
+    connection = get_connection(module)
+    files = []
+    for index, cmd in enumerate(to_list(commands)):
+        if not isinstance(cmd, dict):
+            cmd = {"command": cmd}
+        cmd = dict((key, value) for key, value in cmd.items() if value is not None)
+        cmd.pop("output", None)
+        cmd.pop("sendonly", None)
+        name = re.sub(r"[^\w.-]+", "_", cmd["command"]).strip("_")
+        cmd["path"] = os.path.join(output_dir, "%02d_%s.txt" % (index + 1, name))
+        try:
+            result = connection.get_to_file(**cmd)
+        except ConnectionError as exc:
+            module.fail_json(msg=to_text(exc, errors="surrogate_then_replace"))
+        result["command"] = cmd["command"]
+        files.append(result)
+    return files
+
+
 def load_config(module, commands):
     connection = get_connection(module)
 
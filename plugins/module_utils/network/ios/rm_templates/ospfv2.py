@@ -5,7 +5,7 @@ __metaclass__ = type
 
 import re
 
-from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.rm_base.network_template import (
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.network_template import (
     NetworkTemplate,
 )
 
@@ -18,7 +18,8 @@ the given network resource.
 import re
 
 from ansible.module_utils.six import iteritems
-from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.rm_base.network_template import (
+
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.network_template import (
     NetworkTemplate,
 )
 
@@ -629,8 +630,8 @@ def _tmplt_route_map_set_ipv6(config_data):
 
 
 class Route_mapsTemplate(NetworkTemplate):
-    def __init__(self, lines=None):
-        super(Route_mapsTemplate, self).__init__(lines=lines, tmplt=self)
+    def __init__(self, lines=None, module=None):
+        super(Route_mapsTemplate, self).__init__(lines=lines, tmplt=self, module=module)
 
     PARSERS = [
         {
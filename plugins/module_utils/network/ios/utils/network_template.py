@@ -0,0 +1,321 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2023 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+The NetworkTemplate class used by the ios rm_templates.
+It adds a keyword dispatch index on top of the netcommon
+NetworkTemplate, so that every config line is only matched
+against the parsers that can possibly match it, and reuses the
+parse output of the config sections held in a ParseCache.
+The parse output is validated with the coerce_config fast path.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+import re
+
+from copy import deepcopy
+
+from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.rm_base import (
+    network_template,
+)
+from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.utils import (
+    dict_merge,
+)
+
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.parse_cache import (
+    ParseCache,
+    split_sections,
+)
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.validation import (
+    coerce_config,
+)
+
+
+try:
+    from ansible.module_utils.common.parameters import _list_no_log_values as list_no_log_values
+except ImportError:
+    # TODO: Remove this import when we no longer support ansible < 2.11
+    from ansible.module_utils.common.parameters import list_no_log_values
+
+
+# escaped characters that are still part of a literal keyword
+LITERAL_ESCAPES = "-./:_#"
+
+
+def _skip_class(pattern, pos):
+    """Return the position right after the character class at `pos`"""
+    pos += 1
+    if pattern[pos : pos + 1] == "^":
+        pos += 1
+    if pattern[pos : pos + 1] == "]":
+        pos += 1
+    while pos < len(pattern) and pattern[pos] != "]":
+        pos += 2 if pattern[pos] == "\\" else 1
+    return pos + 1
+
+
+def _quantifier(pattern, pos):
+    """Parse the quantifier at `pos`, returns (min, max, end) or None"""
+    char = pattern[pos : pos + 1]
+    if char == "?":
+        qmin, qmax, end = 0, 1, pos + 1
+    elif char == "*":
+        qmin, qmax, end = 0, None, pos + 1
+    elif char == "+":
+        qmin, qmax, end = 1, None, pos + 1
+    elif char == "{":
+        match = re.match(r"{(\d*)(,?)(\d*)}", pattern[pos:])
+        if not match:
+            return None
+        qmin = int(match.group(1) or 0)
+        if not match.group(2):
+            qmax = qmin
+        else:
+            qmax = int(match.group(3)) if match.group(3) else None
+        end = pos + match.end()
+    else:
+        return None
+    if pattern[end : end + 1] in ("?", "+"):
+        end += 1
+    return qmin, qmax, end
+
+
+def _tokenize(pattern, pos, verbose):
+    """Split a regex into a flat list of items, groups matched
+    exactly once are inlined.
+    Items are ("begin",), ("end",), ("space",), ("lit", char),
+    ("opt", items) for optional parts and ("other",) for anything else.
+
+    :returns: a tuple of the items, the end position and a flag
+              telling if the items hold a top level alternation
+    """
+    items = []
+    alternation = False
+    while pos < len(pattern):
+        char = pattern[pos]
+        if verbose and char.isspace():
+            pos += 1
+            continue
+        if char == ")":
+            break
+        if char == "|":
+            alternation = True
+            pos += 1
+            continue
+
+        if char == "(":
+            plain = True
+            if pattern.startswith("(?P<", pos):
+                pos = pattern.index(">", pos) + 1
+            elif pattern.startswith("(?:", pos):
+                pos += 3
+            elif pattern.startswith("(?", pos):
+                # lookarounds, backreferences and inline flags
+                plain = False
+                pos += 2
+            else:
+                pos += 1
+            body, pos, body_alternation = _tokenize(pattern, pos, verbose)
+            pos += 1
+            item = ("group", body) if plain and not body_alternation else ("other",)
+        elif char == "[":
+            pos = _skip_class(pattern, pos)
+            item = ("other",)
+        elif char == "\\":
+            escaped = pattern[pos + 1 : pos + 2]
+            pos += 2
+            if escaped == "s":
+                item = ("space",)
+            elif escaped and escaped in LITERAL_ESCAPES:
+                item = ("lit", escaped)
+            else:
+                item = ("other",)
+        elif char == "^":
+            pos += 1
+            item = ("begin",)
+        elif char == "$":
+            pos += 1
+            item = ("end",)
+        elif char.isspace():
+            pos += 1
+            item = ("space",)
+        elif char.isalnum() or char in "_-":
+            pos += 1
+            item = ("lit", char)
+        else:
+            pos += 1
+            item = ("other",)
+
+        quantifier = _quantifier(pattern, pos)
+        if quantifier:
+            qmin, qmax, pos = quantifier
+            if item[0] == "space" and qmin >= 1:
+                items.append(item)
+            elif item[0] == "space":
+                items.append(("opt", [item]))
+            elif item[0] in ("lit", "group") and (qmin, qmax) == (0, 1):
+                items.append(("opt", item[1] if item[0] == "group" else [item]))
+            elif item[0] == "group" and (qmin, qmax) == (1, 1):
+                items.extend(item[1])
+            else:
+                items.append(("other",))
+        elif item[0] == "group":
+            items.extend(item[1])
+        else:
+            items.append(item)
+    return items, pos, alternation
+
+
+def _token_ends(items):
+    """Whether `items` can only start matching at the end of a token"""
+    if not items:
+        # re.match does not have to consume the whole line
+        return False
+    kind = items[0][0]
+    if kind in ("end", "space"):
+        return True
+    if kind == "opt":
+        return _token_ends(items[0][1] + items[1:]) and _token_ends(items[1:])
+    return False
+
+
+def leading_keyword(getval):
+    """Find the keyword every line matched by `getval` starts with.
+
+    :param getval: the parser regex, compiled or not
+    :returns: the keyword, or None when the regex can match lines
+              starting with anything else
+    """
+    regex = re.compile(getval)
+    verbose = regex.flags & re.VERBOSE
+    if regex.flags & re.IGNORECASE or (verbose and "#" in regex.pattern):
+        return None
+
+    items, dummy, alternation = _tokenize(regex.pattern, 0, verbose)
+    if alternation:
+        return None
+
+    pos = 0
+    while pos < len(items):
+        item = items[pos]
+        if item[0] in ("begin", "space"):
+            pos += 1
+        elif item[0] == "opt" and all(sub[0] == "space" for sub in item[1]):
+            pos += 1
+        else:
+            break
+
+    keyword = []
+    while pos < len(items) and items[pos][0] == "lit":
+        keyword.append(items[pos][1])
+        pos += 1
+
+    # the keyword must be a whole token of the line
+    if keyword and _token_ends(items[pos:]):
+        return "".join(keyword)
+    return None
+
+
+def build_dispatch_index(parsers):
+    """Group the parsers by the leading keyword of the lines they match.
+
+    :param parsers: the PARSERS list of a template
+    :returns: a tuple of a dict mapping each keyword to the ordered list
+              of candidate parsers, and the ordered list of parsers to
+              try for lines starting with any other keyword
+    """
+    keyed = {}
+    anywhere = []
+    for idx, parser in enumerate(parsers):
+        keyword = leading_keyword(parser["getval"])
+        if keyword is None:
+            anywhere.append(idx)
+        else:
+            keyed.setdefault(keyword, []).append(idx)
+
+    index = {}
+    for keyword, idxs in keyed.items():
+        index[keyword] = [parsers[idx] for idx in sorted(idxs + anywhere)]
+    return index, [parsers[idx] for idx in anywhere]
+
+
+class NetworkTemplate(network_template.NetworkTemplate):
+    """The NetworkTemplate class that ios Resource Module templates
+    inherit and use to parse and render config lines.
+    """
+
+    def _dispatch_index(self):
+        tmplt_cls = type(self._tmplt)
+        cached = tmplt_cls.__dict__.get("_dispatch")
+        if not cached or cached[0] is not self._tmplt.PARSERS:
+            # built once per template class
+            cached = (self._tmplt.PARSERS,) + build_dispatch_index(self._tmplt.PARSERS)
+            tmplt_cls._dispatch = cached
+        return cached[1], cached[2]
+
+    def parse(self):
+        """parse"""
+        cache = getattr(self._module, "_ios_parse_cache", None)
+        if isinstance(cache, ParseCache):
+            return self._parse_sections(cache)
+        return self._parse_lines(self._lines, {})[0]
+
+    def _parse_lines(self, lines, shared):
+        """Parse `lines`, starting with the `shared` values
+        of the lines before them
+
+        :returns: a tuple of the result and of the shared values
+        """
+        result = {}
+        index, anywhere = self._dispatch_index()
+        for line in lines:
+            tokens = line.split(None, 1)
+            candidates = index.get(tokens[0], anywhere) if tokens else anywhere
+            for parser in candidates:
+                cap = re.match(parser["getval"], line)
+                if cap:
+                    capdict = cap.groupdict()
+                    capdict = dict((k, v) for k, v in capdict.items() if v is not None)
+                    if parser.get("shared"):
+                        shared = capdict
+                    vals = dict_merge(capdict, shared)
+                    res = self._deepformat(deepcopy(parser["result"]), vals)
+                    result = dict_merge(result, res)
+                    break
+        return result, shared
+
+    def _parse_sections(self, cache):
+        """Parse the config section by section, only the sections
+        missing from `cache` are actually parsed
+        """
+        result = {}
+        shared = {}
+        namespace = cache.namespace(self._tmplt)
+        for section in split_sections(self._lines):
+            if cache.holds_secret(section):
+                entry = self._parse_lines(section, shared)
+            else:
+                key = cache.section_key(shared, section)
+                entry = cache.get(namespace, key)
+                if entry is None:
+                    entry = self._parse_lines(section, shared)
+                    cache.set(namespace, key, *entry)
+            section_result, shared = entry
+            for name, value in section_result.items():
+                # dict_merge of the whole result, one key at a time
+                if name in result:
+                    value = dict_merge({name: result[name]}, {name: value})[name]
+                result[name] = value
+        return result
+
+    def validate_config(self, spec, data, redact=False):
+        validated_data = coerce_config(spec, data)
+        if redact:
+            self._module.no_log_values.update(list_no_log_values(spec, validated_data))
+        return validated_data
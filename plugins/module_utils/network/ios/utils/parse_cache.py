@@ -0,0 +1,171 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2023 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+A controller-side store of the parse output of the running config
+sections, keyed by the hash of their text, so that only the sections
+changed since the last run of ios_facts are parsed again.
+The sections holding a secret, like a password, a key or an SNMP
+community, are never written to the store.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+
+from copy import deepcopy
+
+from ansible.module_utils._text import to_bytes, to_text
+
+
+# the config lines that may hold a secret, whatever the argspec of their resource
+SECRET_LINE_RE = re.compile(r"\b(?:community|password|secret|key)\b", re.I)
+
+
+def split_sections(lines):
+    """Split config lines into top level sections, each one
+    a top level line followed by its child lines
+    """
+    sections = []
+    for line in lines:
+        if not sections or (line[:1] and not line[:1].isspace()):
+            sections.append([])
+        sections[-1].append(line)
+    return sections
+
+
+def _digest(*parts):
+    return hashlib.sha1(to_bytes("\n".join(parts), errors="surrogate_or_strict")).hexdigest()
+
+
+def _json_safe(value):
+    """Whether `value` survives a JSON round trip unchanged"""
+    try:
+        return json.loads(json.dumps(value)) == value
+    except (TypeError, ValueError):
+        return False
+
+
+def _holds_secret(value, secrets):
+    """Whether any of the `secrets` appears in `value`, its keys included"""
+    if isinstance(value, dict):
+        return any(
+            _holds_secret(key, secrets) or _holds_secret(item, secrets)
+            for key, item in value.items()
+        )
+    if isinstance(value, list):
+        return any(_holds_secret(item, secrets) for item in value)
+    if value is None or not secrets:
+        return False
+    text = to_text(value, errors="surrogate_or_strict")
+    return any(secret in text for secret in secrets)
+
+
+class ParseCache(object):
+    """The parse output of config sections by template and section hash,
+    held in a JSON file.
+
+    The entries of a template that were not used by a run are dropped
+    when it is saved, so the file only holds the sections of the last
+    configuration parsed with each template.
+    """
+
+    def __init__(self, path):
+        self._path = os.path.abspath(os.path.expanduser(path))
+        self._data = self._load()
+        self._used = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self):
+        try:
+            with open(self._path) as cache_file:
+                data = json.load(cache_file)
+        except (IOError, OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    @staticmethod
+    def namespace(tmplt):
+        """The namespace of the entries of a template, changed
+        by any change of its parsers
+        """
+        tmplt_cls = type(tmplt)
+        cached = tmplt_cls.__dict__.get("_parse_cache_namespace")
+        if not cached or cached[0] is not tmplt.PARSERS:
+            parsers = repr(
+                [
+                    (getattr(p["getval"], "pattern", p["getval"]), p.get("result"), p.get("shared"))
+                    for p in tmplt.PARSERS
+                ],
+            )
+            cached = (tmplt.PARSERS, "%s-%s" % (tmplt_cls.__name__, _digest(parsers)[:12]))
+            tmplt_cls._parse_cache_namespace = cached
+        return cached[1]
+
+    @staticmethod
+    def holds_secret(section):
+        """Whether a section may hold a secret, its parse output is then
+        never cached
+        """
+        return any(SECRET_LINE_RE.search(line) for line in section)
+
+    @staticmethod
+    def section_key(shared, section):
+        """The key of a section, parsed with the `shared` values
+        of the lines before it
+        """
+        return _digest(json.dumps(shared, sort_keys=True), *section)
+
+    def get(self, namespace, key):
+        """The (result, shared) parse output of a section,
+        None when it is not cached
+        """
+        self._used.setdefault(namespace, set()).add(key)
+        entry = self._data.get(namespace, {}).get(key)
+        if not isinstance(entry, list) or len(entry) != 2:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return deepcopy(entry[0]), entry[1]
+
+    def set(self, namespace, key, result, shared):
+        if _json_safe([result, shared]):
+            self._data.setdefault(namespace, {})[key] = [deepcopy(result), shared]
+
+    def save(self, no_log_values=()):
+        """Write the entries used by this run to the file, but the ones
+        holding any of the `no_log_values` found gathering the facts
+        """
+        if not self._used:
+            return
+        secrets = [to_text(value, errors="surrogate_or_strict") for value in no_log_values if value]
+        data = self._load()
+        for namespace, keys in self._used.items():
+            entries = self._data.get(namespace, {})
+            data[namespace] = dict(
+                (key, entries[key])
+                for key in keys
+                if key in entries and not _holds_secret(entries[key], secrets)
+            )
+
+        directory = os.path.dirname(self._path)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".parse_cache")
+        try:
+            with os.fdopen(fd, "w") as tmp_file:
+                json.dump(data, tmp_file, sort_keys=True)
+            os.rename(tmp_path, self._path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
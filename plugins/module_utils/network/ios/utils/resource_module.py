@@ -0,0 +1,162 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2023 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+The ResourceModule class used by the ios resource modules.
+It can compute the `after` state locally, by applying the pushed
+commands to the running config the `before` state was parsed from,
+instead of fetching and parsing the resource config again.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+import re
+
+from copy import deepcopy
+
+from ansible.module_utils._text import to_text
+from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.network import (
+    get_capabilities,
+)
+from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.rm_base import (
+    resource_module,
+)
+
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.running_config import (
+    RunningConfigRecorder,
+    parse_config_tree,
+    parse_running_config_cmd,
+    patch_config_tree,
+    replace_sections,
+    section_regex,
+)
+
+
+AFTER_MODES = ("gather", "predict", "verify")
+
+# longest `show running-config | section` command sent by the verify mode
+MAX_VERIFY_COMMAND_LEN = 512
+
+
+def _key_paths(data, path=()):
+    """The set of key paths down to the leaves of `data`,
+    None when `data` holds a list.
+    """
+    if isinstance(data, list):
+        return None
+    if not isinstance(data, dict):
+        return set([path])
+    paths = set()
+    for key, value in data.items():
+        sub = _key_paths(value, path + (key,))
+        if sub is None:
+            return None
+        paths.update(sub)
+    return paths
+
+
+class ResourceModule(resource_module.ResourceModule):
+    """The ResourceModule class that ios Resource Modules inherit"""
+
+    def __init__(self, *_args, **kwargs):
+        self._have_config = None
+        self._predicted_after = None
+        self._context_keys = {}
+        super(ResourceModule, self).__init__(*_args, **kwargs)
+
+    def gather_current(self):
+        """Gather the current config and keep the running config
+        it was parsed from, when it comes from a single show command.
+        """
+        if self.state not in self.ACTION_STATES or not self._facts_module:
+            return super(ResourceModule, self).gather_current()
+
+        connection = self._facts_module._connection
+        recorder = RunningConfigRecorder(connection)
+        self._facts_module._connection = recorder
+        try:
+            return super(ResourceModule, self).gather_current()
+        finally:
+            self._facts_module._connection = connection
+            if len(recorder.calls) == 1:
+                command, out = recorder.calls[0]
+                if command and parse_running_config_cmd(command) is not None:
+                    self._have_config = (command, to_text(out, errors="surrogate_then_replace"))
+
+    @property
+    def after_mode(self):
+        """How the `after` state is computed, from the `resource_after`
+        option of the ios cliconf plugin.
+        """
+        mode = get_capabilities(self._module).get("resource_after")
+        return mode if mode in AFTER_MODES else "gather"
+
+    @property
+    def result(self):
+        if self.commands and self._have_config and not self._module.check_mode:
+            mode = self.after_mode
+            if mode != "gather":
+                self._predicted_after = self.predict_after(verify=mode == "verify")
+        return super(ResourceModule, self).result
+
+    def get_facts(self, empty_val=None, data=None):
+        if data is None and self._predicted_after is not None:
+            return self._predicted_after
+        return super(ResourceModule, self).get_facts(empty_val, data=data)
+
+    def predict_after(self, verify=False):
+        """Apply the commands to the running config of the `before` state
+        and parse the result.
+
+        :param verify: fetch the top level sections touched by the commands
+                       from the device instead of trusting the prediction
+        :rtype: A dictionary or list
+        :returns: The predicted config, None if it could not be predicted
+        """
+        command, out = self._have_config
+        modifier, regex = parse_running_config_cmd(command)
+
+        tree = parse_config_tree(out.splitlines())
+        touched = patch_config_tree(
+            tree,
+            self.commands,
+            identity=self._line_identity,
+            parses=self._line_parses,
+        )
+        if verify and touched:
+            sections_regex = section_regex(touched)
+            show_cmd = "show running-config | section %s" % sections_regex
+            if len(show_cmd) > MAX_VERIFY_COMMAND_LEN:
+                return None
+            sections = self._connection.get(show_cmd)
+            sections = to_text(sections, errors="surrogate_then_replace").splitlines()
+            replace_sections(tree, re.compile(sections_regex), parse_config_tree(sections))
+
+        lines = tree.lines()
+        if modifier:
+            lines = modifier(lines, regex)
+        if not lines:
+            return deepcopy(self._empty_fact_val)
+        return super(ResourceModule, self).get_facts(self._empty_fact_val, data="\n".join(lines))
+
+    def _line_identity(self, context, line):
+        """The key paths `line` sets in the parsed config. Two lines with
+        the same identity set the same attribute, so the latest one wins.
+        """
+        tmplt = type(self._tmplt)
+        context = tuple(context)
+        if context not in self._context_keys:
+            self._context_keys[context] = _key_paths(tmplt(lines=list(context)).parse())
+        base = self._context_keys[context]
+        paths = _key_paths(tmplt(lines=list(context) + [line]).parse())
+        if base is None or paths is None:
+            return None
+        return frozenset(paths - base) or None
+
+    def _line_parses(self, line):
+        return any(re.match(parser["getval"], line) for parser in self._tmplt.PARSERS)
@@ -0,0 +1,503 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2023 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Running configuration snapshot for ios facts.
+The running configuration is fetched once and the IOS output
+modifiers (section, include, exclude, begin) are emulated locally,
+so that several resources can be gathered from a single fetch.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+import re
+
+from ansible.module_utils._text import to_text
+
+
+RUNNING_CONFIG_CMD = "show running-config"
+INTERFACES_SECTION_CMD = "show running-config | section ^interface"
+
+
+def _indent(line):
+    return len(line) - len(line.lstrip(" "))
+
+
+def filter_section(lines, regex):
+    """Emulate `| section <regex>`, the matching lines
+    together with all of their child lines.
+    """
+    out = []
+    section_indent = None
+    for line in lines:
+        if section_indent is not None:
+            if line.strip() and _indent(line) > section_indent:
+                out.append(line)
+                continue
+            section_indent = None
+        if regex.search(line):
+            out.append(line)
+            section_indent = _indent(line)
+    return out
+
+
+def filter_include(lines, regex):
+    """Emulate `| include <regex>`"""
+    return [line for line in lines if regex.search(line)]
+
+
+def filter_exclude(lines, regex):
+    """Emulate `| exclude <regex>`"""
+    return [line for line in lines if not regex.search(line)]
+
+
+def filter_begin(lines, regex):
+    """Emulate `| begin <regex>`"""
+    for idx, line in enumerate(lines):
+        if regex.search(line):
+            return lines[idx:]
+    return []
+
+
+OUTPUT_MODIFIERS = {
+    "section": filter_section,
+    "include": filter_include,
+    "exclude": filter_exclude,
+    "begin": filter_begin,
+}
+
+
+def parse_running_config_cmd(command):
+    """Split a `show running-config [| <modifier> <regex>]` command
+    :param command: the show command
+    :returns: a tuple of modifier function and compiled regex, (None, None)
+              for the plain running config, or None when the command cannot
+              be served from a snapshot
+    """
+    base, sep, pipe = to_text(command, errors="surrogate_then_replace").partition("|")
+    if " ".join(base.split()) != RUNNING_CONFIG_CMD:
+        return None
+    if not sep:
+        return None, None
+
+    modifier, dummy, expr = pipe.strip().partition(" ")
+    if modifier not in OUTPUT_MODIFIERS or not expr:
+        return None
+    try:
+        regex = re.compile(expr)
+    except re.error:
+        return None
+    return OUTPUT_MODIFIERS[modifier], regex
+
+
+class InterfaceBlockIndex(object):
+    """The interface blocks of a running config, split once and shared
+    by all the interface based resources.
+    """
+
+    def __init__(self, lines):
+        self._blocks = []
+        block = None
+        for line in lines:
+            if block is not None:
+                if line.strip() and _indent(line) > 0:
+                    block.append(line)
+                    continue
+                block = None
+            if line.startswith("interface"):
+                block = [line]
+                self._blocks.append(block)
+        self._views = {}
+
+    def view(self, child_regex=None):
+        """The interface blocks as a `| section ^interface` output. With a
+        `child_regex`, only the child lines matching it are kept, and only
+        the blocks left with any child line.
+        """
+        key = child_regex.pattern if child_regex is not None else None
+        if key not in self._views:
+            lines = []
+            for block in self._blocks:
+                if child_regex is None:
+                    lines.extend(block)
+                    continue
+                children = [line for line in block[1:] if child_regex.search(line)]
+                if children:
+                    lines.append(block[0])
+                    lines.extend(children)
+            self._views[key] = "\n".join(lines)
+        return self._views[key]
+
+
+def get_interfaces_config(connection, command=INTERFACES_SECTION_CMD, child_regex=None):
+    """The interface blocks of the running config, from the shared
+    interface block index when `connection` serves a snapshot of it,
+    from `command` otherwise.
+    """
+    if isinstance(connection, RunningConfigSnapshot):
+        return connection.interface_blocks.view(child_regex)
+    return connection.get(command)
+
+
+class RunningConfigSnapshot(object):
+    """Connection wrapper that serves `show running-config` views
+    from a single fetch of the running configuration.
+    All other calls are passed through to the device connection.
+    """
+
+    def __init__(self, connection):
+        self._connection = connection
+        self._lines = None
+        self._interface_blocks = None
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    @property
+    def lines(self):
+        if self._lines is None:
+            out = self._connection.get(RUNNING_CONFIG_CMD)
+            self._lines = to_text(out, errors="surrogate_then_replace").splitlines()
+        return self._lines
+
+    @property
+    def interface_blocks(self):
+        if self._interface_blocks is None:
+            self._interface_blocks = InterfaceBlockIndex(self.lines)
+        return self._interface_blocks
+
+    def get(self, command=None, *args, **kwargs):
+        parsed = None
+        if not args and not kwargs:
+            parsed = parse_running_config_cmd(command)
+        if parsed is None:
+            return self._connection.get(command, *args, **kwargs)
+
+        modifier, regex = parsed
+        if modifier is None:
+            return "\n".join(self.lines)
+        return "\n".join(modifier(self.lines, regex))
+
+
+class RunningConfigRecorder(object):
+    """Connection wrapper that keeps the output of every `get` call,
+    so the configuration a resource was parsed from can be reused.
+    All calls are passed through to the device connection.
+    """
+
+    def __init__(self, connection):
+        self._connection = connection
+        self.calls = []
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def get(self, command=None, *args, **kwargs):
+        out = self._connection.get(command, *args, **kwargs)
+        self.calls.append((None if args or kwargs else command, out))
+        return out
+
+
+# configuration modes entered by a command, with the mode they are nested in
+CONTEXT_COMMANDS = (
+    (
+        re.compile(
+            r"^(interface|router|route-map|line|class-map|policy-map|key chain|vrf definition)\s",
+        ),
+        None,
+    ),
+    (re.compile(r"^ip access-list (standard|extended|role-based)\s\S+$"), None),
+    (re.compile(r"^ipv6 access-list\s\S+$"), None),
+    (re.compile(r"^address-family\s"), re.compile(r"^(router|vrf definition)\s")),
+    (re.compile(r"^template peer-(policy|session)\s"), re.compile(r"^router bgp\s")),
+)
+EXIT_COMMAND_RE = re.compile(r"^exit(-\S+)?$")
+NEGATION_PREFIXES = ("no ", "default ")
+
+
+def _token_prefixes(text):
+    tokens = text.split(" ")
+    return [" ".join(tokens[: idx + 1]) for idx in range(len(tokens))]
+
+
+class ConfigNode(object):
+    """A line of the running config with its child lines"""
+
+    def __init__(self, raw=None, parent=None):
+        self.raw = raw
+        self.text = " ".join(raw.split()) if raw is not None else None
+        self.parent = parent
+        self.children = []
+        self.removed = False
+        self.identity = None
+        self._by_prefix = None
+        self._by_identity = None
+
+    @property
+    def indent(self):
+        if self.raw is None:
+            return -1
+        return len(self.raw) - len(self.raw.lstrip(" "))
+
+    @property
+    def path(self):
+        """The raw lines of the modes entered down to this node"""
+        lines = []
+        node = self
+        while node is not None and node.raw is not None:
+            lines.insert(0, node.raw)
+            node = node.parent
+        return lines
+
+    @property
+    def has_children(self):
+        return any(not child.removed for child in self.children)
+
+    def child_indent(self):
+        for child in self.children:
+            if not child.removed:
+                return child.indent
+        return self.indent + 1
+
+    def _prefix_index(self):
+        if self._by_prefix is None:
+            self._by_prefix = {}
+            for child in self.children:
+                if not child.removed:
+                    self._index(child)
+        return self._by_prefix
+
+    def _index(self, child):
+        for prefix in _token_prefixes(child.text):
+            self._by_prefix.setdefault(prefix, []).append(child)
+
+    def find(self, text):
+        """The child line equal to `text`"""
+        for child in self._prefix_index().get(text, []):
+            if child.text == text and not child.removed:
+                return child
+        return None
+
+    def find_prefixed(self, text):
+        """The child lines starting with the `text` tokens"""
+        return [child for child in self._prefix_index().get(text, []) if not child.removed]
+
+    def add(self, text):
+        child = ConfigNode(" " * self.child_indent() + text, parent=self)
+        self.children.append(child)
+        if self._by_prefix is not None:
+            self._index(child)
+        return child
+
+    def remove(self, child):
+        child.removed = True
+        if self._by_identity is not None and self._by_identity.get(child.identity) is child:
+            del self._by_identity[child.identity]
+
+    def replace(self, child, text):
+        """Replace `child` with a new line at the same position"""
+        self.remove(child)
+        new = ConfigNode(child.raw[: child.indent] + text, parent=self)
+        self.children.insert(self.children.index(child) + 1, new)
+        if self._by_prefix is not None:
+            self._index(new)
+        return new
+
+    def identity_index(self, identity):
+        if self._by_identity is None:
+            self._by_identity = {}
+            for child in self.children:
+                if not child.removed:
+                    child.identity = identity(self.path, child.raw)
+                    if child.identity is not None:
+                        self._by_identity.setdefault(child.identity, child)
+        return self._by_identity
+
+    def lines(self):
+        """The raw lines of the children, depth first"""
+        out = []
+        for child in self.children:
+            if not child.removed:
+                out.append(child.raw)
+                out.extend(child.lines())
+        return out
+
+
+def parse_config_tree(lines):
+    """Build a tree of ConfigNode from running config lines,
+    using the indentation of the lines.
+    """
+    root = ConfigNode()
+    stack = [root]
+    for line in lines:
+        if not line.strip():
+            continue
+        indent = len(line) - len(line.lstrip(" "))
+        while len(stack) > 1 and stack[-1].indent >= indent:
+            stack.pop()
+        node = ConfigNode(line.rstrip(), parent=stack[-1])
+        stack[-1].children.append(node)
+        stack.append(node)
+    return root
+
+
+def _context_level(stack, text):
+    """The position in `stack` of the mode `text` is entered from,
+    or None when `text` does not enter a configuration mode
+    """
+    for level in range(len(stack) - 1, -1, -1):
+        node = stack[level].find(text)
+        if node is not None and node.has_children:
+            return level
+    for regex, parent_regex in CONTEXT_COMMANDS:
+        if regex.match(text):
+            if parent_regex is None:
+                return 0
+            for level in range(len(stack) - 1, 0, -1):
+                if parent_regex.match(stack[level].text):
+                    return level
+    return None
+
+
+def _command_level(stack, text, parses=None):
+    """The position in `stack` of the mode a command is applied in.
+    IOS runs the commands a mode does not know in its parent modes,
+    the mode holding the lines sharing the most leading tokens with
+    the command is picked, then the deepest mode `parses` accepts it in.
+    """
+    tokens = text.split(" ")
+    level, matched = len(stack) - 1, 0
+    for idx in range(len(stack) - 1, -1, -1):
+        for size in range(len(tokens), matched, -1):
+            if stack[idx].find_prefixed(" ".join(tokens[:size])):
+                level, matched = idx, size
+                break
+    if not matched and parses is not None:
+        for idx in range(len(stack) - 1, -1, -1):
+            if parses(" " * stack[idx].child_indent() + text):
+                return idx
+    return level
+
+
+def patch_config_tree(root, commands, identity=None, parses=None):
+    """Apply configuration commands to a config tree, the way IOS would
+    apply them to its running config.
+    A command replaces the sibling line with the same identity, when the
+    `identity` callable (called with the parent lines and the line)
+    returns one for it.
+
+    :param root: the tree built by parse_config_tree
+    :param commands: the configuration commands
+    :param identity: callable returning a hashable identity or None
+    :param parses: callable telling if an indented line is known
+    :returns: the set of top level lines touched by the commands
+    """
+    stack = [root]
+    touched = set()
+    for command in commands:
+        text = " ".join(command.split())
+        if not text:
+            continue
+        if EXIT_COMMAND_RE.match(text):
+            if len(stack) > 1:
+                stack.pop()
+            continue
+
+        prefix = next((p for p in NEGATION_PREFIXES if text.startswith(p)), None)
+        body = text[len(prefix) :] if prefix else text
+
+        level = _context_level(stack, body)
+        if level is not None:
+            del stack[level + 1 :]
+            touched.add(stack[1].text if level else body)
+            parent = stack[level]
+            node = parent.find(body)
+            if prefix == "no ":
+                if node is not None:
+                    parent.remove(node)
+                continue
+            if node is None:
+                node = parent.add(body)
+            elif prefix:
+                for child in node.children:
+                    node.remove(child)
+            stack.append(node)
+            continue
+
+        del stack[_command_level(stack, body, parses) + 1 :]
+        parent = stack[-1]
+        touched.add(stack[1].text if len(stack) > 1 else body)
+        if prefix:
+            for child in parent.find_prefixed(body):
+                parent.remove(child)
+            continue
+        if parent.find(text) is not None:
+            continue
+
+        # a positive line overrides its negated form
+        for negated in _token_prefixes(text):
+            node = parent.find("no " + negated)
+            if node is not None:
+                parent.remove(node)
+
+        node = None
+        key = identity(parent.path, " " * parent.child_indent() + text) if identity else None
+        if key is not None:
+            node = parent.identity_index(identity).get(key)
+        if node is not None:
+            node = parent.replace(node, text)
+        else:
+            node = parent.add(text)
+        if key is not None:
+            node.identity = key
+            parent.identity_index(identity)[key] = node
+    return touched
+
+
+def section_regex(lines):
+    """A `| section` regex matching the top level `lines`, usable both
+    by IOS and by the `re` module.
+    `_` is a delimiter and `?` asks for help on the IOS CLI,
+    both are matched with `.` instead.
+    """
+    patterns = []
+    for line in sorted(lines):
+        escaped = []
+        for char in line:
+            if char in "_?":
+                escaped.append(".")
+            elif char in ".*+[]()^$|\\":
+                escaped.append("\\" + char)
+            else:
+                escaped.append(char)
+        patterns.append("^" + "".join(escaped))
+    return "|".join(patterns)
+
+
+def replace_sections(root, regex, sections):
+    """Replace the top level sections of `root` matching `regex` with
+    the ones of `sections`, at the position of the first replaced one.
+    """
+    children = []
+    inserted = False
+    for child in root.children:
+        if child.removed:
+            continue
+        if regex.search(child.raw):
+            if not inserted:
+                children.extend(sections.children)
+                inserted = True
+            continue
+        children.append(child)
+    if not inserted:
+        children.extend(sections.children)
+    for child in children:
+        child.parent = root
+    root.children = children
+    root._by_prefix = None
+    root._by_identity = None
@@ -0,0 +1,95 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2023 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+A fast path for the argspec validation of the facts parsed by the
+ios rm_templates. The parsers only produce the options of the argspec,
+so only the type coercions, aliases and defaults of the validation
+are applied, in place, without building an AnsibleModule.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+from ansible.module_utils.common.validation import (
+    check_type_bool,
+    check_type_dict,
+    check_type_float,
+    check_type_int,
+    check_type_list,
+    check_type_path,
+    check_type_raw,
+    check_type_str,
+)
+from ansible.module_utils.six import string_types
+
+
+TYPE_CHECKERS = {
+    "bool": (check_type_bool, bool),
+    "dict": (check_type_dict, dict),
+    "float": (check_type_float, float),
+    "int": (check_type_int, int),
+    "list": (check_type_list, list),
+    "path": (check_type_path, None),
+    "raw": (check_type_raw, object),
+    "str": (check_type_str, string_types),
+}
+
+
+def _coerce(value, wanted):
+    checker, wanted_type = TYPE_CHECKERS[wanted or "str"]
+    if isinstance(value, tuple):
+        # the validation gets the values through JSON
+        value = list(value)
+    if wanted_type is not None and isinstance(value, wanted_type):
+        return value
+    return checker(value)
+
+
+def _coerce_options(spec, params):
+    for name, option in spec.items():
+        for alias in option.get("aliases") or ():
+            if alias in params:
+                params[name] = params[alias]
+
+        value = params.get(name)
+        if value is None and name not in params:
+            value = option.get("default")
+        if value is None:
+            suboptions = option.get("options")
+            if suboptions and option.get("apply_defaults") and option.get("type") == "dict":
+                value = _coerce_options(suboptions, {})
+            params[name] = value
+            continue
+
+        wanted = option.get("type")
+        value = _coerce(value, wanted)
+        elements = option.get("elements")
+        if wanted == "list" and elements:
+            value = [_coerce(element, elements) for element in value]
+
+        suboptions = option.get("options")
+        if suboptions and wanted == "list":
+            value = [_coerce_options(suboptions, element) for element in value]
+        elif suboptions and wanted == "dict":
+            value = _coerce_options(suboptions, value)
+        params[name] = value
+    return params
+
+
+def coerce_config(spec, data):
+    """Coerce parsed facts to the types of an argspec, in place.
+
+    It gives the same result as the netcommon validate_config for the
+    data the parsers produce, but does not check the choices, required
+    options and mutual exclusions, nor fail on unknown options.
+
+    :param spec: the argspec of the resource
+    :param data: the parsed facts, like {"config": [...]}
+    :returns: `data`, with every option of `spec`
+    """
+    return _coerce_options(spec, data)
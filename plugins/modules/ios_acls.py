@@ -21,7 +21,9 @@ description: This module configures and manages the named or numbered ACLs on IO
 module: ios_acls
 notes:
   - Tested against Cisco IOSXE Version 17.3 on CML.
-  - Module behavior is not idempotent when sequence for aces are not mentioned
+  - Aces without a sequence are matched against the configured aces by their content.
+    With state C(merged) an ace whose content is already configured is not pushed again,
+    even when the configured ace has another sequence.
   - This module works with connection C(network_cli).
     See U(https://docs.ansible.com/ansible/latest/network/user_guide/platform_ios.html)
 options:
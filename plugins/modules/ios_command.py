@@ -85,6 +85,19 @@ options:
         long to wait before trying the command again.
     default: 1
     type: int
+  output_dir:
+    description:
+      - Directory on the controller to write the output of every command to, instead of
+        returning it in I(stdout). Very large outputs, like C(show tech-support), then
+        never go through the module result.
+      - The output of each command is written to its own file, named after its position
+        and the command. Use a directory per host when running against several hosts.
+      - The output is still read whole by the persistent connection before it is written,
+        it is only kept out of the connection socket and the module result.
+      - The path, size in bytes and SHA1 checksum of each file are returned in I(output_files).
+      - Mutually exclusive with I(wait_for).
+    type: path
+    version_added: 5.1.0
 """
 
 EXAMPLES = r"""
@@ -307,6 +320,33 @@ EXAMPLES = r"""
 #     ]
 # }
 
+- name: Write the output of very large commands to files on the controller
+  cisco.ios.ios_command:
+    commands:
+      - show tech-support
+      - show ip bgp
+    output_dir: "/var/tmp/outputs/{{ inventory_hostname }}"
+
+# output-
+
+# ok: [iosxeappliance] => {
+#     "changed": false,
+#     "output_files": [
+#         {
+#             "bytes": 5242880,
+#             "checksum": "1b4b1ab6d2ea3e0a3c1d6b9ed9d1ce39a9c0b5a4",
+#             "command": "show tech-support",
+#             "path": "/var/tmp/outputs/iosxeappliance/01_show_tech-support.txt"
+#         },
+#         {
+#             "bytes": 104857600,
+#             "checksum": "7c4a8d09ca3762af61e59520943dc26494f8941b",
+#             "command": "show ip bgp",
+#             "path": "/var/tmp/outputs/iosxeappliance/02_show_ip_bgp.txt"
+#         }
+#     ]
+# }
+
 - name: Run commands with complex values like special characters in variables
   cisco.ios.ios_command:
     commands:
@@ -343,20 +383,26 @@ EXAMPLES = r"""
 RETURN = """
 stdout:
   description: The set of responses from the commands
-  returned: always apart from low level errors (such as action plugin)
+  returned: when I(output_dir) is not set, apart from low level errors (such as action plugin)
   type: list
   sample: ['...', '...']
 stdout_lines:
   description: The value of stdout split into a list
-  returned: always apart from low level errors (such as action plugin)
+  returned: when I(output_dir) is not set, apart from low level errors (such as action plugin)
   type: list
   sample: [['...', '...'], ['...'], ['...']]
+output_files:
+  description: The files the output of the commands was written to
+  returned: when I(output_dir) is set
+  type: list
+  sample: [{'command': 'show ip bgp', 'path': '/var/tmp/outputs/01_show_ip_bgp.txt', 'bytes': 1024, 'checksum': '...'}]
 failed_conditions:
   description: The list of conditionals that have failed
   returned: failed
   type: list
   sample: ['...', '...']
 """
+import os
 import time
 
 from ansible.module_utils._text import to_text
@@ -369,7 +415,10 @@ from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.u
     transform_commands,
 )
 
-from ansible_collections.cisco.ios.plugins.module_utils.network.ios.ios import run_commands
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.ios import (
+    run_commands,
+    run_commands_to_files,
+)
 
 
 def parse_commands(module, warnings):
@@ -393,11 +442,22 @@ def main():
         match=dict(default="all", choices=["all", "any"]),
         retries=dict(default=9, type="int"),
         interval=dict(default=1, type="int"),
+        output_dir=dict(type="path"),
+    )
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        mutually_exclusive=[("wait_for", "output_dir")],
+        supports_check_mode=True,
     )
-    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
     warnings = list()
     result = {"changed": False, "warnings": warnings}
     commands = parse_commands(module, warnings)
+    output_dir = module.params["output_dir"]
+    if output_dir:
+        if not os.path.isdir(output_dir):
+            os.makedirs(output_dir)
+        result["output_files"] = run_commands_to_files(module, commands, output_dir)
+        module.exit_json(**result)
     wait_for = module.params["wait_for"] or list()
     conditionals = []
     try:
@@ -408,7 +468,8 @@ def main():
     interval = module.params["interval"]
     match = module.params["match"]
     while retries >= 0:
-        responses = run_commands(module, commands)
+        # every poll must read the device, not the cached responses
+        responses = run_commands(module, commands, cache=not wait_for)
         for item in list(conditionals):
             if item(responses):
                 if match == "any":
@@ -81,6 +81,44 @@ options:
         to append a set of commands to be executed after the command set.
     type: list
     elements: str
+  blocks:
+    description:
+      - A list of sections to configure in a single task, each one with its own I(lines),
+        I(parents), I(before) and I(after), instead of looping over the module.
+      - The running-config is fetched and parsed once, all the sections are compared
+        against it and all the changes are pushed in a single configuration session.
+      - The I(match) and I(replace) arguments apply to every section.
+      - This argument is mutually exclusive with I(lines), I(parents), I(before), I(after)
+        and I(src).
+    type: list
+    elements: dict
+    version_added: 5.1.0
+    suboptions:
+      lines:
+        description:
+          - The ordered set of commands that should be configured in the section.
+        type: list
+        elements: str
+        required: true
+        aliases:
+          - commands
+      parents:
+        description:
+          - The ordered set of parents that uniquely identify the section.
+        type: list
+        elements: str
+      before:
+        description:
+          - The ordered set of commands to push before the commands of the section,
+            if they need to be pushed.
+        type: list
+        elements: str
+      after:
+        description:
+          - The ordered set of commands to push after the commands of the section,
+            if they need to be pushed.
+        type: list
+        elements: str
   match:
     description:
       - Instructs the module on the way to perform the matching of the set of commands
@@ -157,6 +195,12 @@ options:
         never be copied to the startup-config.  If the argument is set to I(changed),
         then the running-config will only be copied to the startup-config if the task
         has made a change. I(changed) was added in Ansible 2.5.
+      - With I(modified), the running-config is known to be modified when its
+        C(Last configuration change) line is later than its C(NVRAM config last updated) line.
+        Otherwise, as the device clock may have gone backwards, the module checks
+        C(show archive config differences).  It only fetches and compares the whole
+        running-config and startup-config when neither of them tells, or when
+        I(diff_ignore_lines) is set.
     default: never
     choices:
       - always
@@ -248,6 +292,20 @@ EXAMPLES = """
     - interface Ethernet2
     - interface GigabitEthernet1
 
+- name: Configure several sections with a single running-config fetch and configure session
+  cisco.ios.ios_config:
+    blocks:
+      - lines:
+          - ip helper-address 172.26.1.10
+        parents: interface Ethernet1
+      - lines:
+          - ip helper-address 172.26.3.8
+        parents: interface Ethernet2
+      - lines:
+          - 10 permit ip host 192.0.2.1 any log
+        parents: ip access-list extended test
+        before: no ip access-list extended test
+
 - name: Configure policer in Scavenger class
   cisco.ios.ios_config:
     lines:
@@ -363,6 +421,7 @@ time:
   sample: "22:28:34"
 """
 import json
+import re
 
 from ansible.module_utils._text import to_text
 from ansible.module_utils.basic import AnsibleModule
@@ -380,6 +439,25 @@ from ansible_collections.cisco.ios.plugins.module_utils.network.ios.ios import (
 )
 
 
+# the lines of the running config telling when it was last changed and saved
+CONFIG_TIMES_COMMAND = (
+    "show running-config | include ^! (Last configuration change|NVRAM config last updated)"
+)
+CONFIG_TIME_RE = re.compile(
+    r"^! (Last configuration change|NVRAM config last updated) at"
+    r" (\d+):(\d+):(\d+)(?:\.\d+)? (\S+) \w+ (\w+) +(\d+) (\d+)",
+    re.M,
+)
+MONTHS = dict(
+    (month, index + 1)
+    for index, month in enumerate(
+        ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"),
+    )
+)
+CONFIG_DIFF_COMMAND = "show archive config differences"
+NO_CONFIG_DIFF_RE = re.compile(r"^!No changes were found", re.M)
+
+
 def check_args(module, warnings):
     if module.params["multiline_delimiter"]:
         if len(module.params["multiline_delimiter"]) != 1:
@@ -407,6 +485,63 @@ def get_candidate_config(module):
     return candidate
 
 
+def get_candidate_blocks(module):
+    blocks = []
+    for block in module.params["blocks"]:
+        candidate_obj = NetworkConfig(indent=1)
+        parents = block["parents"] or list()
+        candidate_obj.add(block["lines"], parents=parents)
+        blocks.append({"candidate": dumps(candidate_obj, "raw"), "path": block["parents"]})
+    return blocks
+
+
+def get_blocks_diff(module, connection, running):
+    """Diff all the blocks against a single parse of the running config
+
+    :returns: the commands of every block that needs to be pushed,
+              and the banners to push
+    """
+    try:
+        responses = connection.get_diff_blocks(
+            blocks=get_candidate_blocks(module),
+            running=running,
+            diff_match=module.params["match"],
+            diff_ignore_lines=module.params["diff_ignore_lines"],
+            diff_replace=module.params["replace"],
+        )
+    except ConnectionError as exc:
+        module.fail_json(msg=to_text(exc, errors="surrogate_then_replace"))
+
+    block_commands = []
+    banner_diff = {}
+    for block, response in zip(module.params["blocks"], responses):
+        if response["config_diff"]:
+            commands = response["config_diff"].split("\n")
+            if block["before"]:
+                commands[:0] = block["before"]
+            if block["after"]:
+                commands.extend(block["after"])
+            block_commands.append(commands)
+        banner_diff.update(response["banner_diff"])
+    return block_commands, banner_diff
+
+
+def edit_config_blocks(connection, block_commands):
+    # macros are pushed on their own, the commands of all
+    # the other blocks in a single configuration session
+    commands = []
+    for block in block_commands:
+        if block[0].startswith("macro name"):
+            if commands:
+                connection.edit_config(candidate=commands)
+                commands = []
+            connection.edit_macro(candidate=block)
+        else:
+            commands.extend(block)
+    if commands:
+        connection.edit_config(candidate=commands)
+
+
 def get_running_config(module, current_config=None, flags=None):
     running = module.params["running_config"]
     if not running:
@@ -417,6 +552,43 @@ def get_running_config(module, current_config=None, flags=None):
     return running
 
 
+def parse_config_times(output):
+    """The times of the last change and of the last save of the running
+    config, from its header lines, as (timezone, timestamp) tuples.
+    """
+    times = {}
+    for match in CONFIG_TIME_RE.finditer(output):
+        name, hour, minute, second, timezone, month, day, year = match.groups()
+        if month not in MONTHS:
+            continue
+        timestamp = (int(year), MONTHS[month], int(day), int(hour), int(minute), int(second))
+        times[name] = (timezone, timestamp)
+    return times.get("Last configuration change"), times.get("NVRAM config last updated")
+
+
+def get_config_modified(module):
+    """Tell if the running config changed since it was last saved, without
+    fetching the whole running and startup configs.
+
+    :returns: True or False, None when the device does not tell
+    """
+    output = to_text(run_commands(module, CONFIG_TIMES_COMMAND, check_rc=False)[0])
+    changed, saved = parse_config_times(output)
+    # the device clock can go backwards, like back to 1993 after a reload
+    # without NTP, and the startup-config can be replaced without a change
+    # of the running-config, so only a later change tells the config was
+    # modified, an earlier one is checked against the startup-config
+    if changed and saved and changed[0] == saved[0] and changed[1] > saved[1]:
+        return True
+
+    output = to_text(run_commands(module, CONFIG_DIFF_COMMAND, check_rc=False)[0])
+    if NO_CONFIG_DIFF_RE.search(output):
+        return False
+    if re.search(r"^\s*[+-]", output, re.M):
+        return True
+    return None
+
+
 def save_config(module, result):
     result["changed"] = True
     if not module.check_mode:
@@ -436,6 +608,16 @@ def main():
         parents=dict(type="list", elements="str"),
         before=dict(type="list", elements="str"),
         after=dict(type="list", elements="str"),
+        blocks=dict(
+            type="list",
+            elements="dict",
+            options=dict(
+                lines=dict(aliases=["commands"], type="list", elements="str", required=True),
+                parents=dict(type="list", elements="str"),
+                before=dict(type="list", elements="str"),
+                after=dict(type="list", elements="str"),
+            ),
+        ),
         match=dict(default="line", choices=["line", "strict", "exact", "none"]),
         replace=dict(default="line", choices=["line", "block"]),
         multiline_delimiter=dict(default="@"),
@@ -448,11 +630,19 @@ def main():
         diff_against=dict(choices=["startup", "intended", "running"]),
         diff_ignore_lines=dict(type="list", elements="str"),
     )
-    mutually_exclusive = [("lines", "src"), ("parents", "src")]
+    mutually_exclusive = [
+        ("lines", "src"),
+        ("parents", "src"),
+        ("blocks", "lines"),
+        ("blocks", "parents"),
+        ("blocks", "before"),
+        ("blocks", "after"),
+        ("blocks", "src"),
+    ]
     required_if = [
-        ("match", "strict", ["lines"]),
-        ("match", "exact", ["lines"]),
-        ("replace", "block", ["lines"]),
+        ("match", "strict", ["lines", "blocks"], True),
+        ("match", "exact", ["lines", "blocks"], True),
+        ("replace", "block", ["lines", "blocks"], True),
         ("diff_against", "intended", ["intended_config"]),
     ]
     module = AnsibleModule(
@@ -475,7 +665,24 @@ def main():
         config = NetworkConfig(indent=1, contents=contents)
         if module.params["backup"]:
             result["__backup__"] = contents
-    if any((module.params["lines"], module.params["src"])):
+    if module.params["blocks"]:
+        running = get_running_config(module, contents, flags=flags)
+        block_commands, banner_diff = get_blocks_diff(module, connection, running)
+        if block_commands or banner_diff:
+            commands = [command for block in block_commands for command in block]
+            result["commands"] = commands
+            result["updates"] = commands
+            result["banners"] = banner_diff
+
+            if not module.check_mode:
+                edit_config_blocks(connection, block_commands)
+                if banner_diff:
+                    connection.edit_banner(
+                        candidate=json.dumps(banner_diff),
+                        multiline_delimiter=module.params["multiline_delimiter"],
+                    )
+            result["changed"] = True
+    elif any((module.params["lines"], module.params["src"])):
         match = module.params["match"]
         replace = module.params["replace"]
         path = module.params["parents"]
@@ -520,10 +727,23 @@ def main():
     if module.params["save_when"] == "always":
         save_config(module, result)
     elif module.params["save_when"] == "modified":
-        output = run_commands(module, ["show running-config", "show startup-config"])
-        running_config = NetworkConfig(indent=1, contents=output[0], ignore_lines=diff_ignore_lines)
-        startup_config = NetworkConfig(indent=1, contents=output[1], ignore_lines=diff_ignore_lines)
-        if running_config.sha1 != startup_config.sha1:
+        modified = None
+        if not diff_ignore_lines:
+            modified = get_config_modified(module)
+        if modified is None:
+            output = run_commands(module, ["show running-config", "show startup-config"])
+            running_config = NetworkConfig(
+                indent=1,
+                contents=output[0],
+                ignore_lines=diff_ignore_lines,
+            )
+            startup_config = NetworkConfig(
+                indent=1,
+                contents=output[1],
+                ignore_lines=diff_ignore_lines,
+            )
+            modified = running_config.sha1 != startup_config.sha1
+        if modified:
             save_config(module, result)
     elif module.params["save_when"] == "changed" and result["changed"]:
         save_config(module, result)
@@ -564,7 +784,9 @@ def main():
                     {"changed": True, "diff": {"before": str(before), "after": str(after)}},
                 )
 
-    if result.get("changed") and any((module.params["src"], module.params["lines"])):
+    if result.get("changed") and any(
+        (module.params["src"], module.params["lines"], module.params["blocks"]),
+    ):
         msg = (
             "To ensure idempotency and correct diff the input configuration lines should be"
             " similar to how they appear if present in"
@@ -68,6 +68,65 @@ options:
     description: When 'True' a list of network resources for which resource modules are available will be provided.
     type: bool
     default: false
+  config_fingerprint:
+    description:
+      - The I(ansible_net_config_fingerprint) fact of a previous run, like the one kept
+        by a fact cache, or an empty string on the first run.
+      - The fingerprint is computed from the C(Last configuration change) marker of the
+        running config, fetched with a single filtered show command, and from the facts requested.
+      - When it matches, no other command is run and no config is parsed, the module
+        returns I(changed_since=false), the fingerprint and the I(previous_facts). The
+        volatile legacy facts, like the uptime, the free memory or the interface status,
+        are not refreshed then.
+      - Without I(previous_facts), the module then returns no other fact and warns about it,
+        the facts of the previous run must be kept by a fact cache.
+      - The facts are always gathered when the device has no marker, like before its first
+        config change since it booted, with a warning.
+    type: str
+    version_added: 5.1.0
+  previous_facts:
+    description:
+      - The facts returned by the run the I(config_fingerprint) was taken from, like the
+        registered C(ansible_facts) of that run.
+      - They are returned as they are when the I(config_fingerprint) still matches, and
+        ignored otherwise.
+    type: dict
+    version_added: 5.1.0
+  parse_cache:
+    description:
+      - Path of a file on the controller keeping the parse output of every section of
+        the running config, like a C(router bgp) or an C(interface) block, by hash of its text.
+      - The network resources are then only parsed from the sections changed since the
+        last run, the parse output of the other sections is read from the file.
+      - Use a file per host, the file only keeps the sections of the last config gathered.
+      - The file holds the parsed config in plain text and is only readable by its owner.
+        The sections that may hold a secret, like a password, a key or an SNMP community,
+        and the ones holding a value of an option marked no_log are never written to it,
+        they are parsed again on every run. Any other value of the config, like the
+        addresses and the descriptions, is written.
+      - The I(parse_workers) do not use it, the module warns when both are set.
+    type: path
+    version_added: 5.1.0
+  parse_workers:
+    description:
+      - The number of worker processes parsing the network resources in parallel, one
+        resource per worker, when more than one resource is gathered.
+      - The running config is fetched once by the module, the resources needing other
+        show commands are still parsed by the module process.
+      - With C(0), all the resources are parsed by the module process.
+      - When the workers cannot be started or one of them dies, all the resources are
+        parsed by the module process and a warning is returned.
+    type: int
+    default: 0
+    version_added: 5.1.0
+  parse_workers_threshold:
+    description:
+      - The number of lines the running config must have for the network resources to
+        be parsed by the I(parse_workers). Smaller configs are parsed by the module process,
+        where they parse faster than the workers start.
+    type: int
+    default: 5000
+    version_added: 5.1.0
 """
 
 EXAMPLES = """
@@ -90,6 +149,32 @@ EXAMPLES = """
     gather_subset: all
     gather_network_resources: all
 
+- name: Parse the resource facts of a large config with 4 worker processes
+  cisco.ios.ios_facts:
+    gather_subset: min
+    gather_network_resources: all
+    parse_workers: 4
+
+- name: Only parse the config sections changed since the last run
+  cisco.ios.ios_facts:
+    gather_subset: min
+    gather_network_resources: all
+    parse_cache: "~/.ansible/ios_parse_cache/{{ inventory_hostname }}.json"
+
+- name: Only gather the facts when the config changed since the last (cached) run
+  cisco.ios.ios_facts:
+    gather_subset: min
+    gather_network_resources: all
+    config_fingerprint: "{{ ansible_net_config_fingerprint | default('') }}"
+
+- name: Only gather the facts when the config changed since the registered run
+  cisco.ios.ios_facts:
+    gather_subset: min
+    gather_network_resources: all
+    config_fingerprint: "{{ ios_facts_run.ansible_facts.ansible_net_config_fingerprint | default('') }}"
+    previous_facts: "{{ ios_facts_run.ansible_facts | default({}) }}"
+  register: ios_facts_run
+
 - name: Gather only the interfaces resource facts and no legacy facts
   cisco.ios.ios_facts:
     gather_subset:
@@ -115,6 +200,16 @@ EXAMPLES = """
 """
 
 RETURN = """
+changed_since:
+  description: Whether the config changed since the I(config_fingerprint) given, the facts are only gathered when it did
+  returned: when config_fingerprint is supplied
+  type: bool
+
+ansible_net_config_fingerprint:
+  description: The fingerprint of the running config and of the facts requested, for the I(config_fingerprint) of the next run
+  returned: when config_fingerprint is supplied and the device has a config change marker
+  type: str
+
 ansible_net_gather_subset:
   description: The list of fact subsets collected from the device
   returned: always
@@ -237,13 +332,40 @@ def main():
     warnings = []
 
     ansible_facts = {}
+    result = {}
+    facts = Facts(module)
+    fingerprint = module.params.get("config_fingerprint")
+    if fingerprint is not None:
+        # fetched before the facts, a change made while they are gathered
+        # is seen by the next run
+        current = facts.get_config_fingerprint()
+        if not current:
+            warnings.append(
+                "The device shows no config change marker, the facts were gathered"
+                " regardless of the config_fingerprint",
+            )
+        result["changed_since"] = not current or current != fingerprint
+        if not result["changed_since"]:
+            previous_facts = module.params.get("previous_facts")
+            if previous_facts:
+                ansible_facts.update(previous_facts)
+            else:
+                warnings.append(
+                    "The config did not change since the config_fingerprint, no fact was"
+                    " gathered or returned, the facts of the previous run are only kept"
+                    " by a fact cache or the previous_facts",
+                )
+            ansible_facts["ansible_net_config_fingerprint"] = current
+            module.exit_json(ansible_facts=ansible_facts, warnings=warnings, **result)
+        if current:
+            ansible_facts["ansible_net_config_fingerprint"] = current
+
     if module.params.get("available_network_resources"):
         ansible_facts["available_network_resources"] = sorted(FACT_RESOURCE_SUBSETS.keys())
-    result = Facts(module).get_facts()
-    additional_facts, additional_warnings = result
+    additional_facts, additional_warnings = facts.get_facts()
     ansible_facts.update(additional_facts)
     warnings.extend(additional_warnings)
-    module.exit_json(ansible_facts=ansible_facts, warnings=warnings)
+    module.exit_json(ansible_facts=ansible_facts, warnings=warnings, **result)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,161 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2023 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+An indexed NetworkConfig for diffing very large configurations.
+It gives the same results as the netcommon NetworkConfig, but matches
+lines through hash lookups and only parses the running config blocks
+the candidate can be compared against.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+import re
+
+from bisect import bisect_left
+
+from ansible.module_utils._text import to_native
+from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.config import (
+    ConfigLine,
+    NetworkConfig,
+    ignore_line,
+)
+
+
+TOPLEVEL_RE = re.compile(r"\S")
+CHILDLINE_RE = re.compile(r"^\s*(.+)$")
+ENTRY_RE = re.compile(r"([{};])")
+
+
+class IndexedConfigLine(ConfigLine):
+    """A ConfigLine that computes its line once, from its parents"""
+
+    def __init__(self, raw, parents):
+        super(IndexedConfigLine, self).__init__(raw)
+        self._parents = parents
+        self._line = " ".join([parent.text for parent in parents] + [self.text])
+
+    @property
+    def line(self):
+        return self._line
+
+
+def diff_scope(candidate, match="line", path=None):
+    """The top level lines of the running config whose blocks
+    the candidate can be compared against.
+
+    :param candidate: the candidate NetworkConfig
+    :returns: a callable telling if the block of a top level line is
+              needed, None when all of them are
+    """
+    if path and match != "line":
+        return lambda text: text == path[0]
+    if match != "line":
+        return None
+
+    # a child line of the block of `text` can only match
+    # candidate lines starting with `text`
+    lines = sorted(item.line for item in candidate.items)
+
+    def scope(text):
+        prefix = text + " "
+        idx = bisect_left(lines, prefix)
+        return idx < len(lines) and lines[idx].startswith(prefix)
+
+    return scope
+
+
+class IndexedNetworkConfig(NetworkConfig):
+    """A NetworkConfig indexed by line and by path.
+
+    The items are parsed like the netcommon NetworkConfig does. With a
+    `scope`, the children of the top level lines outside of it are not
+    parsed at all. A line diff is O(n + m) for n candidate and m running
+    lines instead of O(n * m), blocks are looked up in O(1).
+    """
+
+    def __init__(self, indent=1, contents=None, ignore_lines=None, scope=None):
+        self._scope = scope
+        self._objects = {}
+        super(IndexedNetworkConfig, self).__init__(
+            indent=indent,
+            contents=contents,
+            ignore_lines=ignore_lines,
+        )
+
+    def parse(self, lines):
+        ancestors = list()
+        config = list()
+        objects = {}
+
+        indents = [0]
+        skip = False
+
+        for line in to_native(lines, errors="surrogate_or_strict").split("\n"):
+            if skip and line[:1].isspace():
+                continue
+
+            text = ENTRY_RE.sub("", line).strip()
+            if not text or ignore_line(text, self.comment_tokens):
+                continue
+
+            # handle top level commands
+            if TOPLEVEL_RE.match(line):
+                cfg = IndexedConfigLine(line, [])
+                ancestors = [cfg]
+                indents = [0]
+                skip = self._scope is not None and not self._scope(cfg.text)
+
+            # handle sub level commands
+            else:
+                line_indent = CHILDLINE_RE.match(line).start(1)
+
+                if line_indent < indents[-1]:
+                    while indents[-1] > line_indent:
+                        indents.pop()
+
+                if line_indent > indents[-1]:
+                    indents.append(line_indent)
+
+                curlevel = len(indents) - 1
+                parent_level = curlevel - 1
+
+                cfg = IndexedConfigLine(line, ancestors[:curlevel])
+
+                if curlevel <= len(ancestors):
+                    del ancestors[curlevel:]
+                    ancestors.append(cfg)
+                    ancestors[parent_level].add_child(cfg)
+
+            config.append(cfg)
+            objects.setdefault(tuple(cfg.parents) + (cfg.text,), cfg)
+
+        self._objects = objects
+        return config
+
+    def get_object(self, path):
+        return self._objects.get(tuple(path))
+
+    def _expand_block(self, configobj, S=None):
+        if S is None:
+            S = list()
+        visited = set(item.line for item in S)
+
+        def expand(obj):
+            S.append(obj)
+            visited.add(obj.line)
+            for child in obj._children:
+                if child.line not in visited:
+                    expand(child)
+
+        expand(configobj)
+        return S
+
+    def _diff_line(self, other):
+        lines = set(item.line for item in other)
+        return [item for item in self.items if item.line not in lines]
@@ -0,0 +1,95 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2023 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+A cache of device facts on the controller, shared by the connections
+and the plays that run against the same hosts.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+import json
+import os
+import re
+import tempfile
+
+from ansible.module_utils._text import to_text
+
+
+UPTIME_UNITS = {
+    "year": 365 * 24 * 3600,
+    "week": 7 * 24 * 3600,
+    "day": 24 * 3600,
+    "hour": 3600,
+    "minute": 60,
+    "second": 1,
+}
+
+
+def uptime_seconds(uptime):
+    """Convert an uptime string as shown by `show version`,
+    like `1 day, 16 hours, 15 minutes`, to seconds.
+    """
+    units = re.findall(r"(\d+)\s+(year|week|day|hour|minute|second)s?", uptime)
+    return sum(int(count) * UPTIME_UNITS[unit] for count, unit in units)
+
+
+class DeviceCache(object):
+    """A JSON file holding a record of cached facts for every host.
+
+    The file is read on every access and replaced atomically on every
+    update, so several connections can share it. Concurrent updates of
+    the same file may drop each other, which only costs a probe later.
+    """
+
+    def __init__(self, path):
+        self._path = os.path.abspath(os.path.expanduser(path))
+
+    def _load(self):
+        try:
+            with open(self._path) as cache_file:
+                data = json.load(cache_file)
+        except (IOError, OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def get(self, host):
+        """The cached record of `host`, an empty dict when there is none"""
+        record = self._load().get(to_text(host))
+        return record if isinstance(record, dict) else {}
+
+    def set(self, host, record):
+        """Replace the cached record of `host` with `record`"""
+        data = self._load()
+        data[to_text(host)] = record
+        self._dump(data)
+
+    def update(self, host, record):
+        """Merge `record` into the cached record of `host`"""
+        data = self._load()
+        data.setdefault(to_text(host), {}).update(record)
+        self._dump(data)
+
+    def invalidate(self, host):
+        """Drop the cached record of `host`"""
+        data = self._load()
+        if data.pop(to_text(host), None) is not None:
+            self._dump(data)
+
+    def _dump(self, data):
+        directory = os.path.dirname(self._path)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".device_cache")
+        try:
+            with os.fdopen(fd, "w") as tmp_file:
+                json.dump(data, tmp_file, sort_keys=True)
+            os.rename(tmp_path, self._path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
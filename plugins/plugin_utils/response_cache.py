@@ -0,0 +1,59 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2023 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+A cache of the responses of read-only commands, for the lifetime
+of a persistent connection.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+import re
+import time
+
+from collections import OrderedDict
+
+
+# show commands, except the ones writing their output to a file
+READ_ONLY_COMMAND_RE = re.compile(r"^sh(?:ow?)?\s(?!.*\|\s*(?:redirect|tee|append)\b)")
+
+
+class ResponseCache(object):
+    """Responses by command, evicted once they are older than `ttl`
+    seconds, or least recently used first once there are more than
+    `size` of them.
+    """
+
+    def __init__(self, ttl, size):
+        self.ttl = ttl
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._responses = OrderedDict()
+
+    def lookup(self, command):
+        """The cached response of `command`, None when there is none"""
+        entry = self._responses.pop(command, None)
+        if entry is None or time.time() - entry[0] > self.ttl:
+            self.misses += 1
+            return None
+        self._responses[command] = entry
+        self.hits += 1
+        return entry[1]
+
+    def populate(self, command, response):
+        self._responses.pop(command, None)
+        self._responses[command] = (time.time(), response)
+        while len(self._responses) > self.size:
+            self._responses.popitem(last=False)
+
+    def invalidate(self):
+        self._responses.clear()
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._responses)}
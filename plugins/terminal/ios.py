@@ -29,38 +29,106 @@ from ansible.module_utils._text import to_bytes, to_text
 from ansible.utils.display import Display
 from ansible_collections.ansible.netcommon.plugins.plugin_utils.terminal_base import TerminalBase
 
+from ansible_collections.cisco.ios.plugins.plugin_utils.device_cache import DeviceCache
+
 
 display = Display()
 
+# the error messages of the device, by name, as (name, regex, flags)
+STDERR_PATTERNS = [
+    ("error", rb"% ?Error", 0),
+    # ("message", rb"^% \w+", re.M),
+    ("bad_secret", rb"% ?Bad secret", 0),
+    ("bad_passwords", rb"[\r\n%] Bad passwords", 0),
+    ("invalid_input", rb"invalid input", re.I),
+    ("incomplete_command", rb"(?:incomplete|ambiguous) command", re.I),
+    ("connection_timed_out", rb"connection timed out", re.I),
+    ("not_found", rb"[^\r\n]+ not found", 0),
+    ("returned_error_code", rb"'[^']' +returned error code: ?\d+", 0),
+    ("bad_mask", rb"Bad mask", re.I),
+    ("overlaps", rb"% ?(?:\S+) ?overlaps with ?(?:\S+)", re.I),
+    ("error_message", rb"% ?(?:\S+) ?Error: ?[\s]+", re.I),
+    ("informational", rb"% ?(?:\S+) ?Informational: ?[\s]+", re.I),
+    ("authorization_failed", rb"Command authorization failed", 0),
+    ("command_rejected", rb"Command Rejected: ?[\s]+", re.I),
+    (
+        "address_family",
+        rb"% General session commands not allowed under the address family",
+        re.I,
+    ),
+    ("bgp_topology", rb"% BGP: Error initializing topology", re.I),
+    ("snmp_disabled", rb"%SNMP agent not enabled", re.I),
+]
+
+
+def combine_patterns(patterns):
+    """Compile (name, regex, flags) tuples into a single regex,
+    with a named group for every one of them.
+    """
+    groups = []
+    for name, pattern, flags in patterns:
+        if flags & re.I:
+            pattern = b"(?i:%s)" % pattern
+        groups.append(b"(?P<%s>%s)" % (to_bytes(name), pattern))
+    return re.compile(b"|".join(groups))
+
+
+STDERR_RE = combine_patterns(STDERR_PATTERNS)
+
+
+class StderrMatcher(object):
+    """The terminal_stderr_re patterns as a single regex.
+
+    network_cli searches the whole response buffered so far for errors
+    every time it receives more output, with every regex in turn. This
+    runs a single search and, when the response extends the one searched
+    last, only over the new bytes, starting from the last line that was
+    incomplete. None of the patterns span lines, so the result is the
+    same as searching the whole response.
+
+    `pattern` is the regex of the error that matched last, so it is
+    logged like before; `name` is its name in STDERR_PATTERNS.
+    """
+
+    def __init__(self, patterns):
+        self.regex = combine_patterns(patterns)
+        self.flags = self.regex.flags
+        self.pattern = self.regex.pattern
+        self.name = None
+        self._patterns = dict((name, pattern) for name, pattern, _flags in patterns)
+        self._response = None
+        self._offset = 0
+        self._match = None
+
+    def search(self, response):
+        offset = 0
+        if self._response is not None and response.startswith(self._response):
+            if self._match:
+                return self._match
+            offset = self._offset
+
+        match = self.regex.search(response, offset)
+        self._response = response
+        self._offset = max(response.rfind(b"\n"), response.rfind(b"\r"), 0)
+        self._match = match
+        if match:
+            self.name = match.lastgroup
+            self.pattern = self._patterns[self.name]
+        return match
+
 
 class TerminalModule(TerminalBase):
     terminal_stdout_re = [re.compile(rb"[\r\n]?[\w\+\-\.:\/\[\]]+(?:\([^\)]+\)){0,3}(?:[>#]) ?$")]
 
     privilege_level_re = re.compile(r"Current privilege level is (\d+)$")
 
-    terminal_stderr_re = [
-        re.compile(rb"% ?Error"),
-        # re.compile(rb"^% \w+", re.M),
-        re.compile(rb"% ?Bad secret"),
-        re.compile(rb"[\r\n%] Bad passwords"),
-        re.compile(rb"invalid input", re.I),
-        re.compile(rb"(?:incomplete|ambiguous) command", re.I),
-        re.compile(rb"connection timed out", re.I),
-        re.compile(rb"[^\r\n]+ not found"),
-        re.compile(rb"'[^']' +returned error code: ?\d+"),
-        re.compile(rb"Bad mask", re.I),
-        re.compile(rb"% ?(\S+) ?overlaps with ?(\S+)", re.I),
-        re.compile(rb"% ?(\S+) ?Error: ?[\s]+", re.I),
-        re.compile(rb"% ?(\S+) ?Informational: ?[\s]+", re.I),
-        re.compile(rb"Command authorization failed"),
-        re.compile(rb"Command Rejected: ?[\s]+", re.I),
-        re.compile(rb"% General session commands not allowed under the address family", re.I),
-        re.compile(rb"% BGP: Error initializing topology", re.I),
-        re.compile(rb"%SNMP agent not enabled", re.I),
-    ]
+    terminal_stderr_re = [StderrMatcher(STDERR_PATTERNS)]
 
     terminal_config_prompt = re.compile(r"^.+\(config(-.*)?\)#$")
 
+    # whether the privilege level of the connection was read from the cache
+    privilege_cached = False
+
     def get_privilege_level(self):
         try:
             cmd = {"command": "show privilege"}
@@ -77,31 +145,136 @@ class TerminalModule(TerminalBase):
         return int(prompt.group(1))
 
     def on_open_shell(self):
-        _is_sdWan = False  # initialize to false for default IOS execution
+        cache = self._device_cache()
+        terminal = self._cached_terminal(cache)
+        if terminal.get("dialect"):
+            try:
+                self._set_terminal(terminal)
+                return
+            except AnsibleConnectionFailure:
+                display.vvvv("cached terminal settings failed, probing the terminal")
+
+        terminal = self._probe_terminal()
+        if cache:
+            self._cache_terminal(cache, terminal)
+
+    def _probe_terminal(self):
+        """Find the terminal commands the device accepts, and set the terminal with them.
+
+        :returns: the dialect of the device, ios or sdwan, and the terminal width
+                  that was set, None if none was
+        """
+        terminal = {"dialect": "ios", "width": None}
         try:
             self._exec_cli_command(b"terminal length 0")
         except AnsibleConnectionFailure:
             try:
                 self._exec_cli_command(b"screen-length 0")  # support to SD-WAN mode
-                _is_sdWan = True
+                terminal["dialect"] = "sdwan"
             except AnsibleConnectionFailure:  # fails as length required for handling prompt
                 raise AnsibleConnectionFailure("unable to set terminal parameters")
         try:
-            if _is_sdWan:
+            if terminal["dialect"] == "sdwan":
                 self._exec_cli_command(b"screen-width 512")  # support to SD-WAN mode
+                terminal["width"] = "512"
             else:
                 self._exec_cli_command(b"terminal width 512")
+                terminal["width"] = "512"
                 try:
                     self._exec_cli_command(b"terminal width 0")
+                    terminal["width"] = "0"
                 except AnsibleConnectionFailure:
                     pass
         except AnsibleConnectionFailure:
             display.display(
                 "WARNING: Unable to set terminal/screen width, command responses may be truncated",
             )
+        return terminal
+
+    def _set_terminal(self, terminal):
+        """Set the terminal with the commands the device accepted last time"""
+        if terminal["dialect"] == "sdwan":
+            self._exec_cli_command(b"screen-length 0")
+            width_cmd = b"screen-width %s"
+        else:
+            self._exec_cli_command(b"terminal length 0")
+            width_cmd = b"terminal width %s"
+
+        if terminal.get("width"):
+            self._exec_cli_command(width_cmd % to_bytes(terminal["width"]))
+        else:
+            display.display(
+                "WARNING: Unable to set terminal/screen width, command responses may be truncated",
+            )
+
+    def _device_cache(self):
+        """The cache of the device_info_cache option of the cliconf plugin,
+        None when it is not set.
+        """
+        try:
+            path = self._connection.cliconf.get_option("device_info_cache")
+        except (AttributeError, KeyError):
+            return None
+        return DeviceCache(path) if path else None
+
+    def _connection_option(self, option):
+        try:
+            value = self._connection.get_option(option)
+        except KeyError:
+            return None
+        return to_text(value) if value is not None else None
+
+    def _cached_terminal(self, cache):
+        if not cache:
+            return {}
+        terminal = cache.get(self._connection_option("host")).get("terminal")
+        return terminal if isinstance(terminal, dict) else {}
+
+    def _cache_terminal(self, cache, terminal):
+        cached = self._cached_terminal(cache)
+        cached.update(terminal)
+        try:
+            cache.update(self._connection_option("host"), {"terminal": cached})
+        except (IOError, OSError) as exc:
+            display.vvvv("unable to cache the terminal settings: %s" % to_text(exc))
+
+    def _privilege_level(self, prompt, cache=None):
+        """The privilege level at `prompt`. It is read from the cache
+        when the same user was at level 15 at the same prompt before.
+        """
+        user = self._connection_option("remote_user")
+        privilege = self._cached_terminal(cache).get("privilege") or {}
+        if privilege.get("prompt") == to_text(prompt) and privilege.get("user") == user:
+            self.privilege_cached = True
+            return privilege["level"]
+
+        level = self.get_privilege_level()
+        if cache and level == 15:
+            privilege = {"prompt": to_text(prompt), "user": user, "level": level}
+            self._cache_terminal(cache, {"privilege": privilege})
+        return level
+
+    def check_privilege(self):
+        """Drop the cached privilege level, after a command failed, and
+        read it again from the device.
+
+        :returns: the privilege level
+        """
+        self.privilege_cached = False
+        cache = self._device_cache()
+        if cache:
+            terminal = self._cached_terminal(cache)
+            if terminal.pop("privilege", None) is not None:
+                try:
+                    cache.update(self._connection_option("host"), {"terminal": terminal})
+                except (IOError, OSError) as exc:
+                    display.vvvv("unable to cache the terminal settings: %s" % to_text(exc))
+        return self.get_privilege_level()
 
     def on_become(self, passwd=None):
-        if self._get_prompt().endswith(b"#") and self.get_privilege_level() == 15:
+        cache = self._device_cache()
+        prompt = self._get_prompt()
+        if prompt.endswith(b"#") and self._privilege_level(prompt, cache) == 15:
             return
 
         cmd = {"command": "enable"}
@@ -114,7 +287,7 @@ class TerminalModule(TerminalBase):
         try:
             self._exec_cli_command(to_bytes(json.dumps(cmd), errors="surrogate_or_strict"))
             prompt = self._get_prompt()
-            privilege_level = self.get_privilege_level()
+            privilege_level = self._privilege_level(prompt, cache)
         except AnsibleConnectionFailure as e:
             prompt = self._get_prompt()
             raise AnsibleConnectionFailure(
@@ -0,0 +1,247 @@
+#
+# (c) 2023 Red Hat Inc.
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+import ast
+import glob
+import importlib
+import inspect
+import os
+import re
+import shutil
+import stat
+import tempfile
+
+from os import path
+
+from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.rm_base import (
+    network_template,
+)
+
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.network_template import (
+    NetworkTemplate,
+    build_dispatch_index,
+    leading_keyword,
+)
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.parse_cache import (
+    ParseCache,
+    split_sections,
+)
+from ansible_collections.cisco.ios.tests.unit.compat import unittest
+
+
+UNIT_TESTS = path.abspath(path.join(path.dirname(__file__), "..", "..", "..", ".."))
+RM_TEMPLATES = "ansible_collections.cisco.ios.plugins.module_utils.network.ios.rm_templates"
+
+
+def fixture_configs():
+    """Every multi-line config used by the module tests and fixtures"""
+    configs = set()
+    for filename in glob.glob(path.join(UNIT_TESTS, "modules", "network", "ios", "*.py")):
+        with open(filename) as f:
+            tree = ast.parse(f.read())
+        for node in ast.walk(tree):
+            value = getattr(node, "value", getattr(node, "s", None))
+            if isinstance(value, str) and "\n" in value:
+                configs.add(value)
+    for filename in glob.glob(path.join(UNIT_TESTS, "modules", "network", "ios", "fixtures", "*")):
+        if path.isfile(filename):
+            with open(filename) as f:
+                configs.add(f.read())
+    return sorted(configs)
+
+
+def fixture_lines():
+    """Every config line used by the module tests and fixtures"""
+    lines = set()
+    for config in fixture_configs():
+        lines.update(config.splitlines())
+    return sorted(lines)
+
+
+class ParseCacheModule(object):
+    def __init__(self, cache):
+        self.params = {"state": "parsed"}
+        self._ios_parse_cache = cache
+
+
+def templates():
+    rm_templates = importlib.import_module(RM_TEMPLATES)
+    for filename in sorted(glob.glob(path.join(path.dirname(rm_templates.__file__), "*.py"))):
+        name = path.basename(filename)[:-3]
+        if name == "__init__":
+            continue
+        module = importlib.import_module("%s.%s" % (RM_TEMPLATES, name))
+        for dummy, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ == module.__name__ and hasattr(cls, "PARSERS"):
+                yield cls
+
+
+def templates_by_name():
+    return dict((tmplt.__name__, tmplt) for tmplt in templates())
+
+
+class TestLeadingKeyword(unittest.TestCase):
+    def test_leading_keyword(self):
+        self.assertEqual(leading_keyword(r"^hostname\s(?P<hostname>\S+)"), "hostname")
+        self.assertEqual(leading_keyword(r"\s+neighbor\s+(?P<id>\S+)"), "neighbor")
+        self.assertEqual(leading_keyword(r"(?P<neg>\s*)ip\sroute"), "ip")
+        self.assertEqual(leading_keyword(r"^\s*no-auto-summary$"), "no-auto-summary")
+        self.assertEqual(
+            leading_keyword(re.compile(r"""^bgp(\slog)?\s+(?P<x>\d+)""", re.VERBOSE)),
+            "bgp",
+        )
+
+    def test_leading_keyword_wildcard(self):
+        # prefixes of a token do not key a parser
+        self.assertIsNone(leading_keyword(r"^ip"))
+        self.assertIsNone(leading_keyword(r"^ip(?P<x>\S+)"))
+        self.assertIsNone(leading_keyword(r"^(?P<neg>no\s)?shutdown"))
+        self.assertIsNone(leading_keyword(r"^permit|deny"))
+        self.assertIsNone(leading_keyword(r"^(permit|deny)\s"))
+        self.assertIsNone(leading_keyword(r"\s+match*"))
+        self.assertIsNone(leading_keyword(re.compile(r"^hostname\s", re.IGNORECASE)))
+        self.assertIsNone(leading_keyword(r"^\S+\s"))
+
+
+class TestNetworkTemplate(unittest.TestCase):
+    def test_dispatch_index_matches_linear_scan(self):
+        lines = fixture_lines()
+        for tmplt in templates():
+            parsers = tmplt.PARSERS
+            index, anywhere = build_dispatch_index(parsers)
+            for line in lines:
+                expected = [p for p in parsers if re.match(p["getval"], line)][:1]
+                tokens = line.split(None, 1)
+                candidates = index.get(tokens[0], anywhere) if tokens else anywhere
+                matched = [p for p in candidates if re.match(p["getval"], line)][:1]
+                self.assertEqual(matched, expected, "%s: %s" % (tmplt.__name__, line))
+
+    def test_parse(self):
+        lines = [
+            "router bgp 65000",
+            " bgp router-id 192.0.2.1",
+            " bgp log-neighbor-changes",
+            " neighbor 198.51.100.1 remote-as 65001",
+            " neighbor 198.51.100.1 description merged neighbor",
+            " timers bgp 100 200 150",
+        ]
+        tmplt = templates_by_name()["Bgp_globalTemplate"]
+        self.assertEqual(
+            NetworkTemplate(lines=lines, tmplt=tmplt()).parse(),
+            network_template.NetworkTemplate(lines=lines, tmplt=tmplt()).parse(),
+        )
+
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = path.join(self.tmpdir, "cache", "R1.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _parse(self, tmplt, lines, cache=None):
+        module = ParseCacheModule(cache) if cache else None
+        return NetworkTemplate(lines=lines, tmplt=tmplt(), module=module).parse()
+
+    def test_split_sections(self):
+        self.assertEqual(
+            split_sections([" orphan", "interface Loopback0", " no ip address", "!", "end"]),
+            [[" orphan"], ["interface Loopback0", " no ip address"], ["!"], ["end"]],
+        )
+
+    def test_parse_sections_matches_parse(self):
+        configs = [config.splitlines() for config in fixture_configs()]
+        for tmplt in templates():
+            for lines in configs:
+                try:
+                    expected = self._parse(tmplt, lines)
+                except Exception as exc:
+                    # configs the template was not written for
+                    with self.assertRaises(type(exc)):
+                        self._parse(tmplt, lines, ParseCache(self.path))
+                    continue
+                cold = ParseCache(self.path)
+                self.assertEqual(self._parse(tmplt, lines, cold), expected, tmplt.__name__)
+                cold.save()
+                warm = ParseCache(self.path)
+                self.assertEqual(self._parse(tmplt, lines, warm), expected, tmplt.__name__)
+
+    def test_parse_cache_changed_sections(self):
+        tmplt = templates_by_name()["InterfacesTemplate"]
+        lines = []
+        for idx in range(50):
+            lines.extend(["interface Loopback%d" % idx, " description lo%d" % idx, " shutdown"])
+        cache = ParseCache(self.path)
+        self._parse(tmplt, lines, cache)
+        cache.save()
+        self.assertEqual((cache.hits, cache.misses), (0, 50))
+
+        lines[1] = " description changed"
+        cache = ParseCache(self.path)
+        result = self._parse(tmplt, lines, cache)
+        self.assertEqual((cache.hits, cache.misses), (49, 1))
+        self.assertEqual(result["Loopback0"]["description"], "changed")
+        self.assertEqual(result, self._parse(tmplt, lines))
+
+        # the entries of the replaced section are dropped
+        cache.save()
+        cache = ParseCache(self.path)
+        self.assertEqual(len(cache._data[cache.namespace(tmplt())]), 50)
+
+    def test_parse_cache_no_log_values(self):
+        tmplt = templates_by_name()["InterfacesTemplate"]
+        lines = []
+        for idx in range(3):
+            lines.extend(["interface Loopback%d" % idx, " description lo%d" % idx])
+        lines[3] = " description s3cr3t"
+        cache = ParseCache(self.path)
+        self._parse(tmplt, lines, cache)
+        cache.save(set(["s3cr3t"]))
+        with open(self.path) as cache_file:
+            self.assertNotIn("s3cr3t", cache_file.read())
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o600)
+
+        cache = ParseCache(self.path)
+        result = self._parse(tmplt, lines, cache)
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+        self.assertEqual(result["Loopback1"]["description"], "s3cr3t")
+
+    def test_parse_cache_secrets(self):
+        tmplt = templates_by_name()["Snmp_serverTemplate"]
+        lines = ["snmp-server community S3cr3tC0mm RO", "snmp-server location lab"]
+        cache = ParseCache(self.path)
+        self.assertEqual(self._parse(tmplt, lines, cache), self._parse(tmplt, lines))
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+        cache.save()
+        with open(self.path) as cache_file:
+            data = cache_file.read()
+        self.assertNotIn("S3cr3tC0mm", data)
+        self.assertIn("lab", data)
+
+    def test_parse_cache_corrupted(self):
+        with open(path.join(self.tmpdir, "corrupted.json"), "w") as f:
+            f.write("{not json")
+        cache = ParseCache(path.join(self.tmpdir, "corrupted.json"))
+        tmplt = templates_by_name()["HostnameTemplate"]
+        self.assertEqual(self._parse(tmplt, ["hostname R1"], cache), {"hostname": "R1"})
@@ -0,0 +1,218 @@
+#
+# (c) 2023 Red Hat Inc.
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+import re
+
+from textwrap import dedent
+
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.running_config import (
+    InterfaceBlockIndex,
+    RunningConfigSnapshot,
+    filter_section,
+    get_interfaces_config,
+    parse_config_tree,
+    patch_config_tree,
+    replace_sections,
+    section_regex,
+)
+from ansible_collections.cisco.ios.tests.unit.compat import unittest
+from ansible_collections.cisco.ios.tests.unit.compat.mock import MagicMock
+
+
+RUNNING_CONFIG = dedent(
+    """\
+    interface GigabitEthernet1
+     description uplink
+     no ip address
+     shutdown
+    !
+    router bgp 65000
+     bgp log-neighbor-changes
+     neighbor 192.0.2.1 remote-as 65001
+     neighbor 192.0.2.1 description peer
+     !
+     address-family ipv4
+      neighbor 192.0.2.1 activate
+     exit-address-family
+    !
+    logging host 192.0.2.10
+    """,
+).splitlines()
+
+
+def first_token_identity(context, line):
+    """Lines sharing their first token set the same attribute"""
+    return line.split()[0]
+
+
+class TestPatchConfigTree(unittest.TestCase):
+    def test_parse_config_tree(self):
+        tree = parse_config_tree(RUNNING_CONFIG)
+        self.assertEqual(tree.lines(), RUNNING_CONFIG)
+        self.assertEqual(tree.children[0].text, "interface GigabitEthernet1")
+        self.assertEqual(len(tree.children[0].children), 3)
+
+    def test_patch_config_tree(self):
+        tree = parse_config_tree(RUNNING_CONFIG)
+        touched = patch_config_tree(
+            tree,
+            [
+                "interface GigabitEthernet1",
+                "ip address 192.0.2.1 255.255.255.0",
+                "no shutdown",
+                "interface Loopback1",
+                "description new",
+                "router bgp 65000",
+                "no neighbor 192.0.2.1",
+                "address-family ipv4",
+                "neighbor 192.0.2.2 activate",
+                "exit-address-family",
+                "bgp router-id 192.0.2.100",
+                "no logging host 192.0.2.10",
+                "logging host 192.0.2.20",
+            ],
+        )
+        self.assertEqual(
+            touched,
+            set(
+                [
+                    "interface GigabitEthernet1",
+                    "interface Loopback1",
+                    "router bgp 65000",
+                    "logging host 192.0.2.10",
+                    "logging host 192.0.2.20",
+                ],
+            ),
+        )
+        self.assertEqual(
+            tree.lines(),
+            dedent(
+                """\
+                interface GigabitEthernet1
+                 description uplink
+                 ip address 192.0.2.1 255.255.255.0
+                !
+                router bgp 65000
+                 bgp log-neighbor-changes
+                 !
+                 address-family ipv4
+                  neighbor 192.0.2.1 activate
+                  neighbor 192.0.2.2 activate
+                 exit-address-family
+                 bgp router-id 192.0.2.100
+                !
+                interface Loopback1
+                 description new
+                logging host 192.0.2.20
+                """,
+            ).splitlines(),
+        )
+
+    def test_patch_config_tree_remove_context(self):
+        tree = parse_config_tree(RUNNING_CONFIG)
+        patch_config_tree(tree, ["no router bgp 65000", "default interface GigabitEthernet1"])
+        self.assertEqual(
+            tree.lines(),
+            ["interface GigabitEthernet1", "!", "!", "logging host 192.0.2.10"],
+        )
+
+    def test_patch_config_tree_identity(self):
+        tree = parse_config_tree(RUNNING_CONFIG)
+        patch_config_tree(
+            tree,
+            ["interface GigabitEthernet1", "description downlink"],
+            identity=first_token_identity,
+        )
+        self.assertEqual(
+            tree.lines()[:4],
+            ["interface GigabitEthernet1", " description downlink", " no ip address", " shutdown"],
+        )
+
+    def test_replace_sections(self):
+        tree = parse_config_tree(RUNNING_CONFIG)
+        regex = section_regex(["interface GigabitEthernet1", "logging host 192.0.2.10"])
+        self.assertEqual(regex, r"^interface GigabitEthernet1|^logging host 192\.0\.2\.10")
+        sections = parse_config_tree(["interface GigabitEthernet1", " description device"])
+        replace_sections(tree, re.compile(regex), sections)
+        self.assertEqual(
+            tree.lines()[:3], ["interface GigabitEthernet1", " description device", "!"]
+        )
+        self.assertNotIn("logging host 192.0.2.10", tree.lines())
+
+    def test_section_regex_ios_specials(self):
+        self.assertEqual(section_regex(["route-map map_1 permit 10"]), "^route-map map.1 permit 10")
+
+
+INTERFACES_CONFIG = dedent(
+    """\
+    hostname Router
+    interface GigabitEthernet1
+     description uplink
+     ip access-group acl_in in
+    !
+    interface Port-channel10
+     no ip address
+    interface-template nope
+    !
+    router ospf 1
+     passive-interface GigabitEthernet1
+    interface Loopback0
+     ipv6 traffic-filter acl6 out
+     ip address 192.0.2.1 255.255.255.255
+    interface GigabitEthernet1
+     shutdown
+    end
+    """,
+).splitlines()
+
+
+class TestInterfaceBlockIndex(unittest.TestCase):
+    def test_interface_block_index_view(self):
+        index = InterfaceBlockIndex(INTERFACES_CONFIG)
+        section = filter_section(INTERFACES_CONFIG, re.compile("^interface"))
+        self.assertEqual(index.view(), "\n".join(section))
+
+    def test_interface_block_index_child_regex(self):
+        index = InterfaceBlockIndex(INTERFACES_CONFIG)
+        regex = re.compile("ip access-group|ipv6 traffic-filter")
+        self.assertEqual(
+            index.view(regex).splitlines(),
+            [
+                "interface GigabitEthernet1",
+                " ip access-group acl_in in",
+                "interface Loopback0",
+                " ipv6 traffic-filter acl6 out",
+            ],
+        )
+
+    def test_get_interfaces_config(self):
+        connection = MagicMock()
+        connection.get.return_value = "\n".join(INTERFACES_CONFIG)
+        snapshot = RunningConfigSnapshot(connection)
+        first = get_interfaces_config(snapshot)
+        self.assertIs(snapshot.interface_blocks, snapshot.interface_blocks)
+        self.assertEqual(get_interfaces_config(snapshot), first)
+        connection.get.assert_called_once_with("show running-config")
+
+        get_interfaces_config(connection, "show running-config | include ^interface")
+        connection.get.assert_called_with("show running-config | include ^interface")
@@ -0,0 +1,147 @@
+#
+# (c) 2023 Red Hat Inc.
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+import sys
+
+from textwrap import dedent
+
+from ansible.module_utils import basic
+from ansible_collections.ansible.netcommon.plugins.module_utils.network.common import utils
+from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.rm_base import (
+    network_template,
+)
+
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.facts import (
+    FACT_RESOURCE_SUBSETS,
+    ParseWorkerModule,
+)
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.network_template import (
+    NetworkTemplate,
+)
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.validation import (
+    coerce_config,
+)
+from ansible_collections.cisco.ios.tests.unit.compat import unittest
+from ansible_collections.cisco.ios.tests.unit.compat.mock import patch
+
+from .test_network_template import fixture_configs
+
+
+FACTS = "ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts."
+
+
+def full_validation():
+    """Patch the facts classes back to the validation through an AnsibleModule"""
+    patchers = [
+        patch.object(
+            NetworkTemplate,
+            "validate_config",
+            network_template.NetworkTemplate.validate_config,
+        ),
+    ]
+    for name, module in list(sys.modules.items()):
+        if name.startswith(FACTS) and getattr(module, "coerce_config", None) is coerce_config:
+            patchers.append(patch.object(module, "coerce_config", utils.validate_config))
+    return patchers
+
+
+def gather(facts_cls, config):
+    module = ParseWorkerModule()
+    ansible_facts = {"ansible_network_resources": {}}
+    facts_cls(module).populate_facts(None, ansible_facts, data=config)
+    return ansible_facts["ansible_network_resources"], module.no_log_values
+
+
+class TestCoerceConfig(unittest.TestCase):
+    def test_coerce_config(self):
+        spec = {
+            "config": {
+                "type": "list",
+                "elements": "dict",
+                "options": {
+                    "name": {"type": "str"},
+                    "mtu": {"type": "int"},
+                    "enabled": {"type": "bool", "default": True},
+                    "vlans": {"type": "list", "elements": "int"},
+                    "key": {"type": "dict", "options": {"id": {"type": "int"}}},
+                    "key_id": {"type": "int", "aliases": ["id"]},
+                },
+            },
+        }
+        data = {"config": [{"name": 1, "mtu": "1500", "vlans": ["10", 20], "key": {}, "id": "7"}]}
+        self.assertEqual(coerce_config(spec, data), utils.validate_config(spec, data))
+        self.assertEqual(
+            data["config"][0],
+            {
+                "name": "1",
+                "mtu": 1500,
+                "enabled": True,
+                "vlans": [10, 20],
+                "key": {"id": None},
+                "key_id": 7,
+                "id": "7",
+            },
+        )
+
+    def test_coerce_config_apply_defaults(self):
+        spec = {
+            "config": {
+                "type": "dict",
+                "options": {
+                    "timers": {
+                        "type": "dict",
+                        "apply_defaults": True,
+                        "options": {"hello": {"type": "int", "default": 10}},
+                    },
+                },
+            },
+        }
+        self.assertEqual(
+            coerce_config(spec, {"config": {}}),
+            {"config": {"timers": {"hello": 10}}},
+        )
+
+    def test_fast_path_matches_full_validation(self):
+        configs = sorted(set(dedent(config) for config in fixture_configs()))
+        compared = set()
+        for name in sorted(FACT_RESOURCE_SUBSETS):
+            facts_cls = FACT_RESOURCE_SUBSETS[name]
+            for config in configs:
+                args = basic._ANSIBLE_ARGS
+                patchers = full_validation()
+                for patcher in patchers:
+                    patcher.start()
+                try:
+                    expected = gather(facts_cls, config)
+                except (Exception, SystemExit):
+                    # the parse output of an unrelated config may not
+                    # even pass the full validation
+                    continue
+                finally:
+                    for patcher in patchers:
+                        patcher.stop()
+                    basic._ANSIBLE_ARGS = args
+                self.assertEqual(gather(facts_cls, config), expected, "%s: %r" % (name, config))
+                if any(expected[0].values()):
+                    compared.add(name)
+        self.assertEqual(compared, set(FACT_RESOURCE_SUBSETS))
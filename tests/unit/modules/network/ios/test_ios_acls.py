@@ -10,8 +10,9 @@ __metaclass__ = type
 
 from textwrap import dedent
 
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.config.acls.acls import Acls
 from ansible_collections.cisco.ios.plugins.modules import ios_acls
-from ansible_collections.cisco.ios.tests.unit.compat.mock import patch
+from ansible_collections.cisco.ios.tests.unit.compat.mock import MagicMock, patch
 from ansible_collections.cisco.ios.tests.unit.modules.utils import set_module_args
 
 from .ios_module import TestIosModule
@@ -1477,3 +1478,296 @@ class TestIosAclsModule(TestIosModule):
         ]
         result = self.execute_module(changed=False)
         self.assertEqual(sorted(result["rendered"]), sorted(commands))
+
+    def test_ios_acls_merged_unsequenced_idempotent(self):
+        self.execute_show_command.return_value = dedent(
+            """\
+            Extended IP access list test_acl
+                10 permit tcp host 192.0.2.1 any eq www
+                20 deny ip any any
+            """,
+        )
+        set_module_args(
+            dict(
+                config=[
+                    dict(
+                        afi="ipv4",
+                        acls=[
+                            dict(
+                                name="test_acl",
+                                aces=[
+                                    dict(
+                                        grant="deny",
+                                        protocol="ip",
+                                        source=dict(any=True),
+                                        destination=dict(any=True),
+                                    ),
+                                    dict(
+                                        grant="permit",
+                                        protocol="udp",
+                                        source=dict(any=True),
+                                        destination=dict(any=True),
+                                    ),
+                                ],
+                            ),
+                        ],
+                    ),
+                ],
+                state="merged",
+            ),
+        )
+        result = self.execute_module(changed=True)
+        self.assertEqual(
+            result["commands"],
+            ["ip access-list extended test_acl", "permit udp any any"],
+        )
+
+    def test_ios_acls_replaced_unsequenced_insert(self):
+        self.execute_show_command.return_value = dedent(
+            """\
+            Extended IP access list test_acl
+                10 permit tcp host 192.0.2.1 any eq www
+                20 permit udp any any
+                30 permit tcp host 192.0.2.2 any eq www
+                40 deny ip any any
+            """,
+        )
+        aces = [
+            dict(
+                grant="permit",
+                protocol="tcp",
+                source=dict(host="192.0.2.1"),
+                destination=dict(any=True, port_protocol=dict(eq="www")),
+            ),
+            dict(
+                grant="permit",
+                protocol="tcp",
+                source=dict(host="192.0.2.2"),
+                destination=dict(any=True, port_protocol=dict(eq="80")),
+            ),
+            dict(
+                grant="permit", protocol="icmp", source=dict(any=True), destination=dict(any=True)
+            ),
+            dict(grant="deny", protocol="ip", source=dict(any=True), destination=dict(any=True)),
+        ]
+        set_module_args(
+            dict(
+                config=[dict(afi="ipv4", acls=[dict(name="test_acl", aces=aces)])],
+                state="replaced",
+            ),
+        )
+        result = self.execute_module(changed=True)
+        self.assertEqual(
+            result["commands"],
+            [
+                "ip access-list extended test_acl",
+                "no 20 permit udp any any",
+                "35 permit icmp any any",
+            ],
+        )
+
+    def test_ios_acls_replaced_unsequenced_resequence(self):
+        self.execute_show_command.return_value = dedent(
+            """\
+            Extended IP access list test_acl
+                1 permit tcp host 192.0.2.1 any eq www
+                2 permit tcp host 192.0.2.2 any eq www
+                3 permit tcp host 192.0.2.3 any eq www
+                4 deny ip any any
+            """,
+        )
+        aces = [
+            dict(
+                grant="permit", protocol="icmp", source=dict(any=True), destination=dict(any=True)
+            ),
+        ]
+        for host in range(1, 4):
+            aces.append(
+                dict(
+                    grant="permit",
+                    protocol="tcp",
+                    source=dict(host="192.0.2.{0}".format(host)),
+                    destination=dict(any=True, port_protocol=dict(eq="www")),
+                ),
+            )
+            if host == 2:
+                aces.extend(
+                    [
+                        dict(
+                            grant="permit",
+                            protocol="udp",
+                            source=dict(any=True),
+                            destination=dict(any=True),
+                        ),
+                        dict(
+                            grant="permit",
+                            protocol="gre",
+                            source=dict(any=True),
+                            destination=dict(any=True),
+                        ),
+                    ],
+                )
+        aces.append(
+            dict(grant="deny", protocol="ip", source=dict(any=True), destination=dict(any=True)),
+        )
+        set_module_args(
+            dict(
+                config=[dict(afi="ipv4", acls=[dict(name="test_acl", aces=aces)])],
+                state="replaced",
+            ),
+        )
+        result = self.execute_module(changed=True)
+        self.assertEqual(
+            result["commands"],
+            [
+                "ip access-list resequence test_acl 30 30",
+                "ip access-list extended test_acl",
+                "20 permit icmp any any",
+                "70 permit udp any any",
+                "80 permit gre any any",
+            ],
+        )
+
+    def test_ios_acls_overridden_ipv6_resequence(self):
+        self.execute_show_command.return_value = dedent(
+            """\
+            IPv6 access list R1_TRAFFIC
+                permit tcp any any eq www sequence 10
+                deny ipv6 any any sequence 11
+            """,
+        )
+        aces = [
+            dict(
+                grant="permit",
+                protocol="tcp",
+                source=dict(any=True),
+                destination=dict(any=True, port_protocol=dict(eq="www")),
+            ),
+            dict(
+                grant="permit", protocol="icmp", source=dict(any=True), destination=dict(any=True)
+            ),
+            dict(grant="deny", protocol="ipv6", source=dict(any=True), destination=dict(any=True)),
+        ]
+        set_module_args(
+            dict(
+                config=[dict(afi="ipv6", acls=[dict(name="R1_TRAFFIC", aces=aces)])],
+                state="overridden",
+            ),
+        )
+        result = self.execute_module(changed=True)
+        self.assertEqual(
+            result["commands"],
+            [
+                "ipv6 access-list resequence R1_TRAFFIC 20 20",
+                "ipv6 access-list R1_TRAFFIC",
+                "permit icmp any any sequence 30",
+            ],
+        )
+
+    def test_ios_acls_overridden_scaling(self):
+        """The command generation renders every ace at most twice"""
+
+        def config(acls, aces, port, sequence=True):
+            return [
+                dict(
+                    afi="ipv4",
+                    acls=[
+                        dict(
+                            name="acl_{0}".format(acl),
+                            acl_type="extended",
+                            aces=[
+                                dict(
+                                    sequence=(ace + 1) * 10 if sequence else None,
+                                    grant="permit",
+                                    protocol="tcp",
+                                    source=dict(host="192.0.2.{0}".format(ace % 250)),
+                                    destination=dict(any=True, port_protocol=dict(eq=str(port))),
+                                )
+                                for ace in range(aces)
+                            ],
+                        )
+                        for acl in range(acls)
+                    ],
+                ),
+            ]
+
+        def generate(acls, aces, port=1000, sequence=True):
+            module = MagicMock()
+            module.params = {"state": "overridden", "config": config(acls, aces, port, sequence)}
+            acls_obj = Acls(module)
+            acls_obj.have = config(acls, aces, 2000)
+            render = patch.object(
+                acls_obj._tmplt,
+                "render",
+                side_effect=acls_obj._tmplt.render,
+            )
+            fingerprint = patch.object(
+                acls_obj,
+                "ace_fingerprint",
+                side_effect=acls_obj.ace_fingerprint,
+            )
+            with render as render_mock, fingerprint as fingerprint_mock:
+                acls_obj.generate_commands()
+            return acls_obj.commands, render_mock.call_count, fingerprint_mock.call_count
+
+        commands, renders, fingerprints = generate(30, 20)
+        self.assertEqual(len(commands), 30 * 41)
+        self.assertEqual(
+            commands[:2],
+            ["ip access-list extended acl_0", "no 10 permit tcp host 192.0.2.0 any eq 2000"],
+        )
+        self.assertEqual(commands[21], "10 permit tcp host 192.0.2.0 any eq 1000")
+        # one negate for every ace of have, one add for every ace of want
+        self.assertEqual(renders, 30 * 20 * 2)
+        self.assertEqual(fingerprints, 0)
+
+        for acls in (10, 40):
+            commands, renders, fingerprints = generate(acls, 100)
+            self.assertEqual(renders, acls * 100 * 2)
+            self.assertEqual(fingerprints, 0)
+
+        # aces without a sequence are fingerprinted once on either side
+        commands, renders, fingerprints = generate(40, 100, port=2000, sequence=False)
+        self.assertEqual(commands, [])
+        self.assertEqual(renders, 0)
+        self.assertEqual(fingerprints, 40 * 100 * 2)
+
+    def test_ios_acls_merged_unsequenced_configured(self):
+        """Aces without a sequence that are already configured are not pushed again"""
+        self.execute_show_command.return_value = dedent(
+            """\
+            Extended IP access list test_acl
+                10 permit tcp host 192.0.2.1 any eq www
+                20 deny ip any any
+            """,
+        )
+        set_module_args(
+            dict(
+                config=[
+                    dict(
+                        afi="ipv4",
+                        acls=[
+                            dict(
+                                name="test_acl",
+                                aces=[
+                                    dict(
+                                        grant="permit",
+                                        protocol="tcp",
+                                        source=dict(host="192.0.2.1"),
+                                        destination=dict(any=True, port_protocol=dict(eq="www")),
+                                    ),
+                                    dict(
+                                        grant="deny",
+                                        protocol="ip",
+                                        source=dict(any=True),
+                                        destination=dict(any=True),
+                                    ),
+                                ],
+                            ),
+                        ],
+                    ),
+                ],
+                state="merged",
+            ),
+        )
+        self.execute_module(changed=False)
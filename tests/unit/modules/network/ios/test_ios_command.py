@@ -22,8 +22,17 @@ from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
 import json
+import shutil
+import tempfile
 
+from os import path
+
+from ansible_collections.cisco.ios.plugins.cliconf.ios import Cliconf
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.ios import (
+    run_commands_to_files,
+)
 from ansible_collections.cisco.ios.plugins.modules import ios_command
+from ansible_collections.cisco.ios.tests.unit.compat.mock import MagicMock
 from ansible_collections.cisco.ios.tests.unit.compat.mock import patch
 from ansible_collections.cisco.ios.tests.unit.modules.utils import set_module_args
 
@@ -85,6 +94,22 @@ class TestIosCommandModule(TestIosModule):
         self.execute_module(failed=True)
         self.assertEqual(self.run_commands.call_count, 10)
 
+    def test_ios_command_wait_for_response_cache(self):
+        cliconf = Cliconf(MagicMock())
+        cliconf.set_option("response_cache_ttl", 60)
+        cliconf.set_option("response_cache_size", 64)
+        cliconf.set_option("config_snapshot", False)
+        cliconf._connection.send.side_effect = ["BGP state Idle", "BGP state Established"]
+        self.run_commands.side_effect = lambda module, commands, **kwargs: cliconf.run_commands(
+            commands,
+            **kwargs,
+        )
+        wait_for = 'result[0] contains "Established"'
+        set_module_args(dict(commands=["show ip bgp summary"], wait_for=wait_for, interval=0))
+        result = self.changed()
+        self.assertEqual(result["stdout"], ["BGP state Established"])
+        self.assertEqual(self.run_commands.call_count, 2)
+
     def test_ios_command_retries(self):
         wait_for = 'result[0] contains "test string"'
         set_module_args(dict(commands=["show version"], wait_for=wait_for, retries=2))
@@ -128,3 +153,57 @@ class TestIosCommandModule(TestIosModule):
         set_module_args(dict(commands=commands))
         result = self.execute_module()
         self.assertEqual(result["warnings"], [])
+
+    def test_ios_command_output_dir(self):
+        output_dir = path.join(tempfile.mkdtemp(), "outputs")
+        self.addCleanup(shutil.rmtree, path.dirname(output_dir))
+        output_files = [
+            {
+                "command": "show tech-support",
+                "path": path.join(output_dir, "01_show_tech-support.txt"),
+                "bytes": 1024,
+                "checksum": "da39a3ee5e6b4b0d3255bfef95601890afd80709",
+            },
+        ]
+        with patch(
+            "ansible_collections.cisco.ios.plugins.modules.ios_command.run_commands_to_files",
+            return_value=output_files,
+        ) as run_commands_to_files:
+            set_module_args(dict(commands=["show tech-support"], output_dir=output_dir))
+            result = self.execute_module()
+
+        self.assertTrue(path.isdir(output_dir))
+        self.assertEqual(result["output_files"], output_files)
+        self.assertNotIn("stdout", result)
+        self.assertEqual(run_commands_to_files.call_args[0][2], output_dir)
+        self.assertEqual(self.run_commands.call_count, 0)
+
+    def test_ios_command_output_dir_wait_for(self):
+        set_module_args(
+            dict(
+                commands=["show version"],
+                output_dir="/tmp/outputs",
+                wait_for="result[0] contains IOS",
+            ),
+        )
+        result = self.execute_module(failed=True)
+        self.assertIn("mutually exclusive", result["msg"])
+
+    def test_ios_command_run_commands_to_files(self):
+        module = MagicMock()
+        module._ios_connection.get_to_file.side_effect = lambda **kwargs: {"path": kwargs["path"]}
+        commands = [
+            {"command": "show ip bgp", "prompt": None, "answer": None, "output": None},
+            "show running-config | include hostname",
+        ]
+        files = run_commands_to_files(module, commands, "/tmp/outputs")
+        self.assertEqual(
+            files,
+            [
+                {"command": "show ip bgp", "path": "/tmp/outputs/01_show_ip_bgp.txt"},
+                {
+                    "command": "show running-config | include hostname",
+                    "path": "/tmp/outputs/02_show_running-config_include_hostname.txt",
+                },
+            ],
+        )
@@ -32,6 +32,7 @@ from .ios_module import TestIosModule, load_fixture
 
 class TestIosConfigModule(TestIosModule):
     module = ios_config
+    diff_engine = "tree"
 
     def setUp(self):
         super(TestIosConfigModule, self).setUp()
@@ -55,6 +56,7 @@ class TestIosConfigModule(TestIosModule):
         self.run_commands = self.mock_run_commands.start()
 
         self.cliconf_obj = Cliconf(MagicMock())
+        self.cliconf_obj.set_option("diff_engine", self.diff_engine)
         self.running_config = load_fixture("ios_config_config.cfg")
 
     def tearDown(self):
@@ -119,6 +121,107 @@ class TestIosConfigModule(TestIosModule):
         args = self.run_commands.call_args[0][1]
         self.assertIn("copy running-config startup-config\r", args)
 
+    def _save_modified_commands(self):
+        return [call[0][1] for call in self.run_commands.call_args_list]
+
+    def test_ios_config_save_modified_times_changed(self):
+        self.run_commands.return_value = [
+            "! Last configuration change at 10:21:03 UTC Tue Oct 17 2023 by admin\n"
+            "! NVRAM config last updated at 09:55:41 UTC Tue Oct 17 2023 by admin",
+        ]
+        set_module_args(dict(save_when="modified"))
+        self.execute_module(changed=True)
+        self.assertEqual(
+            self._save_modified_commands(),
+            [ios_config.CONFIG_TIMES_COMMAND, "copy running-config startup-config\r"],
+        )
+
+    def test_ios_config_save_modified_times_saved(self):
+        self.run_commands.side_effect = [
+            [
+                "! Last configuration change at 23:59:59 UTC Mon Oct 16 2023 by admin\n"
+                "! NVRAM config last updated at 0:00:12 UTC Tue Oct 17 2023 by admin",
+            ],
+            ["Contextual Config Diffs:\n!No changes were found"],
+        ]
+        set_module_args(dict(save_when="modified"))
+        self.execute_module(changed=False)
+        self.assertEqual(
+            self._save_modified_commands(),
+            [ios_config.CONFIG_TIMES_COMMAND, ios_config.CONFIG_DIFF_COMMAND],
+        )
+
+    def test_ios_config_save_modified_clock_reset(self):
+        # the clock restarted at 1993 after a reload, the change is
+        # stamped before the last save
+        self.run_commands.side_effect = [
+            [
+                "! Last configuration change at 00:03:12 UTC Mon Mar 1 1993 by admin\n"
+                "! NVRAM config last updated at 14:20:33 UTC Fri Oct 16 2026 by admin",
+            ],
+            ["Contextual Config Diffs:\n+hostname foo\n-hostname bar"],
+            None,
+        ]
+        set_module_args(dict(save_when="modified"))
+        self.execute_module(changed=True)
+        self.assertEqual(
+            self._save_modified_commands(),
+            [
+                ios_config.CONFIG_TIMES_COMMAND,
+                ios_config.CONFIG_DIFF_COMMAND,
+                "copy running-config startup-config\r",
+            ],
+        )
+
+    def test_ios_config_save_modified_archive_diff(self):
+        self.run_commands.side_effect = [
+            ["! Last configuration change at 10:21:03 UTC Tue Oct 17 2023 by admin"],
+            ["Contextual Config Diffs:\n!No changes were found"],
+        ]
+        set_module_args(dict(save_when="modified"))
+        self.execute_module(changed=False)
+        self.assertEqual(
+            self._save_modified_commands(),
+            [ios_config.CONFIG_TIMES_COMMAND, ios_config.CONFIG_DIFF_COMMAND],
+        )
+
+    def test_ios_config_save_modified_fallback(self):
+        self.run_commands.side_effect = [
+            [""],
+            ["% Invalid input detected at '^' marker."],
+            ["hostname foo\n", "hostname bar\n"],
+            None,
+        ]
+        set_module_args(dict(save_when="modified"))
+        self.execute_module(changed=True)
+        self.assertEqual(
+            self._save_modified_commands(),
+            [
+                ios_config.CONFIG_TIMES_COMMAND,
+                ios_config.CONFIG_DIFF_COMMAND,
+                ["show running-config", "show startup-config"],
+                "copy running-config startup-config\r",
+            ],
+        )
+
+    def test_ios_config_save_modified_ignore_lines(self):
+        self.run_commands.return_value = ["hostname foo\nntp clock-period 1\n", "hostname foo\n"]
+        set_module_args(dict(save_when="modified", diff_ignore_lines=["ntp clock-period .*"]))
+        self.execute_module(changed=False)
+        self.assertEqual(
+            self._save_modified_commands(),
+            [["show running-config", "show startup-config"]],
+        )
+
+    def test_parse_config_times(self):
+        changed, saved = ios_config.parse_config_times(
+            "! Last configuration change at 14:03:43 PST Tue Oct  3 2023 by admin\n"
+            "! NVRAM config last updated at 14:03:50.123 PST Tue Oct  3 2023\n",
+        )
+        self.assertEqual(changed, ("PST", (2023, 10, 3, 14, 3, 43)))
+        self.assertEqual(saved, ("PST", (2023, 10, 3, 14, 3, 50)))
+        self.assertEqual(ios_config.parse_config_times("hostname foo"), (None, None))
+
     def test_ios_config_lines_wo_parents(self):
         lines = ["hostname foo"]
         set_module_args(dict(lines=lines))
@@ -301,3 +404,97 @@ class TestIosConfigModule(TestIosModule):
         args = dict(replace="config")
         set_module_args(args)
         self.execute_module(failed=True)
+
+    def test_ios_config_blocks(self):
+        blocks = [
+            {"lines": ["shutdown"], "parents": ["interface GigabitEthernet0/0"]},
+            {"lines": ["shutdown"], "parents": ["interface GigabitEthernet0/1"]},
+            {
+                "lines": ["description test string", "test string"],
+                "parents": ["interface GigabitEthernet0/1"],
+                "before": ["default interface GigabitEthernet0/1"],
+            },
+            {"lines": ["hostname foo"], "after": ["test1"]},
+        ]
+        set_module_args(dict(blocks=blocks))
+        self.conn.get_diff_blocks = MagicMock(side_effect=self.cliconf_obj.get_diff_blocks)
+
+        commands = [
+            "interface GigabitEthernet0/0",
+            "shutdown",
+            "default interface GigabitEthernet0/1",
+            "interface GigabitEthernet0/1",
+            "test string",
+            "hostname foo",
+            "test1",
+        ]
+        self.execute_module(changed=True, commands=commands, sort=False)
+        self.assertEqual(self.get_config.call_count, 1)
+        self.assertEqual(self.conn.get_diff_blocks.call_count, 1)
+        self.conn.edit_config.assert_called_once_with(candidate=commands)
+
+    def test_ios_config_blocks_match_exact(self):
+        blocks = [
+            {
+                "lines": ["ip address 1.2.3.4 255.255.255.0"],
+                "parents": ["interface GigabitEthernet0/0"],
+            },
+            {"lines": ["description test string"], "parents": ["interface GigabitEthernet0/1"]},
+        ]
+        set_module_args(dict(blocks=blocks, match="exact", replace="block"))
+        self.conn.get_diff_blocks = MagicMock(side_effect=self.cliconf_obj.get_diff_blocks)
+
+        commands = [
+            "interface GigabitEthernet0/0",
+            "ip address 1.2.3.4 255.255.255.0",
+            "interface GigabitEthernet0/1",
+            "description test string",
+        ]
+        self.execute_module(changed=True, commands=commands, sort=False)
+        self.assertEqual(self.conn.edit_config.call_count, 1)
+
+    def test_ios_config_blocks_no_change(self):
+        blocks = [
+            {
+                "lines": ["shutdown"],
+                "parents": ["interface GigabitEthernet0/1"],
+                "before": ["test1"],
+            },
+            {"lines": ["hostname router"]},
+        ]
+        set_module_args(dict(blocks=blocks))
+        self.conn.get_diff_blocks = MagicMock(side_effect=self.cliconf_obj.get_diff_blocks)
+        self.execute_module()
+        self.assertEqual(self.conn.edit_config.call_count, 0)
+
+    def test_ios_config_blocks_macro(self):
+        blocks = [
+            {"lines": ["hostname foo"]},
+            {"lines": ["description macro"], "parents": ["macro name M1"], "after": ["@"]},
+            {"lines": ["shutdown"], "parents": ["interface GigabitEthernet0/0"]},
+        ]
+        set_module_args(dict(blocks=blocks))
+        self.conn.get_diff_blocks = MagicMock(side_effect=self.cliconf_obj.get_diff_blocks)
+        self.conn.edit_macro = MagicMock()
+        self.execute_module(changed=True)
+        self.assertEqual(
+            [call[1]["candidate"] for call in self.conn.edit_config.call_args_list],
+            [["hostname foo"], ["interface GigabitEthernet0/0", "shutdown"]],
+        )
+        self.conn.edit_macro.assert_called_once_with(
+            candidate=["macro name M1", "description macro", "@"],
+        )
+
+    def test_ios_config_blocks_and_lines_fails(self):
+        set_module_args(dict(blocks=[{"lines": ["hostname foo"]}], lines=["hostname foo"]))
+        self.execute_module(failed=True)
+
+    def test_ios_config_blocks_require_lines(self):
+        set_module_args(dict(blocks=[{"parents": ["interface GigabitEthernet0/0"]}]))
+        self.execute_module(failed=True)
+
+
+class TestIosConfigModuleIndexedDiff(TestIosConfigModule):
+    """Runs all the ios_config tests with the indexed diff engine"""
+
+    diff_engine = "indexed"
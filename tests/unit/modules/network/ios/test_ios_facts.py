@@ -20,8 +20,22 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from textwrap import dedent
+
 from ansible.module_utils.six import assertCountEqual
+from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.facts.facts import (
+    FactsBase,
+)
 
+from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.facts import (
+    parse_resources_in_workers,
+)
 from ansible_collections.cisco.ios.plugins.modules import ios_facts
 from ansible_collections.cisco.ios.tests.unit.compat.mock import patch
 from ansible_collections.cisco.ios.tests.unit.modules.utils import set_module_args
@@ -48,6 +62,11 @@ class TestIosFactsModule(TestIosModule):
             "ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.legacy.base.get_capabilities",
         )
         self.get_capabilities = self.mock_get_capabilities.start()
+
+        self.mock_get_config_fingerprint = patch(
+            "ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.facts.get_config_fingerprint",
+        )
+        self.get_config_fingerprint = self.mock_get_config_fingerprint.start()
         self.get_capabilities.return_value = {
             "device_info": {
                 "network_os": "ios",
@@ -63,6 +82,7 @@ class TestIosFactsModule(TestIosModule):
         super(TestIosFactsModule, self).tearDown()
         self.mock_run_commands.stop()
         self.mock_get_capabilities.stop()
+        self.mock_get_config_fingerprint.stop()
 
     def load_fixtures(self, commands=None):
         def load_from_file(*args, **kwargs):
@@ -187,3 +207,408 @@ class TestIosFactsModule(TestIosModule):
             result["ansible_facts"]["ansible_net_neighbors"]["GigabitEthernet3"],
             [{"host": "Rtest", "port": "Gi1", "ip": "10.3.0.3"}],
         )
+
+    def test_ios_facts_resources_single_running_config(self):
+        connection = self.get_resource_connection.return_value
+        connection.get.return_value = dedent(
+            """\
+            Building configuration...
+
+            Current configuration : 1024 bytes
+            !
+            hostname Router
+            !
+            interface GigabitEthernet1
+             description Uplink
+             no shutdown
+            !
+            ip prefix-list test_prefix seq 5 deny 10.0.0.0/8
+            !
+            router bgp 65000
+             bgp log-neighbor-changes
+            !
+            end
+            """,
+        )
+        set_module_args(
+            dict(
+                gather_subset=["!all", "!min"],
+                gather_network_resources=["hostname", "interfaces", "prefix_lists"],
+            ),
+        )
+        result = self.execute_module()
+        resources = result["ansible_facts"]["ansible_network_resources"]
+
+        connection.get.assert_called_once_with("show running-config")
+        self.assertEqual(resources["hostname"], {"hostname": "Router"})
+        self.assertEqual(
+            resources["interfaces"],
+            [{"name": "GigabitEthernet1", "description": "Uplink", "enabled": True}],
+        )
+        self.assertEqual(
+            resources["prefix_lists"],
+            [
+                {
+                    "afi": "ipv4",
+                    "prefix_lists": [
+                        {
+                            "name": "test_prefix",
+                            "entries": [
+                                {"action": "deny", "prefix": "10.0.0.0/8", "sequence": 5},
+                            ],
+                        },
+                    ],
+                },
+            ],
+        )
+
+    def test_ios_facts_interface_resources_shared_blocks(self):
+        connection = self.get_resource_connection.return_value
+        connection.get.return_value = dedent(
+            """\
+            hostname Router
+            !
+            interface GigabitEthernet1
+             description Uplink
+             ip address 192.0.2.1 255.255.255.0
+             ip access-group acl_in in
+             ip ospf cost 30
+            !
+            interface GigabitEthernet2
+             channel-group 10 mode active
+             lacp port-priority 100
+            !
+            router ospf 1
+            !
+            end
+            """,
+        )
+        set_module_args(
+            dict(
+                gather_subset=["!all", "!min"],
+                gather_network_resources=[
+                    "interfaces",
+                    "l3_interfaces",
+                    "lag_interfaces",
+                    "lacp_interfaces",
+                    "ospf_interfaces",
+                    "acl_interfaces",
+                ],
+            ),
+        )
+        result = self.execute_module()
+        resources = result["ansible_facts"]["ansible_network_resources"]
+
+        connection.get.assert_called_once_with("show running-config")
+        self.assertEqual(
+            resources["acl_interfaces"],
+            [
+                {
+                    "name": "GigabitEthernet1",
+                    "access_groups": [
+                        {"afi": "ipv4", "acls": [{"name": "acl_in", "direction": "in"}]},
+                    ],
+                },
+            ],
+        )
+        self.assertEqual(
+            resources["lag_interfaces"],
+            [
+                {
+                    "name": "Port-channel10",
+                    "members": [{"member": "GigabitEthernet2", "mode": "active"}],
+                }
+            ],
+        )
+        self.assertIn(
+            {"name": "GigabitEthernet2", "port_priority": 100}, resources["lacp_interfaces"]
+        )
+        self.assertEqual(
+            [intf["name"] for intf in resources["interfaces"]],
+            ["GigabitEthernet1", "GigabitEthernet2"],
+        )
+
+    def _gather_resources_with_workers(self, **kwargs):
+        responses = {
+            "show running-config": dedent(
+                """\
+                hostname Router
+                !
+                interface GigabitEthernet1
+                 description Uplink
+                 ip address 192.0.2.1 255.255.255.0
+                 ip access-group acl_in in
+                !
+                ip prefix-list test_prefix seq 5 deny 10.0.0.0/8
+                !
+                route-map rmap permit 10
+                 match ip address prefix-list test_prefix
+                !
+                router bgp 65000
+                 bgp log-neighbor-changes
+                 neighbor 192.0.2.2 remote-as 65001
+                !
+                end
+                """,
+            ),
+            "show lacp sys-id": "32768, 5e00.0000.8000",
+        }
+        connection = self.get_resource_connection.return_value
+        connection.get.reset_mock()
+        connection.get.side_effect = lambda command: responses[command]
+        resources = [
+            "hostname",
+            "interfaces",
+            "l3_interfaces",
+            "acl_interfaces",
+            "prefix_lists",
+            "route_maps",
+            "bgp_global",
+            "lacp",
+        ]
+        set_module_args(
+            dict(gather_subset=["!all", "!min"], gather_network_resources=resources, **kwargs),
+        )
+        result = self.execute_module()
+        self.warnings = result.get("warnings", [])
+        return connection, result["ansible_facts"]
+
+    def test_ios_facts_parse_workers(self):
+        dummy, expected = self._gather_resources_with_workers()
+        results = []
+
+        def parse_in_workers(names, lines, workers):
+            results.append(parse_resources_in_workers(names, lines, workers))
+            return results[-1]
+
+        with patch(
+            "ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.facts.parse_resources_in_workers",
+            side_effect=parse_in_workers,
+        ), patch.object(
+            FactsBase,
+            "get_network_resources_facts",
+            autospec=True,
+            side_effect=FactsBase.get_network_resources_facts,
+        ) as in_process:
+            connection, facts = self._gather_resources_with_workers(
+                parse_workers=2,
+                parse_workers_threshold=0,
+            )
+        # the workers parsed every resource but lacp, which needs another command
+        self.assertEqual(len(results), 1)
+        self.assertIsNotNone(results[0])
+        self.assertEqual(
+            sorted(name for name, facts, no_log, error in results[0] if facts is not None),
+            sorted(set(expected["ansible_net_gather_network_resources"]) - set(["lacp"])),
+        )
+        self.assertEqual(in_process.call_count, 1)
+        self.assertEqual(in_process.call_args[0][2], ["lacp"])
+        self.assertEqual(self.warnings, [])
+        self.assertEqual(facts["ansible_network_resources"], expected["ansible_network_resources"])
+        assertCountEqual(
+            self,
+            facts["ansible_net_gather_network_resources"],
+            expected["ansible_net_gather_network_resources"],
+        )
+        self.assertEqual(
+            facts["ansible_network_resources"]["lacp"], {"system": {"priority": 32768}}
+        )
+        self.assertEqual(
+            [call[0][0] for call in connection.get.call_args_list],
+            ["show running-config", "show lacp sys-id"],
+        )
+
+    def test_ios_facts_parse_workers_fallback(self):
+        dummy, expected = self._gather_resources_with_workers()
+        with patch(
+            "ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.facts.parse_resources_in_workers",
+            return_value=None,
+        ):
+            dummy, facts = self._gather_resources_with_workers(
+                parse_workers=2,
+                parse_workers_threshold=0,
+            )
+        self.assertEqual(facts["ansible_network_resources"], expected["ansible_network_resources"])
+        self.assertEqual(len(self.warnings), 1)
+        self.assertIn("parsed by the module process", self.warnings[0])
+
+    def test_ios_facts_parse_workers_threshold(self):
+        with patch(
+            "ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts.facts.parse_resources_in_workers",
+        ) as parse_resources_in_workers:
+            self._gather_resources_with_workers(parse_workers=2)
+        self.assertEqual(parse_resources_in_workers.call_count, 0)
+
+    def test_ios_facts_parse_cache(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        cache_path = os.path.join(tmpdir, "R1.json")
+
+        dummy, expected = self._gather_resources_with_workers()
+        dummy, cold = self._gather_resources_with_workers(parse_cache=cache_path)
+        self.assertTrue(os.path.isfile(cache_path))
+        with patch(
+            "ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.network_template.NetworkTemplate._parse_lines",
+        ) as parse_lines:
+            dummy, warm = self._gather_resources_with_workers(parse_cache=cache_path)
+        self.assertEqual(parse_lines.call_count, 0)
+        for facts in (cold, warm):
+            self.assertEqual(
+                facts["ansible_network_resources"],
+                expected["ansible_network_resources"],
+            )
+
+    def test_ios_facts_parse_cache_secrets(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        cache_path = os.path.join(tmpdir, "R1.json")
+        running_config = dedent(
+            """\
+            hostname Router
+            !
+            snmp-server community S3cr3tC0mm RO
+            !
+            ntp authentication-key 2 md5 S3cr3tK3y 7
+            ntp server 192.0.2.1
+            !
+            end
+            """,
+        )
+        connection = self.get_resource_connection.return_value
+        connection.get.side_effect = lambda command: running_config
+        set_module_args(
+            dict(
+                gather_subset=["!all", "!min"],
+                gather_network_resources=["hostname", "ntp_global"],
+                parse_cache=cache_path,
+            ),
+        )
+        result = self.execute_module()
+        ntp_global = result["ansible_facts"]["ansible_network_resources"]["ntp_global"]
+        self.assertEqual(ntp_global["authentication_keys"][0]["key"], "S3cr3tK3y")
+        self.assertEqual(result["warnings"], [])
+        with open(cache_path) as cache_file:
+            data = cache_file.read()
+        self.assertNotIn("S3cr3t", data)
+        self.assertIn("Router", data)
+        self.assertIn("192.0.2.1", data)
+
+    def test_ios_facts_parse_cache_parse_workers(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        self._gather_resources_with_workers(
+            parse_cache=os.path.join(tmpdir, "R1.json"),
+            parse_workers=2,
+        )
+        self.assertEqual(len(self.warnings), 1)
+        self.assertIn("parse_cache is not used by the parse_workers", self.warnings[0])
+
+    def _gather_with_fingerprint(self, fingerprint, marker, **kwargs):
+        responses = {
+            "show running-config": dedent(
+                """\
+                hostname Router
+                !
+                interface GigabitEthernet1
+                 description Uplink
+                !
+                end
+                """,
+            ),
+        }
+        connection = self.get_resource_connection.return_value
+        connection.get.reset_mock()
+        connection.get.side_effect = lambda command: responses[command]
+        self.run_commands.reset_mock()
+        self.get_config_fingerprint.reset_mock()
+        self.get_config_fingerprint.return_value = marker
+        args = dict(gather_network_resources=["hostname", "interfaces"], **kwargs)
+        set_module_args(dict(config_fingerprint=fingerprint, **args))
+        return connection, self.execute_module()
+
+    def test_ios_facts_config_fingerprint(self):
+        marker = "! Last configuration change at 10:13:52 UTC Mon Oct 2 2023 by admin"
+        dummy, result = self._gather_with_fingerprint("", marker)
+        facts = result["ansible_facts"]
+        fingerprint = facts["ansible_net_config_fingerprint"]
+        self.assertTrue(result["changed_since"])
+        self.assertEqual(facts["ansible_network_resources"]["hostname"], {"hostname": "Router"})
+        self.assertEqual(facts["ansible_net_hostname"], "an-ios-01")
+
+        connection, result = self._gather_with_fingerprint(fingerprint, marker)
+        self.assertFalse(result["changed_since"])
+        self.assertEqual(result["ansible_facts"], {"ansible_net_config_fingerprint": fingerprint})
+        self.assertEqual(len(result["warnings"]), 1)
+        self.assertIn("no fact was gathered or returned", result["warnings"][0])
+        self.assertEqual(self.get_config_fingerprint.call_count, 1)
+        self.assertEqual(connection.get.call_count, 0)
+        self.assertEqual(self.run_commands.call_count, 0)
+
+        changed = marker.replace("10:13:52", "10:20:07")
+        dummy, result = self._gather_with_fingerprint(fingerprint, changed)
+        self.assertTrue(result["changed_since"])
+        self.assertNotEqual(result["ansible_facts"]["ansible_net_config_fingerprint"], fingerprint)
+        self.assertIn("ansible_network_resources", result["ansible_facts"])
+
+        # other facts requested
+        dummy, result = self._gather_with_fingerprint(
+            fingerprint,
+            marker,
+            gather_subset=["hardware"],
+        )
+        self.assertTrue(result["changed_since"])
+        self.assertIn("ansible_net_memfree_mb", result["ansible_facts"])
+
+    def test_ios_facts_config_fingerprint_no_marker(self):
+        dummy, result = self._gather_with_fingerprint("", None)
+        self.assertTrue(result["changed_since"])
+        self.assertNotIn("ansible_net_config_fingerprint", result["ansible_facts"])
+        self.assertIn("no config change marker", result["warnings"][0])
+        self.assertEqual(
+            result["ansible_facts"]["ansible_network_resources"]["hostname"],
+            {"hostname": "Router"},
+        )
+
+    def test_ios_facts_config_fingerprint_previous_facts(self):
+        marker = "! Last configuration change at 10:13:52 UTC Mon Oct 2 2023 by admin"
+        dummy, result = self._gather_with_fingerprint("", marker)
+        previous = result["ansible_facts"]
+        fingerprint = previous["ansible_net_config_fingerprint"]
+        self.assertEqual(result["warnings"], [])
+
+        connection, result = self._gather_with_fingerprint(
+            fingerprint,
+            marker,
+            previous_facts=previous,
+        )
+        self.assertFalse(result["changed_since"])
+        self.assertEqual(result["ansible_facts"], previous)
+        self.assertEqual(result["warnings"], [])
+        self.assertEqual(connection.get.call_count, 0)
+        self.assertEqual(self.run_commands.call_count, 0)
+
+        # the previous facts are outdated once the config changed
+        changed = marker.replace("10:13:52", "10:20:07")
+        stale = dict(previous, ansible_net_hostname="stale")
+        dummy, result = self._gather_with_fingerprint(fingerprint, changed, previous_facts=stale)
+        self.assertTrue(result["changed_since"])
+        self.assertEqual(result["ansible_facts"]["ansible_net_hostname"], "an-ios-01")
+
+    def test_ios_facts_resource_subsets_lazy_import(self):
+        code = dedent(
+            """\
+            import sys
+            from ansible_collections.cisco.ios.plugins.module_utils.network.ios.facts import facts
+            loaded = lambda: [m for m in sys.modules if ".network.ios.rm_templates." in m]
+            assert not loaded(), loaded()
+            assert sorted(facts.FACT_RESOURCE_SUBSETS)
+            assert facts.FACT_RESOURCE_SUBSETS["hostname"].__name__ == "HostnameFacts"
+            assert loaded() == [
+                "ansible_collections.cisco.ios.plugins.module_utils.network.ios.rm_templates.hostname",
+            ], loaded()
+            """,
+        )
+        proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        self.assertEqual(len(ios_facts.FACT_RESOURCE_SUBSETS), 24)
+        self.assertIn("hostname", ios_facts.FACT_RESOURCE_SUBSETS)
@@ -11,7 +11,7 @@ __metaclass__ = type
 from textwrap import dedent
 
 from ansible_collections.cisco.ios.plugins.modules import ios_interfaces
-from ansible_collections.cisco.ios.tests.unit.compat.mock import patch
+from ansible_collections.cisco.ios.tests.unit.compat.mock import MagicMock, patch
 from ansible_collections.cisco.ios.tests.unit.modules.utils import set_module_args
 
 from .ios_module import TestIosModule
@@ -758,3 +758,120 @@ class TestIosInterfacesModule(TestIosModule):
         ]
         result = self.execute_module(changed=False)
         self.assertEqual(sorted(result["rendered"]), sorted(commands))
+
+    def _run_with_resource_after(self, resource_after, outputs):
+        connection = MagicMock()
+        connection.get.side_effect = outputs
+        self.execute_show_command.side_effect = lambda conn: conn.get(
+            "show running-config | section ^interface",
+        )
+        self.get_resource_connection_facts.return_value = connection
+        with patch(
+            "ansible_collections.ansible.netcommon.plugins.module_utils.network.common.facts.facts."
+            "get_resource_connection",
+            return_value=connection,
+        ), patch(
+            "ansible_collections.cisco.ios.plugins.module_utils.network.ios.utils.resource_module."
+            "get_capabilities",
+            return_value={"resource_after": resource_after},
+        ):
+            result = self.execute_module(changed=True)
+        return connection, result
+
+    def test_ios_interfaces_merged_predicted_after(self):
+        set_module_args(
+            {
+                "config": [
+                    {"name": "GigabitEthernet1", "description": "Uplink", "enabled": False},
+                    {"name": "Loopback10", "description": "New loopback"},
+                ],
+                "state": "merged",
+            },
+        )
+        connection, result = self._run_with_resource_after(
+            "predict",
+            [
+                dedent(
+                    """\
+                    interface GigabitEthernet1
+                     description Ansible UT interface 1
+                     no shutdown
+                     ip address dhcp
+                    interface GigabitEthernet2
+                     description Ansible UT interface 2
+                    """,
+                ),
+            ],
+        )
+        self.assertEqual(
+            result["commands"],
+            [
+                "interface GigabitEthernet1",
+                "description Uplink",
+                "shutdown",
+                "interface loopback10",
+                "description New loopback",
+                "no shutdown",
+            ],
+        )
+        connection.get.assert_called_once_with("show running-config | section ^interface")
+        self.assertEqual(
+            result["after"],
+            [
+                {"name": "GigabitEthernet1", "description": "Uplink", "enabled": False},
+                {
+                    "name": "GigabitEthernet2",
+                    "description": "Ansible UT interface 2",
+                    "enabled": True,
+                },
+                {"name": "loopback10", "description": "New loopback", "enabled": True},
+            ],
+        )
+
+    def test_ios_interfaces_deleted_verified_after(self):
+        set_module_args({"config": [{"name": "GigabitEthernet2"}], "state": "deleted"})
+        connection, result = self._run_with_resource_after(
+            "verify",
+            [
+                dedent(
+                    """\
+                    interface GigabitEthernet1
+                     description Ansible UT interface 1
+                    interface GigabitEthernet2
+                     description Ansible UT interface 2
+                     speed 1000
+                    """,
+                ),
+                dedent(
+                    """\
+                    interface GigabitEthernet2
+                     speed auto
+                     shutdown
+                    """,
+                ),
+            ],
+        )
+        self.assertEqual(
+            result["commands"],
+            [
+                "interface GigabitEthernet2",
+                "no description Ansible UT interface 2",
+                "no speed 1000",
+                "shutdown",
+            ],
+        )
+        self.assertEqual(
+            connection.get.call_args_list[-1][0],
+            ("show running-config | section ^interface GigabitEthernet2",),
+        )
+        self.assertEqual(
+            result["after"],
+            [
+                {
+                    "name": "GigabitEthernet1",
+                    "description": "Ansible UT interface 1",
+                    "enabled": True,
+                },
+                {"name": "GigabitEthernet2", "speed": "auto", "enabled": False},
+            ],
+        )
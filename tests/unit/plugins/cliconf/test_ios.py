@@ -21,7 +21,12 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
+import hashlib
 import json
+import os
+import re
+import shutil
+import tempfile
 
 from os import path
 
@@ -31,10 +36,14 @@ try:
 except ImportError:
     from mock import MagicMock
 
+from ansible.errors import AnsibleConnectionFailure
 from ansible.module_utils._text import to_bytes
 
 from ansible_collections.cisco.ios.plugins.cliconf import ios
+from ansible_collections.cisco.ios.plugins.terminal.ios import TerminalModule
+from ansible_collections.cisco.ios.plugins.plugin_utils.device_cache import DeviceCache
 from ansible_collections.cisco.ios.tests.unit.compat import unittest
+from ansible_collections.cisco.ios.tests.unit.compat.mock import patch
 
 
 b_FIXTURE_DIR = b"%s/fixtures/ios" % (
@@ -63,6 +72,149 @@ def _connection_side_effect(*args, **kwargs):
         return "Nope"
 
 
+class SimulatedTerminal(object):
+    """Emulates the prompts of an IOS session for connection.send,
+    a command only completes once the device shows a prompt again.
+    """
+
+    def __init__(self):
+        self.mode = "exec"
+        self.delimiter = None
+        self.text = []
+        self.config = []
+        self.options = {}
+
+    def get_option(self, option):
+        return self.options.get(option)
+
+    def set_option(self, option, value):
+        self.options[option] = value
+
+    def _find_error(self, response):
+        """Like network_cli, with the terminal_stderr_re of the connection"""
+        configured = self.options.get("terminal_stderr_re")
+        if configured:
+            stderr_re = [re.compile(to_bytes(item["pattern"])) for item in configured]
+        else:
+            stderr_re = TerminalModule.terminal_stderr_re
+        return any(regex.search(to_bytes(response)) for regex in stderr_re)
+
+    @property
+    def prompt(self):
+        return "R1#" if self.mode == "exec" else "R1(config)#"
+
+    def _enter(self, line):
+        if self.mode == "text":
+            head, sep, dummy = line.partition(self.delimiter)
+            self.text.append(head)
+            if sep:
+                self.config.append("\n".join(self.text).strip())
+                self.mode = "config"
+            # the device echoes the text
+            return [line]
+        if line in ("config terminal", "configure terminal"):
+            self.mode = "config"
+        elif line == "end":
+            self.mode = "exec"
+        elif re.match(r"banner \S+ \S$", line):
+            self.config.append(line)
+            self.delimiter, self.text, self.mode = line[-1], [], "text"
+            return ["Enter TEXT message.  End with the character '%s'." % self.delimiter]
+        elif line.startswith("macro name "):
+            self.config.append(line)
+            self.delimiter, self.text, self.mode = "@", [], "text"
+            return ["Enter macro commands one per line. End with the character '@'."]
+        elif line:
+            self.config.append(line)
+        return []
+
+    def send(
+        self,
+        command,
+        prompt=None,
+        answer=None,
+        sendonly=False,
+        newline=True,
+        prompt_retry_check=False,
+        check_all=False,
+        strip_prompt=True,
+    ):
+        output = []
+        for line in re.split(r"[\r\n]", command.decode()):
+            output.extend(self._enter(line.strip()))
+        if prompt and re.search(prompt.decode(), "\n".join(output), re.I):
+            for line in re.split(r"[\r\n]", answer.decode()):
+                output.extend(self._enter(line.strip()))
+        if sendonly:
+            return None
+        if self.mode == "text":
+            raise AnsibleConnectionFailure(
+                "timeout value 30 seconds reached while trying to send command: %s" % command,
+            )
+        response = "\n".join(output)
+        if self._find_error(response):
+            raise AnsibleConnectionFailure(response)
+        return response
+
+
+class PipelineDevice(object):
+    """Emulates network_cli over a device in configuration mode for
+    pipelined windows. The device applies every line of a window and
+    echoes it, followed by the error of the failing ones. The connection
+    stops at the first error matching terminal_stderr_re, like paramiko
+    with the last 256 bytes read, and returns at the first prompt after
+    the line the device pauses after.
+    """
+
+    def __init__(self, errors=None, pause_after=None):
+        self.errors = errors or {}
+        self.pause_after = pause_after
+        self.options = {}
+        self.applied = []
+        self.pending = []
+
+    def get_option(self, option):
+        return self.options.get(option)
+
+    def set_option(self, option, value):
+        self.options[option] = value
+
+    def _find_error(self, response):
+        configured = self.options.get("terminal_stderr_re")
+        if configured:
+            stderr_re = [re.compile(to_bytes(item["pattern"])) for item in configured]
+        else:
+            stderr_re = TerminalModule.terminal_stderr_re
+        return any(regex.search(to_bytes(response)) for regex in stderr_re)
+
+    def _reply(self, rows):
+        response = "\n".join(rows)
+        if self._find_error(response):
+            raise AnsibleConnectionFailure(response[-256:])
+        return response
+
+    def send(self, command, prompt=None, answer=None, sendonly=False, newline=True, **kwargs):
+        lines = command.decode().split("\n")
+        if len(lines) == 1 and lines[0] in ("configure terminal", "end"):
+            return ""
+
+        chunks = [[]]
+        for index, line in enumerate(lines):
+            self.applied.append(line)
+            chunks[-1].append("R1(config)#%s" % line)
+            if line in self.errors:
+                chunks[-1].append(self.errors[line])
+            if index == self.pause_after and index + 1 < len(lines):
+                chunks[-1].append("R1(config)#")
+                chunks.append([])
+        chunks[-1].append("R1(config)#")
+        self.pending = chunks[1:]
+        return self._reply(chunks[0])
+
+    def receive(self, **kwargs):
+        return self._reply(self.pending.pop(0))
+
+
 class TestPluginCLIConfIOS(unittest.TestCase):
     """Test class for IOS CLI Conf Methods"""
 
@@ -70,6 +222,9 @@ class TestPluginCLIConfIOS(unittest.TestCase):
         self._mock_connection = MagicMock()
         self._mock_connection.send.side_effect = _connection_side_effect
         self._cliconf = ios.Cliconf(self._mock_connection)
+        self._cliconf.set_option("device_info_cache", None)
+        self._cliconf.set_option("response_cache_ttl", 0)
+        self._cliconf.set_option("config_snapshot", False)
         self.maxDiff = None
 
     def tearDown(self):
@@ -90,8 +245,626 @@ class TestPluginCLIConfIOS(unittest.TestCase):
 
         self.assertEqual(device_info, mock_device_info)
 
+    def _set_device_info_cache(self, cache_path):
+        self._cliconf.set_option("device_info_cache", cache_path)
+        self._cliconf.set_option("response_cache_ttl", 0)
+        self._cliconf.set_option("config_snapshot", False)
+        self._mock_connection.get_option.side_effect = {"host": "198.51.100.1"}.get
+
+    def test_get_device_info_cached(self):
+        """Test get_device_info reuses the device info cached by another connection"""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        cache_path = path.join(tmp_dir, "device_info.json")
+
+        self._set_device_info_cache(cache_path)
+        device_info = self._cliconf.get_device_info()
+        self.assertEqual(device_info["network_os_type"], "L2")
+
+        def _send(command, **kwargs):
+            self.assertEqual(command, b"show version | include uptime|image file")
+            return (
+                b"R1 uptime is 1 day, 16 hours, 15 minutes\n"
+                b'System image file is "bootflash:packages.conf"'
+            )
+
+        self._mock_connection = MagicMock()
+        self._mock_connection.send.side_effect = _send
+        self._cliconf = ios.Cliconf(self._mock_connection)
+        self._set_device_info_cache(cache_path)
+
+        cached = self._cliconf.get_device_info()
+        self.assertEqual(self._mock_connection.send.call_count, 1)
+        device_info["network_os_hostname"] = "R1"
+        self.assertEqual(cached, device_info)
+
+    def test_get_device_info_cache_reloaded(self):
+        """Test get_device_info probes the device again after a reload"""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        cache_path = path.join(tmp_dir, "device_info.json")
+
+        self._set_device_info_cache(cache_path)
+        self._cliconf.get_device_info()
+
+        def _send(command, **kwargs):
+            if command == b"show version | include uptime|image file":
+                return (
+                    b"an-csr-01 uptime is 5 minutes\n"
+                    b'System image file is "bootflash:packages.conf"'
+                )
+            return _connection_side_effect(command, **kwargs)
+
+        self._mock_connection = MagicMock()
+        self._mock_connection.send.side_effect = _send
+        self._cliconf = ios.Cliconf(self._mock_connection)
+        self._set_device_info_cache(cache_path)
+
+        self._cliconf.get_device_info()
+        sent = [call[1]["command"] for call in self._mock_connection.send.call_args_list]
+        self.assertEqual(
+            sent,
+            [b"show version | include uptime|image file", b"show version", b"show vlan"],
+        )
+
+    def test_get_device_info_cache_keeps_terminal(self):
+        """Test caching the device info keeps the terminal settings of the host"""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        cache_path = path.join(tmp_dir, "device_info.json")
+        terminal = {"dialect": "ios", "width": "0"}
+        DeviceCache(cache_path).set("198.51.100.1", {"terminal": terminal})
+
+        self._set_device_info_cache(cache_path)
+        self._cliconf.get_device_info()
+        record = DeviceCache(cache_path).get("198.51.100.1")
+        self.assertEqual(record["terminal"], terminal)
+        self.assertEqual(record["device_info"]["network_os_type"], "L2")
+
+    def test_get_device_info_cache_drops_privilege(self):
+        """Test refreshing the cached device info drops the cached privilege level"""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        cache_path = path.join(tmp_dir, "device_info.json")
+        privilege = {"prompt": "R1#", "user": "admin", "level": 15}
+        DeviceCache(cache_path).set(
+            "198.51.100.1",
+            {"terminal": {"dialect": "ios", "width": "0", "privilege": privilege}},
+        )
+
+        self._set_device_info_cache(cache_path)
+        self._cliconf.get_device_info()
+        record = DeviceCache(cache_path).get("198.51.100.1")
+        self.assertEqual(record["terminal"], {"dialect": "ios", "width": "0"})
+
+    def test_privilege_cached_outdated(self):
+        """Test a command failing at a cached privilege level checks it again"""
+        terminal = self._mock_connection._terminal
+        self._mock_connection.send.side_effect = AnsibleConnectionFailure(
+            "% Invalid input detected at '^' marker.",
+        )
+
+        terminal.privilege_cached = True
+        terminal.check_privilege.return_value = 7
+        with self.assertRaises(AnsibleConnectionFailure) as exc:
+            self._cliconf.get("show running-config")
+        self.assertIn("privilege level 7", str(exc.exception))
+        self.assertEqual(terminal.check_privilege.call_count, 1)
+
+        terminal.privilege_cached = True
+        terminal.check_privilege.return_value = 15
+        with self.assertRaises(AnsibleConnectionFailure) as exc:
+            self._cliconf.get("show running-config")
+        self.assertEqual(str(exc.exception), "% Invalid input detected at '^' marker.")
+
+        # not checked when the level was not read from the cache
+        terminal.privilege_cached = False
+        self.assertRaises(AnsibleConnectionFailure, self._cliconf.get, "show running-config")
+        self.assertEqual(terminal.check_privilege.call_count, 2)
+
+    def test_get_defaults_flag_cached(self):
+        """Test get_defaults_flag is cached until the image changes"""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        cache_path = path.join(tmp_dir, "device_info.json")
+        images = [b"bootflash:packages.conf"]
+
+        def _send(command, **kwargs):
+            if command == b"show running-config ?":
+                return b"  all  Configuration with defaults\n  brief  Configuration without certificate data"
+            if command == b"show version | include uptime|image file":
+                return (
+                    b'R1 uptime is 1 day, 16 hours, 15 minutes\nSystem image file is "%s"'
+                    % images[0]
+                )
+            return _connection_side_effect(command, **kwargs)
+
+        def _connect():
+            self._mock_connection = MagicMock()
+            self._mock_connection.send.side_effect = _send
+            self._cliconf = ios.Cliconf(self._mock_connection)
+            self._set_device_info_cache(cache_path)
+            flag = self._cliconf.get_defaults_flag()
+            self.assertEqual(self._cliconf.get_defaults_flag(), flag)
+            return flag, [call[1]["command"] for call in self._mock_connection.send.call_args_list]
+
+        flag, sent = _connect()
+        self.assertEqual(flag, "all")
+        self.assertEqual(sent, [b"show version", b"show vlan", b"show running-config ?"])
+
+        flag, sent = _connect()
+        self.assertEqual(flag, "all")
+        self.assertEqual(sent, [b"show version | include uptime|image file"])
+
+        images[0] = b"bootflash:upgrade.bin"
+        flag, sent = _connect()
+        self.assertEqual(flag, "all")
+        self.assertIn(b"show running-config ?", sent)
+
+    def _set_simulated_terminal(self):
+        terminal = SimulatedTerminal()
+        self._mock_connection.send.side_effect = terminal.send
+        self._mock_connection.get_option.side_effect = terminal.get_option
+        self._mock_connection.set_option.side_effect = terminal.set_option
+        sleep = patch("ansible_collections.cisco.ios.plugins.cliconf.ios.time.sleep")
+        self._sleep = sleep.start()
+        self.addCleanup(sleep.stop)
+        return terminal
+
+    def test_edit_banner(self):
+        """Test edit_banner waits for the device prompts"""
+        terminal = self._set_simulated_terminal()
+        banners = {"banner motd": "this is a\nmulti-line banner", "banner login": "login"}
+        resp = self._cliconf.edit_banner(json.dumps(banners), multiline_delimiter="@")
+
+        self.assertEqual(terminal.mode, "exec")
+        self.assertEqual(
+            terminal.config,
+            ["banner motd @", "this is a\nmulti-line banner", "banner login @", "login"],
+        )
+        self.assertEqual(
+            resp["request"],
+            [
+                "banner motd @",
+                "this is a\nmulti-line banner",
+                "@",
+                "end",
+                "banner login @",
+                "login",
+                "@",
+                "end",
+            ],
+        )
+        sent = [call[1]["command"] for call in self._mock_connection.send.call_args_list]
+        self.assertEqual(sent.count(b"config terminal"), 2)
+        self._sleep.assert_not_called()
+
+    def test_edit_banner_error_text(self):
+        """Test edit_banner does not fail on banner text that looks like an error"""
+        terminal = self._set_simulated_terminal()
+        text = "% Error: authorized access only\ninvalid input is logged\nnot found? call x1234"
+        self._cliconf.edit_banner(json.dumps({"banner motd": text}), multiline_delimiter="@")
+
+        self.assertEqual(terminal.config, ["banner motd @", text])
+        self.assertEqual(terminal.mode, "exec")
+        # the errors are looked for again once the text is sent
+        self.assertIsNone(terminal.options["terminal_stderr_re"])
+
+    def test_edit_banner_error_reply(self):
+        """Test edit_banner fails on an error of the device after the text"""
+        terminal = self._set_simulated_terminal()
+        enter = terminal._enter
+
+        def _enter(line):
+            output = enter(line)
+            if line == "@":
+                output.append("% Error: banner too long")
+            return output
+
+        terminal._enter = _enter
+        with self.assertRaises(AnsibleConnectionFailure) as exc:
+            self._cliconf.edit_banner(json.dumps({"banner motd": "welcome"}))
+        self.assertIn("% Error: banner too long", str(exc.exception))
+
+    def test_edit_macro_error_text(self):
+        """Test edit_macro does not fail on macro lines that look like an error"""
+        terminal = self._set_simulated_terminal()
+        candidate = ["macro name MACRO", "description % Error port", "shutdown", "@"]
+        self._cliconf.edit_macro(candidate=candidate)
+        self.assertEqual(
+            terminal.config, ["macro name MACRO", "description % Error port\nshutdown"]
+        )
+
+    def test_edit_macro(self):
+        """Test edit_macro waits for the device prompts"""
+        terminal = self._set_simulated_terminal()
+        candidate = ["macro name MACRO", "switchport mode access", "shutdown", "@"]
+        self._cliconf.edit_macro(candidate=candidate)
+
+        self.assertEqual(terminal.mode, "exec")
+        self.assertEqual(terminal.config, ["macro name MACRO", "switchport mode access\nshutdown"])
+        self._sleep.assert_not_called()
+
+    def _set_commit_confirm(self, rollback_timer="%No Rollback Confirmed Change pending"):
+        self._mock_connection.get_prompt.return_value = b"R1#"
+        self._mock_connection.get_option.return_value = 30
+        self._cliconf.set_option("commit_confirm_immediate", True)
+        self._cliconf.set_option("commit_confirm_timeout", None)
+        self._cliconf.set_option("config_pipeline_window", 0)
+
+        def _send(command, **kwargs):
+            if command == b"show archive":
+                return "The maximum archive configurations allowed is 10."
+            if command == b"show archive config rollback timer":
+                return rollback_timer
+            return ""
+
+        self._mock_connection.send.side_effect = _send
+
+    def _sent_commands(self):
+        return [call[1]["command"] for call in self._mock_connection.send.call_args_list]
+
+    def test_edit_config_commit_confirm_preflight_cached(self):
+        """Test the commit confirm preflight checks are only sent once"""
+        self._set_commit_confirm()
+        self._cliconf.edit_config(["hostname R1"])
+        self._cliconf.edit_config(["hostname R2"])
+
+        self.assertEqual(
+            self._sent_commands(),
+            [
+                b"show archive",
+                b"show archive config rollback timer",
+                b"configure terminal revert timer 1",
+                b"hostname R1",
+                b"end",
+                b"configure confirm",
+                b"configure terminal revert timer 1",
+                b"hostname R2",
+                b"end",
+                b"configure confirm",
+            ],
+        )
+
+    def test_edit_config_commit_confirm_rollback_unknown(self):
+        """Test the rollback state is queried again when it is not known"""
+        self._set_commit_confirm()
+        self._cliconf.set_option("commit_confirm_immediate", False)
+        self._cliconf.set_option("commit_confirm_timeout", 5)
+        self._cliconf.edit_config(["hostname R1"])
+        self._cliconf.run_commands(["configure confirm"])
+        self._cliconf.edit_config(["hostname R2"])
+
+        self.assertEqual(
+            self._sent_commands(),
+            [
+                b"show archive",
+                b"show archive config rollback timer",
+                b"configure terminal revert timer 5",
+                b"hostname R1",
+                b"end",
+                b"configure confirm",
+                b"show archive config rollback timer",
+                b"configure terminal revert timer 5",
+                b"hostname R2",
+                b"end",
+            ],
+        )
+
+    def test_edit_config_commit_confirm_rollback_pending(self):
+        """Test edit_config fails while a rollback is pending on the device"""
+        self._set_commit_confirm(rollback_timer="Timeout : 5 min")
+        with self.assertRaises(ValueError) as exc:
+            self._cliconf.edit_config(["hostname R1"])
+        self.assertIn("Existing rollback change already pending", str(exc.exception))
+
+    def test_extract_banners(self):
+        """Test _extract_banners splits out banners with any delimiter"""
+        config = (
+            "hostname R1\n"
+            "banner exec ^C\n"
+            "this is a sample\n"
+            "multiline banner\n"
+            "^C\n"
+            "banner login ^Clogin banner^C\n"
+            "banner motd @\n"
+            "motd banner with ^C inside\n"
+            "@\n"
+            "ip domain name example.com\n"
+            "banner incoming #\n"
+            "unterminated\n"
+        )
+        config, banners = self._cliconf._extract_banners(config)
+        self.assertEqual(
+            banners,
+            {
+                "banner exec": "this is a sample\nmultiline banner",
+                "banner login": "login banner",
+                "banner motd": "motd banner with ^C inside",
+            },
+        )
+        self.assertEqual(
+            config,
+            "hostname R1\n"
+            "!! banner removed\n"
+            "!! banner removed\n"
+            "!! banner removed\n"
+            "ip domain name example.com\n"
+            "banner incoming #\n"
+            "unterminated\n",
+        )
+
+    def test_get_diff_banners(self):
+        """Test get_diff returns the changed banners"""
+        self._cliconf.set_option("diff_engine", "tree")
+        running = "hostname R1\nbanner motd ^C\nold banner\n^C\nbanner login ^C\nlogin\n^C\n"
+        candidate = "hostname R1\nbanner motd @\nnew banner\n@\nbanner login ^C\nlogin\n^C\n"
+        diff = self._cliconf.get_diff(candidate=candidate, running=running)
+        self.assertEqual(diff, {"config_diff": "", "banner_diff": {"banner motd": "new banner"}})
+
+    def _set_response_cache(self, ttl=60, size=64):
+        self._cliconf.set_option("response_cache_ttl", ttl)
+        self._cliconf.set_option("response_cache_size", size)
+        self._cliconf.set_option("resource_after", "gather")
+
+    def _sent(self):
+        return [call[1]["command"] for call in self._mock_connection.send.call_args_list]
+
+    def test_response_cache(self):
+        """Test get and run_commands reuse the responses of show commands"""
+        self._set_response_cache()
+        vlans = self._cliconf.get("show vlan")
+        self.assertEqual(self._cliconf.run_commands(["show vlan", "sh vlan"]), [vlans, b"sh vlan"])
+        self.assertEqual(self._cliconf.get("show vlan"), vlans)
+        self.assertEqual(self._sent(), [b"show vlan", b"sh vlan"])
+
+        # the device info probes show version, and show vlan again
+        capabilities = json.loads(self._cliconf.get_capabilities())
+        self.assertEqual(capabilities["response_cache"], {"hits": 3, "misses": 3, "entries": 3})
+
+    def test_response_cache_disabled(self):
+        """Test the responses are not cached by default"""
+        self._cliconf.get("show vlan")
+        self._cliconf.run_commands(["show vlan"])
+        self.assertEqual(self._sent(), [b"show vlan", b"show vlan"])
+
+    def test_response_cache_not_cached(self):
+        """Test prompts and show commands writing to a file are not cached"""
+        self._set_response_cache()
+        for dummy in range(2):
+            self._cliconf.get("show running-config | redirect flash:backup.cfg")
+            self._cliconf.get("show archive", prompt="[confirm]", answer="y")
+        self.assertEqual(len(self._sent()), 4)
+
+    def test_response_cache_invalidated(self):
+        """Test editing the configuration or any other command clears the cache"""
+        self._set_response_cache()
+        self._cliconf.set_option("commit_confirm_immediate", False)
+        self._cliconf.set_option("commit_confirm_timeout", None)
+        self._cliconf.set_option("config_pipeline_window", 0)
+        self._cliconf._archive_enabled = True
+        self._mock_connection.get_prompt.return_value = b"R1#"
+
+        edits = [
+            lambda: self._cliconf.edit_config(candidate=["hostname R2"]),
+            lambda: self._cliconf.edit_banner(candidate=json.dumps({"banner motd": "hi"})),
+            lambda: self._cliconf.edit_macro(candidate=["macro name M", "description m", "@"]),
+            lambda: self._cliconf.run_commands(["clear counters"]),
+        ]
+        for edit in edits:
+            self._cliconf.get("show vlan")
+            self._mock_connection.send.reset_mock()
+            edit()
+            self._cliconf.get("show vlan")
+            self.assertEqual(self._sent()[-1], b"show vlan")
+
+    def test_response_cache_bypassed(self):
+        """Test commands sent with cache=False read the device and refresh the cache"""
+        self._set_response_cache()
+        self._mock_connection.send.side_effect = [b"down", b"up", b"up again"]
+        self.assertEqual(self._cliconf.get("show ip bgp summary"), b"down")
+        self.assertEqual(
+            self._cliconf.run_commands(["show ip bgp summary"], cache=False),
+            [b"up"],
+        )
+        self.assertEqual(self._cliconf.get("show ip bgp summary"), b"up")
+        self.assertEqual(self._cliconf.get("show ip bgp summary", cache=False), b"up again")
+        self.assertEqual(len(self._sent()), 3)
+
+    def test_response_cache_eviction(self):
+        """Test cached responses are evicted once expired or least recently used"""
+        self._set_response_cache(ttl=10, size=2)
+        with patch("time.time") as mock_time:
+            mock_time.return_value = 1000
+            for command in ("show vlan", "show clock", "show vlan", "show users"):
+                self._cliconf.get(command)
+            self.assertEqual(self._sent(), [b"show vlan", b"show clock", b"show users"])
+
+            self._cliconf.get("show clock")
+            self.assertEqual(self._sent()[-1], b"show clock")
+
+            mock_time.return_value = 1011
+            self._cliconf.get("show clock")
+            self.assertEqual(len(self._sent()), 5)
+
+    def _set_config_snapshot(self, fingerprints):
+        """Send the next of `fingerprints` as the last configuration change"""
+        self._cliconf.set_option("config_snapshot", True)
+        self._mock_connection.get_prompt.return_value = b"R1#"
+
+        def _send(command, **kwargs):
+            if command == to_bytes(ios.FINGERPRINT_COMMAND):
+                header = fingerprints.pop(0)
+                return b"! Last configuration change at %s by admin" % header if header else b""
+            return b"output of %s" % command
+
+        self._mock_connection.send.side_effect = _send
+
+    def test_get_config_fingerprint(self):
+        """Test get_config_fingerprint reads the last configuration change"""
+        self._set_config_snapshot([b"10:21:03 UTC Mon Oct 16 2023", None])
+        self.assertEqual(
+            self._cliconf.get_config_fingerprint(),
+            "! Last configuration change at 10:21:03 UTC Mon Oct 16 2023 by admin",
+        )
+        self.assertIsNone(self._cliconf.get_config_fingerprint())
+
+    def test_config_snapshot(self):
+        """Test the running config is fetched again only once it changed"""
+        self._set_config_snapshot([b"10:00:00", b"10:00:00", b"10:00:00", b"10:05:00"])
+        section = "show running-config | section ^interface"
+        self.assertEqual(self._cliconf.get_config(), b"output of show running-config")
+        self.assertEqual(self._cliconf.get_config(), b"output of show running-config")
+        self.assertEqual(self._cliconf.get(section), b"output of %s" % to_bytes(section))
+        self.assertEqual(
+            self._cliconf.run_commands(["show running-config"]), [b"output of show running-config"]
+        )
+        self.assertEqual(
+            [command for command in self._sent() if command != to_bytes(ios.FINGERPRINT_COMMAND)],
+            [b"show running-config", to_bytes(section), b"show running-config"],
+        )
+
+    def test_config_snapshot_without_fingerprint(self):
+        """Test the running config is not kept when the device shows no fingerprint"""
+        self._set_config_snapshot([None, None])
+        self._cliconf.get_config()
+        self._cliconf.get_config()
+        self.assertEqual(self._sent().count(b"show running-config"), 2)
+
+    def test_config_snapshot_invalidated(self):
+        """Test editing the configuration discards the snapshots"""
+        self._set_config_snapshot([b"10:00:00", b"10:00:00"])
+        self._cliconf.set_option("commit_confirm_immediate", False)
+        self._cliconf.set_option("commit_confirm_timeout", None)
+        self._cliconf.set_option("config_pipeline_window", 0)
+        self._cliconf._archive_enabled = True
+
+        self._cliconf.get_config()
+        self._cliconf.edit_config(candidate=["hostname R2"])
+        self._cliconf.get_config()
+        self.assertEqual(self._sent().count(b"show running-config"), 2)
+
+    def test_config_snapshot_invalidated_by_commands(self):
+        """Test a config command sent with run_commands or get discards the snapshots"""
+        self._set_config_snapshot([b"10:00:00", b"10:00:00", b"10:00:00"])
+        self.assertIsNone(self._cliconf._get_response_cache())
+
+        self._cliconf.get_config()
+        self._cliconf.run_commands(["configure replace flash:base.cfg force"])
+        self._cliconf.get_config()
+        self._cliconf.get("copy flash:base.cfg running-config")
+        self._cliconf.get_config()
+        self.assertEqual(self._sent().count(b"show running-config"), 3)
+
+    def test_get_to_file(self):
+        """Test get_to_file writes the output to a file and returns its checksum"""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        out = "BGP table version is 1\n" * 1000
+        self._mock_connection.send.side_effect = lambda command, **kwargs: out
+
+        result = self._cliconf.get_to_file("show ip bgp", path=path.join(tmp_dir, "bgp.txt"))
+
+        with open(path.join(tmp_dir, "bgp.txt"), "rb") as output_file:
+            data = output_file.read()
+        self.assertEqual(data, to_bytes(out))
+        self.assertEqual(
+            result,
+            {
+                "path": path.join(tmp_dir, "bgp.txt"),
+                "bytes": len(data),
+                "checksum": hashlib.sha1(data).hexdigest(),
+            },
+        )
+        self.assertEqual(os.listdir(tmp_dir), ["bgp.txt"])
+
+    def test_get_to_file_tracked(self):
+        """Test get_to_file clears the caches and the rollback state like run_commands"""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        self._set_response_cache()
+        self._cliconf.get("show vlan")
+        self._cliconf.get_to_file("show ip bgp", path=path.join(tmp_dir, "bgp.txt"))
+        self._cliconf.get("show vlan")
+        self.assertEqual(self._sent(), [b"show vlan", b"show ip bgp"])
+
+        self._cliconf._rollback_pending = True
+        self._cliconf.get_to_file(
+            "configure replace flash:base.cfg force",
+            path=path.join(tmp_dir, "replace.txt"),
+        )
+        self.assertIsNone(self._cliconf._rollback_pending)
+        self._cliconf.get("show vlan")
+        self.assertEqual(self._sent()[-1], b"show vlan")
+
+    def test_get_to_file_failure(self):
+        """Test get_to_file leaves no file behind when the command fails"""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        self._mock_connection.send.side_effect = AnsibleConnectionFailure("timeout")
+        self.assertRaises(
+            AnsibleConnectionFailure,
+            self._cliconf.get_to_file,
+            "show tech-support",
+            path=path.join(tmp_dir, "tech.txt"),
+        )
+        self.assertEqual(os.listdir(tmp_dir), [])
+        self.assertRaises(ValueError, self._cliconf.get_to_file, "show tech-support")
+
+    def test_get_diff_blocks(self):
+        """Test get_diff_blocks gives the diff get_diff gives for every block"""
+        running = (
+            "hostname R1\n"
+            "banner motd ^C\nold banner\n^C\n"
+            "interface GigabitEthernet0/0\n description uplink\n shutdown\n"
+            "interface GigabitEthernet0/1\n description access\n"
+            "router ospf 1\n network 10.0.0.0 0.0.0.255 area 0\n"
+        )
+        blocks = [
+            {"candidate": "interface GigabitEthernet0/0\n description uplink\n no shutdown"},
+            {
+                "candidate": "interface GigabitEthernet0/1\n description access",
+                "path": ["interface GigabitEthernet0/1"],
+            },
+            {"candidate": "router ospf 1\n network 10.0.1.0 0.0.0.255 area 0"},
+            {"candidate": "hostname R2\nbanner motd @\nnew banner\n@"},
+        ]
+        for engine in ("tree", "indexed"):
+            self._cliconf.set_option("diff_engine", engine)
+            for match in ("line", "strict", "exact", "none"):
+                for replace in ("line", "block"):
+                    diffs = self._cliconf.get_diff_blocks(
+                        blocks=blocks,
+                        running=running,
+                        diff_match=match,
+                        diff_replace=replace,
+                    )
+                    expected = [
+                        self._cliconf.get_diff(
+                            candidate=block["candidate"],
+                            running=running,
+                            diff_match=match,
+                            path=block.get("path"),
+                            diff_replace=replace,
+                        )
+                        for block in blocks
+                    ]
+                    self.assertEqual(diffs, expected, (engine, match, replace))
+
+    def test_get_diff_invalid_options(self):
+        """Test get_diff and get_diff_blocks reject the same invalid options"""
+        for kwargs in ({"diff_match": "fuzzy"}, {"diff_replace": "file"}):
+            self.assertRaises(ValueError, self._cliconf.get_diff, candidate="hostname R1", **kwargs)
+            self.assertRaises(
+                ValueError,
+                self._cliconf.get_diff_blocks,
+                blocks=[{"candidate": "hostname R1"}],
+                **kwargs,
+            )
+
     def test_get_capabilities(self):
         """Test get_capabilities"""
+        self._cliconf.set_option("resource_after", "gather")
         capabilities = json.loads(self._cliconf.get_capabilities())
         mock_capabilities = {
             "device_info": {
@@ -120,6 +893,8 @@ class TestPluginCLIConfIOS(unittest.TestCase):
             "format": ["text"],
             "network_api": "cliconf",
             "output": [],
+            "resource_after": "gather",
+            "response_cache": {},
             "rpc": [
                 "edit_config",
                 "enable_response_logging",
@@ -132,6 +907,116 @@ class TestPluginCLIConfIOS(unittest.TestCase):
                 "get_diff",
                 "run_commands",
                 "get_defaults_flag",
+                "get_config_fingerprint",
+                "get_to_file",
+                "get_diff_blocks",
             ],
         }
         self.assertEqual(sorted(mock_capabilities), sorted(capabilities))
+
+    def _set_pipeline_options(self, window):
+        self._mock_connection.get_prompt.return_value = b"R1#"
+        self._cliconf.set_option("commit_confirm_immediate", False)
+        self._cliconf.set_option("commit_confirm_timeout", None)
+        self._cliconf.set_option("config_pipeline_window", window)
+
+    def test_edit_config_pipelined(self):
+        """Test edit_config sends configuration lines in windows"""
+        self._set_pipeline_options(2)
+
+        def _echo(command, **kwargs):
+            rows = [b"R1(config)#%s" % line for line in command.split(b"\n")]
+            return b"\n".join(rows + [b"R1(config)#"])
+
+        self._mock_connection.send.side_effect = _echo
+        candidate = ["hostname R1", "!", "ip domain name example.com", "ip name-server 192.0.2.1"]
+        resp = self._cliconf.edit_config(candidate)
+
+        sent = [call[1]["command"] for call in self._mock_connection.send.call_args_list]
+        self.assertEqual(
+            sent,
+            [
+                b"configure terminal",
+                b"hostname R1\nip domain name example.com",
+                b"ip name-server 192.0.2.1",
+                b"end",
+            ],
+        )
+        self.assertEqual(
+            resp["request"],
+            ["hostname R1", "ip domain name example.com", "ip name-server 192.0.2.1"],
+        )
+        self.assertEqual(resp["response"], ["", "", ""])
+
+    def _set_pipeline_device(self, window, errors=None, pause_after=None):
+        self._set_pipeline_options(window)
+        device = PipelineDevice(errors, pause_after)
+        self._mock_connection.send.side_effect = device.send
+        self._mock_connection.receive.side_effect = device.receive
+        self._mock_connection.get_option.side_effect = device.get_option
+        self._mock_connection.set_option.side_effect = device.set_option
+        return device
+
+    def test_edit_config_pipelined_error(self):
+        """Test edit_config maps a pipelined error to the failing line"""
+        candidate = ["hostname R1", "ip domain nmae example.com"]
+        candidate += ["ip name-server 192.0.2.%d" % host for host in range(1, 30)]
+        candidate += ["ip domain lookup"]
+        device = self._set_pipeline_device(
+            len(candidate) - 1,
+            errors={"ip domain nmae example.com": "% Invalid input detected at '^' marker."},
+        )
+        with self.assertRaises(AnsibleConnectionFailure) as exc:
+            self._cliconf.edit_config(candidate)
+
+        message = exc.exception.message
+        self.assertIn(
+            "ip domain nmae example.com: % Invalid input detected at '^' marker.",
+            message,
+        )
+        self.assertNotIn("window starting at", message)
+        # the device applied the rest of the window, but not the next one
+        applied = message.split("lines applied after the failure, in the same window:\n")[1]
+        self.assertEqual(applied.splitlines(), candidate[2:-1])
+        self.assertEqual(device.applied, candidate[:-1])
+        self.assertEqual(device.pending, [])
+        self.assertIsNone(device.options["terminal_stderr_re"])
+
+    def test_edit_config_pipelined_partial_echo(self):
+        """Test edit_config reads the echo of a window the device paused in"""
+        device = self._set_pipeline_device(3, pause_after=0)
+        candidate = ["hostname R1", "ip domain name example.com", "ip domain lookup"]
+        resp = self._cliconf.edit_config(candidate)
+
+        self.assertEqual(resp["request"], candidate)
+        self.assertEqual(self._mock_connection.receive.call_count, 1)
+        self.assertEqual(device.pending, [])
+        self.assertEqual(device.applied, candidate)
+
+    def test_edit_config_pipelined_partial_echo_error(self):
+        """Test edit_config maps an error in the echo read after a pause"""
+        device = self._set_pipeline_device(
+            3,
+            errors={"ip domain lookup": "% Incomplete command."},
+            pause_after=1,
+        )
+        candidate = ["hostname R1", "ip domain name example.com", "ip domain lookup"]
+        with self.assertRaises(AnsibleConnectionFailure) as exc:
+            self._cliconf.edit_config(candidate)
+        self.assertIn("ip domain lookup: % Incomplete command.", exc.exception.message)
+        self.assertNotIn("lines applied after the failure", exc.exception.message)
+        self.assertEqual(device.pending, [])
+
+    def test_edit_config_pipelined_configured_stderr_re(self):
+        """Test edit_config looks for the errors with the configured terminal_stderr_re"""
+        device = self._set_pipeline_device(2, errors={"hostname R1": "POLICY-DENIED hostname"})
+        configured = [{"pattern": "POLICY-DENIED"}]
+        device.options["terminal_stderr_re"] = configured
+        with self.assertRaises(AnsibleConnectionFailure) as exc:
+            self._cliconf.edit_config(["hostname R1", "ip domain lookup"])
+        self.assertIn("hostname R1: POLICY-DENIED hostname", exc.exception.message)
+        self.assertIn(
+            "lines applied after the failure, in the same window:\nip domain lookup",
+            exc.exception.message,
+        )
+        self.assertEqual(device.options["terminal_stderr_re"], configured)
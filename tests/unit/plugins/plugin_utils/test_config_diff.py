@@ -0,0 +1,118 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2023 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+#
+
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+import glob
+import os
+import random
+import timeit
+
+from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.config import (
+    NetworkConfig,
+    dumps,
+)
+
+from ansible_collections.cisco.ios.plugins.plugin_utils.config_diff import (
+    IndexedNetworkConfig,
+    diff_scope,
+)
+from ansible_collections.cisco.ios.tests.unit.compat import unittest
+
+
+FIXTURES = glob.glob(
+    os.path.join(os.path.dirname(__file__), "../../modules/network/ios/fixtures/*.cfg"),
+)
+
+
+def tree_diff(candidate, running, match, replace, path):
+    candidate_obj = NetworkConfig(indent=1, contents=candidate)
+    running_obj = NetworkConfig(indent=1, contents=running)
+    return dumps(candidate_obj.difference(running_obj, match=match, path=path, replace=replace))
+
+
+def indexed_diff(candidate, running, match, replace, path):
+    candidate_obj = IndexedNetworkConfig(indent=1, contents=candidate)
+    running_obj = IndexedNetworkConfig(
+        indent=1,
+        contents=running,
+        scope=diff_scope(candidate_obj, match=match, path=path),
+    )
+    return dumps(candidate_obj.difference(running_obj, match=match, path=path, replace=replace))
+
+
+def candidates(running, rand):
+    """Candidates built from blocks of `running`, with some lines changed"""
+    blocks = []
+    for line in running.splitlines():
+        if line.strip() and (not line[0].isspace() or not blocks):
+            blocks.append([])
+        if line.strip():
+            blocks[-1].append(line)
+
+    for dummy in range(5):
+        lines = []
+        for block in rand.sample(blocks, min(len(blocks), 4)):
+            for line in block:
+                if rand.random() < 0.2:
+                    line = line + " changed"
+                if rand.random() > 0.1:
+                    lines.append(line)
+        yield "\n".join(lines), blocks
+
+
+class TestIndexedNetworkConfig(unittest.TestCase):
+    def test_parse(self):
+        for fixture in FIXTURES:
+            with open(fixture) as f:
+                running = f.read()
+            tree = NetworkConfig(indent=1, contents=running)
+            indexed = IndexedNetworkConfig(indent=1, contents=running)
+            self.assertEqual(
+                [(item.line, item.raw, item.children) for item in indexed.items],
+                [(item.line, item.raw, item.children) for item in tree.items],
+            )
+
+    def test_difference(self):
+        rand = random.Random(0)
+        for fixture in FIXTURES:
+            with open(fixture) as f:
+                running = f.read()
+            for candidate, blocks in candidates(running, rand):
+                block = rand.choice(blocks)
+                paths = [None, [block[0].strip()]]
+                if len(block) > 1 and block[1].startswith(" "):
+                    paths.append([block[0].strip(), block[1].strip()])
+                for match in ("line", "strict", "exact"):
+                    for replace in ("line", "block"):
+                        for path in paths:
+                            args = (candidate, running, match, replace, path)
+                            self.assertEqual(indexed_diff(*args), tree_diff(*args), args[2:])
+
+    def test_difference_benchmark(self):
+        running = []
+        for idx in range(400):
+            running.append("interface GigabitEthernet0/%d" % idx)
+            running.append(" description port %d" % idx)
+            running.append(" ip address 192.0.2.%d 255.255.255.0" % (idx % 250))
+            running.extend([" no shutdown", " mtu 1500", "!"])
+        running = "\n".join(running)
+        candidate = "\n".join(
+            [
+                "interface GigabitEthernet0/%d\n description uplink %d" % (idx, idx)
+                for idx in range(40)
+            ],
+        )
+
+        args = (candidate, running, "line", "line", None)
+        self.assertEqual(indexed_diff(*args), tree_diff(*args))
+        tree = min(timeit.repeat(lambda: tree_diff(*args), number=1, repeat=3))
+        indexed = min(timeit.repeat(lambda: indexed_diff(*args), number=1, repeat=3))
+        self.assertLess(indexed * 5, tree)
@@ -0,0 +1,277 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2023 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+#
+
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+import glob
+import json
+import os
+import re
+import shutil
+import tempfile
+import timeit
+
+
+try:
+    from unittest.mock import MagicMock
+except ImportError:
+    from mock import MagicMock
+
+from ansible.errors import AnsibleConnectionFailure
+
+from ansible_collections.cisco.ios.plugins.terminal.ios import (
+    STDERR_PATTERNS,
+    STDERR_RE,
+    StderrMatcher,
+    TerminalModule,
+)
+from ansible_collections.cisco.ios.tests.unit.compat import unittest
+
+
+FIXTURES = glob.glob(
+    os.path.join(os.path.dirname(__file__), "../../modules/network/ios/fixtures/*"),
+)
+
+ERRORS = {
+    "error": b"% Error opening tftp://10.0.0.1/file (Timed out)",
+    "bad_secret": b"% Bad secrets",
+    "bad_passwords": b"\r\n% Bad passwords",
+    "invalid_input": b"% Invalid input detected at '^' marker.",
+    "incomplete_command": b"% Incomplete command.",
+    "connection_timed_out": b"% Connection timed out; remote host not responding",
+    "not_found": b"interface Loopback999 not found",
+    "returned_error_code": b"'s' returned error code: 2",
+    "bad_mask": b"Bad mask /33 for address 10.0.0.1",
+    "overlaps": b"% 10.0.0.0 overlaps with GigabitEthernet1",
+    "error_message": b"%CDP-4-Error: \r\n",
+    "informational": b"% BGP Informational: \r\n",
+    "authorization_failed": b"Command authorization failed.",
+    "command_rejected": b"Command Rejected: \r\n",
+    "address_family": b"% General session commands not allowed under the address family",
+    "bgp_topology": b"% BGP: Error initializing topology",
+    "snmp_disabled": b"%SNMP agent not enabled",
+}
+
+
+STDERR_REGEXES = [re.compile(pattern, flags) for _name, pattern, flags in STDERR_PATTERNS]
+
+
+def search_each(response):
+    return any(regex.search(response) for regex in STDERR_REGEXES)
+
+
+def chunks(data, size):
+    return [data[idx : idx + size] for idx in range(0, len(data), size)]
+
+
+class TestIosTerminalErrors(unittest.TestCase):
+    def test_stderr_re_single_regex(self):
+        self.assertEqual(len(TerminalModule.terminal_stderr_re), 1)
+        self.assertEqual(set(ERRORS), set(name for name, _pattern, _flags in STDERR_PATTERNS))
+
+    def test_stderr_re_names(self):
+        for name, response in ERRORS.items():
+            matcher = StderrMatcher(STDERR_PATTERNS)
+            output = b"router#show something\r\n" + response + b"\r\nrouter#"
+            self.assertTrue(search_each(output))
+            match = matcher.search(output)
+            self.assertTrue(match, name)
+            self.assertEqual(match.lastgroup, name)
+            self.assertEqual(matcher.name, name)
+            self.assertEqual(matcher.pattern, dict((n, p) for n, p, _f in STDERR_PATTERNS)[name])
+
+    def test_stderr_re_no_error(self):
+        output = b"router#show version\r\nCisco IOS Software, Version 17.3\r\nrouter#"
+        self.assertFalse(StderrMatcher(STDERR_PATTERNS).search(output))
+        self.assertFalse(STDERR_RE.search(output))
+
+    def test_stderr_re_equivalence(self):
+        # the responses buffered by network_cli, chunk after chunk
+        responses = [f for f in FIXTURES if os.path.isfile(f)]
+        for fixture in responses:
+            with open(fixture, "rb") as fixture_file:
+                data = fixture_file.read()
+            for error in (b"", b"\r\n% Invalid input detected at '^' marker.\r\n"):
+                middle = len(data) // 2
+                data = data[:middle] + error + data[middle:]
+                for size in (61, 256):
+                    matcher = StderrMatcher(STDERR_PATTERNS)
+                    response = b""
+                    for chunk in chunks(data, size):
+                        response += chunk
+                        self.assertEqual(
+                            bool(matcher.search(response)),
+                            search_each(response),
+                            "%s %s" % (fixture, size),
+                        )
+
+    def test_stderr_re_error_split_across_chunks(self):
+        data = b"show run\r\nline 1\r\n% Inva" + b"lid input detected\r\nrouter#"
+        matcher = StderrMatcher(STDERR_PATTERNS)
+        self.assertFalse(matcher.search(data[:22]))
+        self.assertTrue(matcher.search(data))
+        self.assertEqual(matcher.name, "invalid_input")
+
+    def test_stderr_re_unrelated_windows(self):
+        matcher = StderrMatcher(STDERR_PATTERNS)
+        self.assertTrue(matcher.search(b"% Bad mask"))
+        self.assertFalse(matcher.search(b"interface Loopback0"))
+        self.assertTrue(matcher.search(b"% Bad secrets"))
+
+    def test_stderr_re_large_output(self):
+        line = b" ip address 10.0.0.1 255.255.255.0\r\n"
+        data = b"router#show running-config\r\n" + line * 2000 + b"router#"
+
+        def buffered(search):
+            response = b""
+            for chunk in chunks(data, 1024):
+                response += chunk
+                search(response)
+
+        matcher = StderrMatcher(STDERR_PATTERNS)
+        each = min(timeit.repeat(lambda: buffered(search_each), number=1, repeat=3))
+        single = min(timeit.repeat(lambda: buffered(matcher.search), number=1, repeat=3))
+        self.assertLess(single * 5, each)
+
+
+class FakeDevice(object):
+    """Answers the terminal commands, failing the ones it does not know"""
+
+    def __init__(self, accepted, prompt=b"router#", level=15, enable_level=15):
+        self.accepted = accepted
+        self.prompt = prompt
+        self.level = level
+        self.enable_level = enable_level
+        self.commands = []
+
+    def exec_cli_command(self, cmd, check_rc=True):
+        if cmd.startswith(b"{"):
+            cmd = json.loads(cmd)["command"].encode()
+        self.commands.append(cmd)
+        if cmd == b"show privilege":
+            return "Current privilege level is %d" % self.level
+        if cmd == b"enable":
+            self.prompt = b"router#"
+            self.level = self.enable_level
+            return b""
+        if cmd not in self.accepted:
+            raise AnsibleConnectionFailure("% Invalid input detected at '^' marker.")
+        return b""
+
+
+class TestIosTerminalSetup(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.cache_dir, "devices.json")
+        self.options = {"host": "switch01", "remote_user": "admin"}
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def _terminal(self, device, cache=True):
+        connection = MagicMock()
+        connection.get_option.side_effect = lambda option: self.options[option]
+        connection.cliconf.get_option.return_value = self.cache_path if cache else None
+        terminal = TerminalModule(connection)
+        terminal._exec_cli_command = device.exec_cli_command
+        terminal._get_prompt = lambda: device.prompt
+        return terminal
+
+    def test_on_open_shell_without_cache(self):
+        accepted = [b"terminal length 0", b"terminal width 512", b"terminal width 0"]
+        for _attempt in range(2):
+            device = FakeDevice(accepted)
+            self._terminal(device, cache=False).on_open_shell()
+            self.assertEqual(device.commands, accepted)
+        self.assertFalse(os.path.exists(self.cache_path))
+
+    def test_on_open_shell_cached(self):
+        accepted = [b"terminal length 0", b"terminal width 512", b"terminal width 0"]
+        device = FakeDevice(accepted)
+        self._terminal(device).on_open_shell()
+        self.assertEqual(device.commands, accepted)
+
+        device = FakeDevice(accepted)
+        self._terminal(device).on_open_shell()
+        self.assertEqual(device.commands, [b"terminal length 0", b"terminal width 0"])
+
+    def test_on_open_shell_sdwan_cached(self):
+        accepted = [b"screen-length 0", b"screen-width 512"]
+        device = FakeDevice(accepted)
+        self._terminal(device).on_open_shell()
+        self.assertEqual(device.commands, [b"terminal length 0"] + accepted)
+
+        device = FakeDevice(accepted)
+        self._terminal(device).on_open_shell()
+        self.assertEqual(device.commands, accepted)
+
+    def test_on_open_shell_cache_outdated(self):
+        device = FakeDevice([b"screen-length 0", b"screen-width 512"])
+        self._terminal(device).on_open_shell()
+
+        accepted = [b"terminal length 0", b"terminal width 512"]
+        device = FakeDevice(accepted)
+        self._terminal(device).on_open_shell()
+        self.assertEqual(
+            device.commands,
+            [b"screen-length 0", b"terminal length 0", b"terminal width 512", b"terminal width 0"],
+        )
+
+        device = FakeDevice(accepted)
+        self._terminal(device).on_open_shell()
+        self.assertEqual(device.commands, accepted)
+
+    def test_on_become_privilege_cached(self):
+        device = FakeDevice([])
+        self._terminal(device).on_become()
+        self.assertEqual(device.commands, [b"show privilege"])
+
+        device = FakeDevice([])
+        self._terminal(device).on_become()
+        self.assertEqual(device.commands, [])
+
+        self.options["remote_user"] = "operator"
+        device = FakeDevice([])
+        self._terminal(device).on_become()
+        self.assertEqual(device.commands, [b"show privilege"])
+
+    def test_on_become_enable_cached(self):
+        device = FakeDevice([], prompt=b"router>", level=1)
+        self._terminal(device).on_become(passwd="secret")
+        self.assertEqual(device.commands, [b"enable", b"show privilege"])
+
+        device = FakeDevice([], prompt=b"router>", level=1)
+        self._terminal(device).on_become(passwd="secret")
+        self.assertEqual(device.commands, [b"enable"])
+
+    def test_on_become_not_privileged(self):
+        for _attempt in range(2):
+            device = FakeDevice([], level=7, enable_level=7)
+            self.assertRaises(AnsibleConnectionFailure, self._terminal(device).on_become)
+            self.assertEqual(device.commands, [b"show privilege", b"enable", b"show privilege"])
+
+    def test_check_privilege(self):
+        device = FakeDevice([])
+        self._terminal(device).on_become()
+
+        device = FakeDevice([])
+        terminal = self._terminal(device)
+        terminal.on_become()
+        self.assertTrue(terminal.privilege_cached)
+
+        # the privilege of the user was lowered since
+        device.level = 7
+        self.assertEqual(terminal.check_privilege(), 7)
+        self.assertFalse(terminal.privilege_cached)
+        self.assertEqual(device.commands, [b"show privilege"])
+
+        device = FakeDevice([], level=7, enable_level=7)
+        self.assertRaises(AnsibleConnectionFailure, self._terminal(device).on_become)
+        self.assertEqual(device.commands, [b"show privilege", b"enable", b"show privilege"])